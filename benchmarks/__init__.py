@@ -0,0 +1 @@
+"""성능 측정 도구 - 가짜 LLM, 메모 백엔드 대역, 벤치마크 스크립트"""
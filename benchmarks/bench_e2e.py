@@ -0,0 +1,244 @@
+"""엔드투엔드 벤치마크 - 가짜 LLM + 메모 백엔드 대역으로 전체 그래프 측정
+
+OpenAI와 FastAPI 백엔드 없이 create_graph()로 만든 그래프에
+N개의 대화를 동시에 흘려 보내고 MCP 전송 모드별로 다음을 측정합니다.
+- 초당 턴 수 (turns/sec)
+- 턴 지연 시간 p50/p95/p99
+- 노드별 소요 시간 (router / agent / tools)
+- 최대 RSS (챗봇 프로세스, 서버 하위 프로세스 - 모드마다 별도 프로세스에서 실행하여 따로 집계)
+
+결과는 JSON으로 저장하여 이전 결과와 비교할 수 있습니다.
+
+사용법:
+    python benchmarks/bench_e2e.py --conversations 20 --turns 4 --output bench.json
+    python benchmarks/bench_e2e.py --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from bench_mcp_transport import SSE_PORT, percentile, wait_for_port
+from fake_backend import BackgroundBackend
+from fake_llm import ScriptedChatModel
+
+ROOT = Path(__file__).resolve().parent.parent
+# chatbot 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(ROOT / "chatbot"))
+
+# 대화마다 순서대로 보내는 사용자 입력 (조회 → 생성 → 조회 → 수정)
+PROMPTS = [
+    "모든 메모를 보여줘",
+    "'장보기 {conversation}-{turn}' 제목으로 메모를 만들어줘",
+    "메모 {memo_id}번을 조회해줘",
+    "메모 {memo_id}번의 제목을 변경해줘",
+]
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    """최대 RSS(MB) - Linux는 KB, macOS는 바이트 단위"""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+async def run_conversation(app, conversation: int, turns: int, seed_memos: int, turn_latencies, node_times):
+    """한 대화의 턴을 순서대로 실행하며 턴/노드 시간 기록"""
+    from langchain_core.messages import HumanMessage
+
+    state = {"messages": []}
+    for turn in range(turns):
+        prompt = PROMPTS[turn % len(PROMPTS)].format(
+            conversation=conversation, turn=turn, memo_id=(conversation % seed_memos) + 1
+        )
+        state = {**state, "messages": list(state["messages"]) + [HumanMessage(content=prompt)]}
+
+        started = last = time.perf_counter()
+        async for mode, chunk in app.astream(state, stream_mode=["updates", "values"]):
+            now = time.perf_counter()
+            if mode == "updates":
+                # 한 대화 안에서 노드는 순서대로 실행되므로 직전 이벤트 이후 시간이 해당 노드의 시간
+                for node in chunk:
+                    node_times[node].append(now - last)
+                last = now
+            else:
+                state = chunk
+        turn_latencies.append(time.perf_counter() - started)
+
+
+async def bench_mode(mode: str, args) -> dict:
+    """한 MCP 모드에서 전체 대화 부하 실행"""
+    import nodes
+    import router
+    import replies
+    from graph import create_graph
+
+    nodes.MCP_MODE = mode
+    router.FAST_PATH_ENABLED = args.fast_path
+    replies.DIRECT_ANSWER_ENABLED = args.direct_answer
+    await nodes.initialize_mcp_client()
+    # OpenAI 대신 스크립트 모델 사용
+    nodes.model = ScriptedChatModel(latency=args.llm_latency_ms / 1000, token_delay=args.token_delay_ms / 1000)
+    app = create_graph()
+
+    turn_latencies = []
+    node_times = defaultdict(list)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_conversation(app, c, args.turns, args.seed_memos, turn_latencies, node_times)
+            for c in range(args.conversations)
+        ))
+        wall = time.perf_counter() - started
+    finally:
+        await nodes.cleanup_mcp_client()
+
+    return {
+        "turns": len(turn_latencies),
+        "wall_s": wall,
+        "turns_per_sec": len(turn_latencies) / wall,
+        "p50_ms": percentile(turn_latencies, 50) * 1000,
+        "p95_ms": percentile(turn_latencies, 95) * 1000,
+        "p99_ms": percentile(turn_latencies, 99) * 1000,
+        "nodes": {
+            node: {
+                "calls": len(times),
+                "mean_ms": statistics.mean(times) * 1000,
+                "total_s": sum(times),
+            }
+            for node, times in sorted(node_times.items())
+        },
+    }
+
+
+def run_single(args):
+    """(하위 프로세스) 모드 하나를 실행하고 결과와 이 프로세스의 최대 RSS를 파일로 저장"""
+    mode = args.run_mode
+    sse_process = None
+    if mode == "sse":
+        sse_process = subprocess.Popen(
+            [sys.executable, str(ROOT / "mcp-server" / "mcp_server_sse.py")],
+            env=dict(os.environ),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        wait_for_port(SSE_PORT)
+    try:
+        result = asyncio.run(bench_mode(mode, args))
+    finally:
+        if sse_process is not None:
+            sse_process.terminate()
+            sse_process.wait(timeout=10)
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    # 하위 프로세스(stdio/SSE 서버)는 종료 후에 RSS가 집계됨 (inproc은 서버가 같은 프로세스)
+    result["server_peak_rss_mb"] = peak_rss_mb(resource.RUSAGE_CHILDREN) if mode != "inproc" else 0.0
+    with open(args.result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def run_mode_process(mode: str) -> dict:
+    """모드 하나를 새 프로세스에서 실행 - ru_maxrss는 프로세스 수명 전체의 최대값이므로 모드마다 분리"""
+    fd, result_file = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], "--run-mode", mode, "--result-file", result_file],
+            env=dict(os.environ),
+            check=True,
+        )
+        with open(result_file, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(result_file)
+
+
+def print_results(results: dict):
+    print(f"\n{'mode':<8} {'turns/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'rss':>8} {'server':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['turns_per_sec']:>9.1f} {r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms "
+              f"{r['p99_ms']:>7.1f}ms {r['peak_rss_mb']:>6.0f}MB {r['server_peak_rss_mb']:>6.0f}MB")
+        for node, n in r["nodes"].items():
+            print(f"    {node:<8} {n['calls']:>6}회  평균 {n['mean_ms']:.2f}ms")
+
+
+def compare(baseline: dict, current: dict):
+    """이전 결과 대비 변화율 출력"""
+    print("\n기준 대비 변화:")
+    for mode, r in current["results"].items():
+        base = baseline.get("results", {}).get(mode)
+        if base is None:
+            continue
+        for metric in ("turns_per_sec", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb", "server_peak_rss_mb"):
+            if metric not in base:
+                continue
+            before, after = base[metric], r[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"  {mode:<8} {metric:<14} {before:>10.2f} → {after:>10.2f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엔드투엔드 그래프 벤치마크")
+    parser.add_argument("--conversations", type=int, default=20, help="동시 대화 수")
+    parser.add_argument("--turns", type=int, default=4, help="대화당 턴 수")
+    parser.add_argument("--modes", nargs="+", default=["stdio", "sse"],
+                        choices=["stdio", "sse", "inproc"], help="측정할 MCP 모드")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="가짜 LLM 호출 지연")
+    parser.add_argument("--token-delay-ms", type=float, default=0.0, help="가짜 LLM 토큰 간 지연")
+    parser.add_argument("--backend-latency-ms", type=float, default=0.0, help="백엔드 대역 요청 지연")
+    parser.add_argument("--seed-memos", type=int, default=10, help="미리 만들어 둘 메모 수")
+    parser.add_argument("--fast-path", action="store_true", help="빠른 경로 라우터 사용")
+    parser.add_argument("--direct-answer", action="store_true", help="CRUD 도구 결과를 템플릿으로 바로 응답")
+    parser.add_argument("--port", type=int, default=8765, help="백엔드 대역 포트")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    # 모드별 하위 프로세스 내부용
+    parser.add_argument("--run-mode", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_single(args)
+        return
+
+    # ChatOpenAI 생성에 필요한 키 (실제 호출은 하지 않음)
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    # 동시 대화가 같은 세션을 쓰는 inproc/stdio 모드에서 속도 제한에 걸리지 않도록 해제
+    os.environ.setdefault("MCP_SESSION_RATE", "0")
+
+    results = {}
+    with BackgroundBackend(port=args.port, latency=args.backend_latency_ms / 1000) as backend:
+        os.environ["MEMO_API_URL"] = backend.url
+        for i in range(args.seed_memos):
+            backend.store.create(f"시드 메모 {i + 1}", "벤치마크용 메모")
+
+        for mode in args.modes:
+            results[mode] = run_mode_process(mode)
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "run_mode", "result_file")},
+        "results": results,
+        "timestamp": time.time(),
+    }
+
+    print_results(results)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
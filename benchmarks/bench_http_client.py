@@ -0,0 +1,89 @@
+"""공유 HTTP 클라이언트 벤치마크
+
+도구 호출마다 httpx.AsyncClient를 새로 만드는 기존 방식과
+커넥션 풀을 공유하는 방식의 초당 도구 호출 수를 비교합니다.
+
+사용법:
+    python benchmarks/bench_http_client.py --calls 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from fake_backend import BackgroundBackend
+
+# mcp-server 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "mcp-server"))
+
+
+async def per_call_get_memo(api_base: str, memo_id: int):
+    """기존 방식: 호출마다 새 클라이언트"""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{api_base}/{memo_id}")
+        response.raise_for_status()
+        return response.json()
+
+
+async def run(label: str, call, calls: int, concurrency: int) -> float:
+    """calls번 호출을 concurrency 동시성으로 실행하고 초당 호출 수 반환"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await call(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+    rate = calls / elapsed
+    print(f"{label:<12} {calls}회 / {elapsed:.2f}s = {rate:,.0f} calls/s")
+    return rate
+
+
+async def main_async(args):
+    import tools
+    import cache
+    import http_client
+    import singleflight
+
+    # 매 호출이 백엔드까지 가도록 캐시와 요청 합치기 끔 (커넥션 재사용 효과만 비교)
+    cache.CACHE_ENABLED = False
+    singleflight.SINGLEFLIGHT_ENABLED = False
+
+    memo = await tools.create_memo(title="bench", content="x" * 200)
+    memo_id = memo["id"]
+
+    # 워밍업
+    await per_call_get_memo(tools.API_BASE, memo_id)
+    await tools.get_memo(memo_id)
+
+    per_call = await run(
+        "per-call", lambda i: per_call_get_memo(tools.API_BASE, memo_id), args.calls, args.concurrency
+    )
+    pooled = await run(
+        "pooled", lambda i: tools.get_memo(memo_id), args.calls, args.concurrency
+    )
+    await http_client.close_client()
+
+    print(f"\n공유 클라이언트 속도 향상: x{pooled / per_call:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 HTTP 클라이언트 벤치마크")
+    parser.add_argument("--calls", type=int, default=1000, help="측정할 도구 호출 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 호출 수")
+    parser.add_argument("--port", type=int, default=8765, help="백엔드 대역 포트")
+    args = parser.parse_args()
+
+    with BackgroundBackend(port=args.port) as backend:
+        os.environ["MEMO_API_URL"] = backend.url
+        asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""MCP HTTP 서버 부하 테스트 - 워커 수에 따른 동시 세션/초당 도구 호출 수
+
+워커 수별로 mcp_server_sse.py(streamable-HTTP)를 띄우고, 여러 클라이언트 프로세스에서
+동시에 MCP 세션을 열어 get_memo를 반복 호출합니다.
+백엔드 대역도 별도 프로세스로 실행하여 측정 프로세스와 GIL을 나누지 않도록 합니다.
+
+사용법:
+    python benchmarks/bench_mcp_server.py --workers 1 2 4 --sessions 32 --calls 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bench_mcp_transport import percentile, wait_for_port
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def wait_for_health(url: str, timeout: float = 30.0):
+    """/health가 200을 반환할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url} 응답이 없습니다.")
+
+
+async def _session_load(url: str, calls: int, memo_ids: int, offset: int, latencies: list) -> int:
+    """세션 하나를 열고 get_memo를 calls번 호출, 실패 수 반환"""
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    errors = 0
+    async with streamablehttp_client(url) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            for i in range(calls):
+                started = time.perf_counter()
+                result = await session.call_tool("get_memo", {"memo_id": (offset + i) % memo_ids + 1})
+                latencies.append(time.perf_counter() - started)
+                errors += int(result.isError)
+    return errors
+
+
+def client_process(url: str, sessions: int, calls: int, memo_ids: int, offset: int):
+    """클라이언트 프로세스 하나 - 세션 여러 개를 동시에 실행"""
+    async def run():
+        latencies = []
+        results = await asyncio.gather(
+            *(_session_load(url, calls, memo_ids, offset + s * calls, latencies) for s in range(sessions)),
+            return_exceptions=True,
+        )
+        errors = sum(r if isinstance(r, int) else calls for r in results)
+        return latencies, errors
+
+    return asyncio.run(run())
+
+
+def bench_workers(workers: int, args, env: dict) -> dict:
+    """워커 수 하나에 대한 부하 측정"""
+    server = subprocess.Popen(
+        [sys.executable, str(ROOT / "mcp-server" / "mcp_server_sse.py"),
+         "--transport", "http", "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_health(f"http://127.0.0.1:{args.port}/health")
+        url = f"http://127.0.0.1:{args.port}/mcp"
+        per_proc = max(1, args.sessions // args.client_procs)
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(args.client_procs) as pool:
+            futures = [
+                pool.submit(client_process, url, per_proc, args.calls, args.seed, p * per_proc * args.calls)
+                for p in range(args.client_procs)
+            ]
+            outcomes = [f.result() for f in futures]
+        wall = time.perf_counter() - started
+    finally:
+        # SIGTERM으로 정상 종료 (진행 중인 요청은 MCP_HTTP_GRACEFUL_TIMEOUT까지 대기)
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = [l for lat, _ in outcomes for l in lat]
+    return {
+        "workers": workers,
+        "sessions": per_proc * args.client_procs,
+        "calls": len(latencies),
+        "errors": sum(errors for _, errors in outcomes),
+        "calls_per_sec": len(latencies) / wall,
+        "p50_ms": percentile(latencies, 50) * 1000 if latencies else 0.0,
+        "p95_ms": percentile(latencies, 95) * 1000 if latencies else 0.0,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP HTTP 서버 부하 테스트")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="측정할 워커 수")
+    parser.add_argument("--sessions", type=int, default=32, help="동시 MCP 세션 수")
+    parser.add_argument("--calls", type=int, default=50, help="세션당 도구 호출 수")
+    parser.add_argument("--client-procs", type=int, default=4, help="클라이언트 프로세스 수")
+    parser.add_argument("--backend-latency-ms", type=float, default=5.0, help="백엔드 대역 요청 지연")
+    parser.add_argument("--seed", type=int, default=200, help="백엔드 대역 메모 수")
+    parser.add_argument("--cache", action="store_true", help="MCP 서버 메모 캐시 사용 (기본: 끔)")
+    parser.add_argument("--port", type=int, default=8011, help="MCP 서버 포트")
+    parser.add_argument("--backend-port", type=int, default=8766, help="백엔드 대역 포트")
+    args = parser.parse_args()
+
+    backend = subprocess.Popen(
+        [sys.executable, str(ROOT / "benchmarks" / "fake_backend.py"),
+         "--port", str(args.backend_port), "--latency-ms", str(args.backend_latency_ms), "--seed", str(args.seed)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    env = dict(
+        os.environ,
+        MEMO_API_URL=f"http://127.0.0.1:{args.backend_port}",
+        MEMO_CACHE_ENABLED="true" if args.cache else "false",
+        # stateless 모드에서는 클라이언트 주소별로 제한되어 모든 세션이 같은 버킷을 쓰므로 해제
+        MCP_SESSION_RATE=os.environ.get("MCP_SESSION_RATE", "0"),
+    )
+    results = []
+    try:
+        wait_for_port(args.backend_port)
+        for workers in args.workers:
+            results.append(bench_workers(workers, args, env))
+    finally:
+        backend.terminate()
+        backend.wait(timeout=10)
+
+    print(f"\n{'workers':>7} {'sessions':>8} {'calls':>7} {'errors':>6} {'calls/s':>9} {'p50':>9} {'p95':>9}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['sessions']:>8} {r['calls']:>7} {r['errors']:>6} {r['calls_per_sec']:>9.1f} "
+              f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms")
+    print(f"\n※ CPU 코어 {os.cpu_count()}개 - 워커 수가 코어 수를 넘으면 처리량이 늘지 않습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""MCP 전송 모드 벤치마크 (stdio / sse / inproc)
+
+모드별로 연결 시작 시간(세션 생성 + initialize + list_tools)과
+도구 호출(get_memo) 지연 시간을 측정합니다.
+
+사용법:
+    python benchmarks/bench_mcp_transport.py --calls 200
+    python benchmarks/bench_mcp_transport.py --modes stdio inproc
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from fake_backend import BackgroundBackend
+
+ROOT = Path(__file__).resolve().parent.parent
+# chatbot 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(ROOT / "chatbot"))
+
+SSE_PORT = 8001
+
+
+def wait_for_port(port: int, timeout: float = 30.0):
+    """포트가 열릴 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"포트 {port}가 열리지 않았습니다.")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def bench_mode(mode: str, calls: int, memo_id: int) -> dict:
+    """한 모드의 시작 시간과 호출 지연 시간 측정"""
+    import nodes
+
+    async with AsyncExitStack() as stack:
+        started = time.perf_counter()
+        session = await nodes.open_mcp_session(stack, mode)
+        await session.initialize()
+        await session.list_tools()
+        startup = time.perf_counter() - started
+
+        # 워밍업
+        await session.call_tool("get_memo", {"memo_id": memo_id})
+
+        latencies = []
+        for _ in range(calls):
+            call_started = time.perf_counter()
+            result = await session.call_tool("get_memo", {"memo_id": memo_id})
+            latencies.append(time.perf_counter() - call_started)
+            if result.isError:
+                raise RuntimeError(result.content)
+
+    return {
+        "mode": mode,
+        "startup_ms": startup * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+async def main_async(args, memo_id: int):
+    results = []
+    for mode in args.modes:
+        results.append(await bench_mode(mode, args.calls, memo_id))
+
+    print(f"\n{'mode':<8} {'startup':>10} {'p50':>9} {'p95':>9} {'mean':>9}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['startup_ms']:>8.1f}ms {r['p50_ms']:>7.2f}ms {r['p95_ms']:>7.2f}ms {r['mean_ms']:>7.2f}ms")
+    if "sse" in args.modes:
+        print("\n※ sse 시작 시간에는 이미 떠 있는 서버 프로세스의 기동 시간이 포함되지 않습니다.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 전송 모드 벤치마크")
+    parser.add_argument("--calls", type=int, default=200, help="모드별 도구 호출 수")
+    parser.add_argument("--modes", nargs="+", default=["stdio", "sse", "inproc"],
+                        choices=["stdio", "sse", "inproc"], help="측정할 모드")
+    parser.add_argument("--port", type=int, default=8765, help="백엔드 대역 포트")
+    args = parser.parse_args()
+
+    with BackgroundBackend(port=args.port) as backend:
+        # stdio/sse 서버 프로세스와 inproc 서버가 모두 백엔드 대역을 보도록 설정
+        os.environ["MEMO_API_URL"] = backend.url
+        # 호출 지연 시간만 측정하도록 세션별 속도 제한 해제
+        os.environ.setdefault("MCP_SESSION_RATE", "0")
+        memo_id = backend.store.create("bench", "x" * 200)["id"]
+
+        sse_process = None
+        if "sse" in args.modes:
+            sse_process = subprocess.Popen(
+                [sys.executable, str(ROOT / "mcp-server" / "mcp_server_sse.py")],
+                env=dict(os.environ),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            wait_for_port(SSE_PORT)
+        try:
+            asyncio.run(main_async(args, memo_id))
+        finally:
+            if sse_process is not None:
+                sse_process.terminate()
+                sse_process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
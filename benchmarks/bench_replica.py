@@ -0,0 +1,107 @@
+"""메모 로컬 복제본 읽기 지연 벤치마크
+
+지연이 있는 백엔드 대역에 대해 get_memo/list_memos를 원격 경로(복제본, 캐시 끔)와
+로컬 복제본 경로로 각각 호출하여 호출당 지연(p50/p95)을 비교하고,
+복제본의 전체/증분 동기화 시간도 측정합니다.
+
+사용법:
+    python benchmarks/bench_replica.py --memos 500 --calls 500 --latency-ms 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fake_backend import BackgroundBackend
+
+# mcp-server 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "mcp-server"))
+
+
+def percentile(samples, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def measure(label: str, call, calls: int) -> float:
+    """calls번 순차 호출하고 호출당 지연 출력, p50(ms) 반환"""
+    samples = []
+    for i in range(calls):
+        started = time.perf_counter()
+        await call(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    p50 = statistics.median(samples)
+    print(f"{label:<22} p50 {p50:8.3f}ms  p95 {percentile(samples, 0.95):8.3f}ms")
+    return p50
+
+
+async def main_async(args, backend):
+    import tools
+    import cache
+    import replica
+    import http_client
+
+    # 원격 경로는 매번 백엔드까지 가도록 캐시 끔
+    cache.CACHE_ENABLED = False
+    ids = sorted(backend.store.memos)
+    rng = random.Random(0)
+    pick = [rng.choice(ids) for _ in range(args.calls)]
+    pages = [rng.randrange(0, max(1, len(ids) - 10)) for _ in range(args.calls)]
+
+    print(f"메모 {len(ids)}개, 백엔드 지연 {args.latency_ms}ms, 호출 {args.calls}회 (순차)\n")
+    await tools.get_memo(ids[0])  # 워밍업 (연결 수립)
+
+    remote_get = await measure("get_memo 원격", lambda i: tools.get_memo(pick[i]), args.calls)
+    remote_list = await measure("list_memos 원격", lambda i: tools.list_memos(skip=pages[i], limit=10), args.calls)
+
+    replica.REPLICA_ENABLED = True
+    tools.start_replica()
+    started = time.perf_counter()
+    await tools.refresh_replica()
+    full_ms = (time.perf_counter() - started) * 1000
+
+    local_get = await measure("get_memo 복제본", lambda i: tools.get_memo(pick[i]), args.calls)
+    local_list = await measure("list_memos 복제본", lambda i: tools.list_memos(skip=pages[i], limit=10), args.calls)
+    await measure("get_memo fresh=True", lambda i: tools.get_memo(pick[i], fresh=True), min(args.calls, 100))
+
+    # 다른 클라이언트가 일부 메모를 수정한 뒤 증분 동기화
+    with backend.store.lock:
+        for memo_id in ids[:args.changes]:
+            backend.store.memos[memo_id]["title"] = f"변경 {memo_id}"
+            backend.store.memos[memo_id]["updated_at"] = datetime.now().isoformat()
+    started = time.perf_counter()
+    stats = await tools.refresh_replica()
+    delta_ms = (time.perf_counter() - started) * 1000
+    changed = (await tools.get_memo(ids[0]))["title"]
+
+    print(f"\n전체 동기화 {full_ms:.1f}ms, 증분 동기화({args.changes}건 변경) {delta_ms:.1f}ms → {changed!r}")
+    print(f"복제본 통계: {stats}")
+    print(f"\nget_memo p50 x{remote_get / local_get:,.0f}, list_memos p50 x{remote_list / local_list:,.0f}")
+
+    await tools.stop_replica()
+    await http_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메모 로컬 복제본 읽기 지연 벤치마크")
+    parser.add_argument("--memos", type=int, default=500, help="미리 만들어 둘 메모 수")
+    parser.add_argument("--calls", type=int, default=300, help="경로별 호출 수")
+    parser.add_argument("--changes", type=int, default=5, help="증분 동기화 전에 바꿀 메모 수")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="백엔드 요청마다 추가할 지연")
+    parser.add_argument("--port", type=int, default=8765, help="백엔드 대역 포트")
+    args = parser.parse_args()
+
+    with BackgroundBackend(port=args.port, latency=args.latency_ms / 1000) as backend:
+        for i in range(args.memos):
+            backend.store.create(f"시드 메모 {i + 1}", "복제본 벤치마크용 메모")
+        os.environ["MEMO_API_URL"] = backend.url
+        asyncio.run(main_async(args, backend))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""벤치마크용 메모 백엔드 대역 (/api/v1/memos REST API 인메모리 구현)
+
+실제 FastAPI/PostgreSQL 백엔드 없이 MCP 도구를 측정할 수 있도록
+동일한 엔드포인트를 Starlette로 제공합니다.
+latency를 주면 요청마다 그만큼 대기하여 DB/네트워크 지연을 흉내 냅니다.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class MemoStore:
+    """인메모리 메모 저장소"""
+
+    def __init__(self):
+        self.memos = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def create(self, title, content=None):
+        with self.lock:
+            now = datetime.now().isoformat()
+            memo = {
+                "id": self.next_id,
+                "title": title,
+                "content": content,
+                "created_at": now,
+                "updated_at": now,
+            }
+            self.memos[self.next_id] = memo
+            self.next_id += 1
+            return dict(memo)
+
+
+def create_app(store: MemoStore, latency: float = 0.0) -> Starlette:
+    """메모 REST API 앱 생성"""
+
+    async def memos(request: Request):
+        if latency:
+            await asyncio.sleep(latency)
+        if request.method == "POST":
+            data = await request.json()
+            return JSONResponse(store.create(data["title"], data.get("content")), status_code=201)
+
+        skip = int(request.query_params.get("skip", 0))
+        limit = int(request.query_params.get("limit", 10))
+        items = sorted(store.memos.values(), key=lambda m: m["id"])
+        # 증분 동기화용 필터 (실제 백엔드에는 없을 수 있음)
+        updated_since = request.query_params.get("updated_since")
+        if updated_since:
+            items = [m for m in items if m["updated_at"] > updated_since]
+        return JSONResponse(items[skip:skip + limit])
+
+    async def memo(request: Request):
+        if latency:
+            await asyncio.sleep(latency)
+        memo_id = int(request.path_params["memo_id"])
+        current = store.memos.get(memo_id)
+        if current is None:
+            return JSONResponse({"detail": "Memo not found"}, status_code=404)
+
+        if request.method == "GET":
+            return JSONResponse(current)
+        if request.method == "PUT":
+            data = await request.json()
+            with store.lock:
+                current.update({k: v for k, v in data.items() if k in ("title", "content")})
+                current["updated_at"] = datetime.now().isoformat()
+            return JSONResponse(current)
+
+        with store.lock:
+            store.memos.pop(memo_id, None)
+        return Response(status_code=204)
+
+    return Starlette(routes=[
+        Route("/api/v1/memos", memos, methods=["GET", "POST"]),
+        Route("/api/v1/memos/{memo_id:int}", memo, methods=["GET", "PUT", "DELETE"]),
+    ])
+
+
+class BackgroundBackend:
+    """별도 스레드에서 uvicorn으로 백엔드 대역 실행"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, store: MemoStore = None, latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.store = store or MemoStore()
+        config = uvicorn.Config(create_app(self.store, latency), host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def main():
+    """백엔드 대역을 별도 프로세스로 실행 (부하 테스트용)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="메모 백엔드 대역")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="요청마다 추가할 지연")
+    parser.add_argument("--seed", type=int, default=0, help="미리 만들어 둘 메모 수")
+    args = parser.parse_args()
+
+    store = MemoStore()
+    for i in range(args.seed):
+        store.create(f"시드 메모 {i + 1}", "부하 테스트용 메모")
+    uvicorn.run(create_app(store, args.latency_ms / 1000), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""벤치마크용 스크립트 채팅 모델 - OpenAI 없이 결정적인 도구 호출 생성
+
+마지막 메시지를 보고 규칙대로 응답합니다.
+- 사용자 메시지: 내용에 맞는 메모 도구 호출 (목록/조회/생성/수정/삭제)
+- 도구 결과: 결과를 요약하는 최종 답변 (토큰 단위 스트리밍 지원)
+
+호출 지연(latency)과 토큰 간 지연(token_delay)으로 실제 LLM의 응답 시간을 흉내 냅니다.
+"""
+import asyncio
+import json
+import re
+import uuid
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class ScriptedChatModel(BaseChatModel):
+    """규칙 기반 가짜 채팅 모델"""
+
+    latency: float = 0.0
+    """응답 전 대기 시간(초) - 첫 토큰까지의 시간"""
+
+    token_delay: float = 0.0
+    """스트리밍 시 토큰 사이 대기 시간(초)"""
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        # 규칙으로 도구를 고르므로 스키마는 사용하지 않음
+        return self
+
+    def _decide(self, messages: List[BaseMessage]) -> AIMessage:
+        """마지막 메시지에 대한 결정적 응답"""
+        last = messages[-1]
+
+        if isinstance(last, ToolMessage):
+            preview = " ".join(str(last.content).split())[:80]
+            return AIMessage(content=f"요청하신 작업을 완료했습니다. 결과: {preview}")
+
+        if not isinstance(last, HumanMessage):
+            return AIMessage(content="무엇을 도와드릴까요?")
+
+        text = str(last.content)
+        number = re.search(r"(\d+)", text)
+        memo_id = int(number.group(1)) if number else 1
+
+        if "삭제" in text or "delete" in text.lower():
+            call = ("delete_memo", {"memo_id": memo_id})
+        elif "수정" in text or "변경" in text:
+            call = ("update_memo", {"memo_id": memo_id, "title": f"수정된 메모 {memo_id}"})
+        elif "만들" in text or "생성" in text or "create" in text.lower():
+            title = re.search(r"'([^']+)'", text)
+            call = ("create_memo", {"title": title.group(1) if title else "벤치마크 메모", "content": text})
+        elif number:
+            call = ("get_memo", {"memo_id": memo_id})
+        else:
+            call = ("list_memos", {"skip": 0, "limit": 10})
+
+        name, args = call
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}"}])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._decide(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._generate(messages, stop, **kwargs)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self._decide(messages)
+
+        if message.tool_calls:
+            chunk = ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(message.tool_calls)
+                ],
+            ))
+            if run_manager:
+                await run_manager.on_llm_new_token("", chunk=chunk)
+            yield chunk
+            return
+
+        for token in re.split(r"(\s)", message.content):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
@@ -0,0 +1,263 @@
+"""메모장 챗봇 배치 실행 - JSONL 프롬프트 파일을 그래프로 동시 처리
+
+입력 파일을 한 줄씩 읽으며 세션별로 나누어 실행하고, 결과와 턴별 소요 시간을
+끝나는 대로 JSONL로 기록합니다. (입력 전체를 메모리에 올리지 않음)
+
+입력 줄 형식 (JSON 객체 또는 문자열):
+    {"prompt": "메모 목록 보여줘", "session_id": "user-1", "id": "q1"}
+    - 프롬프트: prompt, message, body 중 처음 있는 필드
+    - session_id가 같은 줄은 파일 순서대로 같은 대화에서 실행, 없으면 줄마다 독립된 대화
+      (체크포인트가 없으면 대화 상태는 최근 BATCH_MAX_SESSIONS개 세션만 메모리에 유지 -
+       그보다 오래 쉬었던 세션의 다음 줄은 새 대화로 시작)
+    - id(또는 request_id)는 결과에 그대로 기록
+
+결과 줄 형식:
+    {"line", "id", "session_id", "reply", "error", "wait_s", "elapsed_s", "tools", "trace_id"}
+    (완료 순서로 기록되므로 입력 순서와 다를 수 있음, line으로 대응)
+
+사용법:
+    python chatbot/batch.py prompts.jsonl --output results.jsonl --workers 8
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, TextIO
+from langchain_core.messages import AIMessage, HumanMessage
+from dotenv import load_dotenv
+
+from graph import create_graph
+from nodes import initialize_mcp_client, cleanup_mcp_client
+from checkpoint import get_store
+import tracing
+import deadline
+
+# 환경 변수 로드
+load_dotenv()
+
+# 동시에 실행할 세션 수 / 읽어 두고 기다리는 최대 줄 수 (워커 수의 배수)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+BATCH_READ_AHEAD = int(os.getenv("BATCH_READ_AHEAD", "4"))
+# 체크포인트가 없을 때 메모리에 대화 상태를 유지할 유휴 세션 수
+BATCH_MAX_SESSIONS = int(os.getenv("BATCH_MAX_SESSIONS", "1000"))
+
+PROMPT_FIELDS = ("prompt", "message", "body")
+ID_FIELDS = ("id", "request_id")
+
+
+class BatchSession:
+    """세션 하나의 대기 중인 턴과 대화 상태"""
+
+    __slots__ = ("id", "pending", "state", "scheduled")
+
+    def __init__(self, session_id: Optional[str]):
+        self.id = session_id
+        self.pending: Deque[Dict[str, Any]] = deque()
+        self.state: Optional[Dict[str, Any]] = None
+        self.scheduled = False
+
+
+def parse_line(line_no: int, raw: str) -> Dict[str, Any]:
+    """입력 한 줄을 턴 항목으로 변환 (형식 오류는 error에 기록)"""
+    item = {"line": line_no, "id": None, "session_id": None, "prompt": None, "error": None}
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        item["error"] = f"JSON 형식 오류: {e}"
+        return item
+
+    if isinstance(data, str):
+        item["prompt"] = data
+        return item
+    if not isinstance(data, dict):
+        item["error"] = "JSON 객체 또는 문자열이어야 합니다."
+        return item
+
+    item["prompt"] = next((data[f] for f in PROMPT_FIELDS if isinstance(data.get(f), str)), None)
+    item["id"] = next((data[f] for f in ID_FIELDS if data.get(f) is not None), None)
+    if data.get("session_id") is not None:
+        item["session_id"] = str(data["session_id"])
+    if not item["prompt"]:
+        item["error"] = f"프롬프트 필드({', '.join(PROMPT_FIELDS)})가 없습니다."
+    return item
+
+
+class BatchRunner:
+    """세션 간에는 동시에, 세션 안에서는 순서대로 턴을 실행"""
+
+    def __init__(self, app, output: TextIO, workers: int):
+        self.app = app
+        self.output = output
+        self.workers = workers
+        self.sessions: Dict[str, BatchSession] = {}
+        # 대기 중인 턴 없이 상태만 유지하는 세션 (오래 쉰 순서)
+        self.idle: "OrderedDict[str, None]" = OrderedDict()
+        self.ready: asyncio.Queue = asyncio.Queue()
+        # 읽어 두었지만 아직 끝나지 않은 줄 수 제한 (입력 파일 읽기 속도 조절)
+        self.buffer = asyncio.Semaphore(max(1, workers * BATCH_READ_AHEAD))
+        self.unfinished = 0
+        self.drained = asyncio.Event()
+        self.stats = {"turns": 0, "errors": 0, "elapsed_s": 0.0, "evicted_sessions": 0}
+
+    def _write(self, record: Dict[str, Any]):
+        self.output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.output.flush()
+
+    def _finish(self, item: Dict[str, Any], reply: Optional[str], error: Optional[str],
+                started: float, finished: float, tools: list, trace_id: Optional[str]):
+        self._write({
+            "line": item["line"],
+            "id": item["id"],
+            "session_id": item["session_id"],
+            "reply": reply,
+            "error": error,
+            "wait_s": round(started - item["queued_at"], 4),
+            "elapsed_s": round(finished - started, 4),
+            "tools": tools,
+            "trace_id": trace_id,
+        })
+        self.stats["turns"] += 1
+        self.stats["errors"] += int(error is not None)
+        self.stats["elapsed_s"] += finished - started
+        self.buffer.release()
+        self.unfinished -= 1
+        if self.unfinished == 0:
+            self.drained.set()
+
+    def submit(self, item: Dict[str, Any]):
+        """턴 항목을 세션 대기열에 추가하고 실행 중이 아니면 예약"""
+        item["queued_at"] = time.perf_counter()
+        self.unfinished += 1
+        self.drained.clear()
+
+        if item["error"] is not None:
+            self._finish(item, None, item["error"], item["queued_at"], item["queued_at"], [], None)
+            return
+
+        # session_id가 없으면 줄마다 독립된 대화
+        key = item["session_id"] if item["session_id"] is not None else f"#{item['line']}"
+        session = self.sessions.get(key)
+        self.idle.pop(key, None)
+        if session is None:
+            session = self.sessions[key] = BatchSession(item["session_id"])
+        session.pending.append(item)
+        if not session.scheduled:
+            session.scheduled = True
+            self.ready.put_nowait(key)
+
+    async def run_turn(self, session: BatchSession, item: Dict[str, Any]):
+        """한 턴 실행 후 결과 기록"""
+        store = get_store()
+        config = {"configurable": {"thread_id": session.id}} if session.id is not None else None
+        started = time.perf_counter()
+        reply, error, tools, trace_id = None, None, [], None
+        try:
+            if session.state is None:
+                # 체크포인트가 있으면 이전 실행에서 이어가기
+                session.state = store.load(session.id) if store is not None and session.id is not None else {"messages": []}
+            state = {**session.state, "messages": list(session.state["messages"]) + [HumanMessage(content=item["prompt"])]}
+
+            with tracing.trace(thread_id=session.id or f"batch-{item['line']}", line=item["line"]), deadline.turn():
+                trace_id = tracing.current_trace_id()
+                result = await self.app.ainvoke(state, config)
+            new_messages = result["messages"][len(state["messages"]):]
+            tools = [call["name"] for m in new_messages if isinstance(m, AIMessage) for call in m.tool_calls]
+            reply = result["messages"][-1].content
+            session.state = result
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            # 실패한 턴은 대화에 남기지 않음 (체크포인트에는 저장된 단계까지 다시 불러옴)
+            if store is not None and session.id is not None:
+                session.state = None
+        self._finish(item, reply, error, started, time.perf_counter(), tools, trace_id)
+
+    async def worker(self):
+        """예약된 세션에서 턴을 하나씩 꺼내 실행"""
+        while True:
+            key = await self.ready.get()
+            if key is None:
+                return
+            session = self.sessions[key]
+            await self.run_turn(session, session.pending.popleft())
+
+            if session.pending:
+                # 다른 세션도 차례가 오도록 대기열 뒤로
+                self.ready.put_nowait(key)
+                continue
+            session.scheduled = False
+            # 대기 중인 턴이 없는 세션은 정리 (체크포인트가 있으면 다음 턴에서 다시 불러옴)
+            if session.id is None or get_store() is not None:
+                del self.sessions[key]
+                continue
+            # 체크포인트가 없으면 상태를 메모리에 유지하되 가장 오래 쉰 세션부터 버림
+            self.idle[key] = None
+            if len(self.idle) > BATCH_MAX_SESSIONS:
+                evicted, _ = self.idle.popitem(last=False)
+                del self.sessions[evicted]
+                self.stats["evicted_sessions"] += 1
+
+    async def run(self, lines):
+        """입력 줄을 읽으며 실행하고 모든 턴이 끝날 때까지 대기"""
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        try:
+            for line_no, raw in enumerate(lines, 1):
+                if not raw.strip():
+                    continue
+                await self.buffer.acquire()
+                self.submit(parse_line(line_no, raw))
+            if self.unfinished:
+                await self.drained.wait()
+        finally:
+            for _ in workers:
+                self.ready.put_nowait(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def run_batch(input_path: str, output_path: str, workers: int):
+    """배치 실행"""
+    output = sys.stdout if output_path == "-" else open(output_path, "a", encoding="utf-8")
+    started = time.perf_counter()
+    # 결과가 stdout으로 나갈 수 있으므로 연결 메시지 등 나머지 출력은 stderr로
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            await initialize_mcp_client()
+            runner = BatchRunner(create_graph(), output, workers)
+            with open(input_path, encoding="utf-8") as lines:
+                await runner.run(lines)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+            await cleanup_mcp_client()
+
+    wall = time.perf_counter() - started
+    stats = runner.stats
+    print(
+        f"📦 배치 완료: {stats['turns']}턴 (오류 {stats['errors']}) · {wall:.2f}s · "
+        f"{stats['turns'] / wall if wall else 0:.2f} 턴/s · 평균 {stats['elapsed_s'] / max(stats['turns'], 1):.2f}s",
+        file=sys.stderr
+    )
+    if stats["evicted_sessions"]:
+        print(f"🧹 메모리에서 정리한 유휴 세션: {stats['evicted_sessions']}개 (BATCH_MAX_SESSIONS)", file=sys.stderr)
+    if tracing.TRACING_ENABLED:
+        print(f"📈 계측 통계: {tracing.stats()}", file=sys.stderr)
+
+
+def main():
+    """메인 함수"""
+    tracing.configure_logging()
+
+    parser = argparse.ArgumentParser(description="메모장 챗봇 배치 실행")
+    parser.add_argument("input", help="프롬프트 JSONL 파일")
+    parser.add_argument("--output", "-o", default="-", help="결과 JSONL 파일 (기본: stdout, 파일이면 이어쓰기)")
+    parser.add_argument("--workers", "-w", type=int, default=BATCH_WORKERS, help="동시에 실행할 세션 수")
+    args = parser.parse_args()
+
+    asyncio.run(run_batch(args.input, args.output, max(1, args.workers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""로컬 SQLite 대화 체크포인트 - 스레드 ID별 대화 저장/재개
+
+그래프의 각 노드가 끝날 때마다 그 단계에서 새로 생긴 메시지만 추가(append)로
+저장하므로, 단계마다 전체 히스토리를 다시 직렬화하지 않습니다.
+프로세스를 다시 시작해도 같은 thread_id로 대화를 이어갈 수 있습니다.
+
+보존 정책:
+- 스레드별 최근 CHECKPOINT_MAX_MESSAGES개 메시지만 유지 (tool_call/결과 쌍은 함께 유지)
+- CHECKPOINT_RETENTION_DAYS일 동안 갱신되지 않은 스레드는 삭제
+"""
+import os
+import json
+import time
+import sqlite3
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# SQLite 파일 경로 (비어 있으면 체크포인트 비활성화)
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "")
+# 스레드별 최대 보존 메시지 수 (0이면 제한 없음)
+CHECKPOINT_MAX_MESSAGES = int(os.getenv("CHECKPOINT_MAX_MESSAGES", "500"))
+# 갱신되지 않은 스레드 보존 기간 (일, 0이면 무기한)
+CHECKPOINT_RETENTION_DAYS = float(os.getenv("CHECKPOINT_RETENTION_DAYS", "30"))
+# 이 횟수만큼 저장할 때마다 보존 정책 적용
+CHECKPOINT_COMPACT_EVERY = int(os.getenv("CHECKPOINT_COMPACT_EVERY", "200"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL DEFAULT '',
+    summary_upto INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (thread_id, seq)
+);
+"""
+
+
+class CheckpointStore:
+    """스레드별 메시지를 증분 저장하는 SQLite 저장소"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # 스레드별로 이미 저장한 상태 메시지 수 (상태 리스트 기준 인덱스)
+        self._persisted: Dict[str, int] = {}
+        self._writes = 0
+        self.compact()
+
+    def load(self, thread_id: str) -> Dict[str, Any]:
+        """저장된 대화 상태 불러오기 (없으면 빈 상태)"""
+        rows = self.conn.execute(
+            "SELECT message FROM messages WHERE thread_id = ? ORDER BY seq", (thread_id,)
+        ).fetchall()
+        messages = messages_from_dict([json.loads(r[0]) for r in rows])
+        self._persisted[thread_id] = len(messages)
+
+        state: Dict[str, Any] = {"messages": messages}
+        row = self.conn.execute(
+            "SELECT summary, summary_upto FROM threads WHERE thread_id = ?", (thread_id,)
+        ).fetchone()
+        if row and row[0]:
+            state["summary"], state["summary_upto"] = row[0], min(row[1], len(messages))
+        return state
+
+    def save_step(self, thread_id: str, state_messages: List[BaseMessage], update: Dict[str, Any]):
+        """한 단계의 새 메시지와 요약 변경만 저장"""
+        if thread_id not in self._persisted:
+            self._persisted[thread_id] = self._count(thread_id)
+        if len(state_messages) < self._persisted[thread_id]:
+            # 저장된 단계보다 이전 상태로 저장 (예: 취소 직전 마지막 단계 상태를 받지 못함)
+            self._rewind(thread_id, self._persisted[thread_id] - len(state_messages))
+
+        # 아직 저장하지 않은 입력 메시지(사용자 메시지 등) + 노드가 새로 만든 메시지
+        pending = list(state_messages[self._persisted[thread_id]:]) + list(update.get("messages") or [])
+        if not pending and "summary" not in update:
+            return
+
+        now = time.time()
+        with self.conn:
+            if pending:
+                next_seq = self.conn.execute(
+                    "SELECT COALESCE(MAX(seq), -1) + 1 FROM messages WHERE thread_id = ?", (thread_id,)
+                ).fetchone()[0]
+                self.conn.executemany(
+                    "INSERT INTO messages (thread_id, seq, message) VALUES (?, ?, ?)",
+                    [
+                        (thread_id, next_seq + i, json.dumps(message_to_dict(m), ensure_ascii=False))
+                        for i, m in enumerate(pending)
+                    ]
+                )
+            self.conn.execute(
+                "INSERT INTO threads (thread_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (thread_id, now)
+            )
+            if "summary" in update:
+                # summary_upto는 상태 인덱스이므로 DB 기준(압축으로 앞부분이 빠졌을 수 있음)으로 환산
+                dropped = self._persisted[thread_id] + len(pending) - self._count(thread_id)
+                self.conn.execute(
+                    "UPDATE threads SET summary = ?, summary_upto = ? WHERE thread_id = ?",
+                    (update["summary"], max(update.get("summary_upto", 0) - dropped, 0), thread_id)
+                )
+
+        self._persisted[thread_id] += len(pending)
+        self._writes += 1
+        if CHECKPOINT_COMPACT_EVERY and self._writes % CHECKPOINT_COMPACT_EVERY == 0:
+            self.compact()
+
+    def _rewind(self, thread_id: str, count: int):
+        """마지막 count개 메시지를 지워 저장 내용을 호출자의 상태와 다시 맞춤"""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM messages WHERE thread_id = ? AND seq IN "
+                "(SELECT seq FROM messages WHERE thread_id = ? ORDER BY seq DESC LIMIT ?)",
+                (thread_id, thread_id, count)
+            )
+        self._persisted[thread_id] -= count
+
+    def delete(self, thread_id: str):
+        """스레드 삭제"""
+        with self.conn:
+            self.conn.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+            self.conn.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+        self._persisted.pop(thread_id, None)
+
+    def compact(self):
+        """보존 정책 적용 - 오래된 스레드 삭제, 스레드별 메시지 수 제한, 빈 페이지 반환"""
+        with self.conn:
+            if CHECKPOINT_RETENTION_DAYS > 0:
+                cutoff = time.time() - CHECKPOINT_RETENTION_DAYS * 86400
+                expired = [r[0] for r in self.conn.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?", (cutoff,)
+                )]
+                for thread_id in expired:
+                    self.conn.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+                    self.conn.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+                    self._persisted.pop(thread_id, None)
+
+            if CHECKPOINT_MAX_MESSAGES > 0:
+                oversized = self.conn.execute(
+                    "SELECT thread_id FROM messages GROUP BY thread_id HAVING COUNT(*) > ?",
+                    (CHECKPOINT_MAX_MESSAGES,)
+                ).fetchall()
+                for (thread_id,) in oversized:
+                    self._trim_thread(thread_id)
+
+        self.conn.execute("PRAGMA incremental_vacuum")
+
+    def _trim_thread(self, thread_id: str):
+        """최근 메시지만 남기되, 남은 앞부분이 ToolMessage로 시작하지 않도록 자름"""
+        rows = self.conn.execute(
+            "SELECT seq, message FROM messages WHERE thread_id = ? ORDER BY seq DESC LIMIT ?",
+            (thread_id, CHECKPOINT_MAX_MESSAGES)
+        ).fetchall()
+        rows.reverse()
+        while rows and json.loads(rows[0][1]).get("type") == "tool":
+            rows.pop(0)
+        if not rows:
+            return
+
+        first_kept = rows[0][0]
+        removed = self.conn.execute(
+            "DELETE FROM messages WHERE thread_id = ? AND seq < ?", (thread_id, first_kept)
+        ).rowcount
+        self.conn.execute(
+            "UPDATE threads SET summary_upto = MAX(summary_upto - ?, 0) WHERE thread_id = ?",
+            (removed, thread_id)
+        )
+
+    def _count(self, thread_id: str) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM messages WHERE thread_id = ?", (thread_id,)
+        ).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+_store: Optional[CheckpointStore] = None
+
+
+def get_store() -> Optional[CheckpointStore]:
+    """설정된 경우 프로세스 전역 저장소 반환 (비활성화면 None)"""
+    global _store
+
+    if _store is None and CHECKPOINT_DB:
+        _store = CheckpointStore(CHECKPOINT_DB)
+    return _store
+
+
+def thread_id_from(config) -> Optional[str]:
+    """RunnableConfig에서 thread_id 추출"""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def persist_step(node):
+    """노드 실행 후 그 단계의 새 메시지를 저장하도록 감싸는 래퍼
+
+    LangGraph가 config 인자를 넘겨주도록 시그니처를 (state, config)로 둡니다.
+    """
+
+    async def wrapper(state, config):
+        update = await node(state)
+        store = get_store()
+        thread_id = thread_id_from(config)
+        if store is not None and thread_id and isinstance(update, dict):
+            store.save_step(thread_id, state["messages"], update)
+        return update
+
+    return wrapper
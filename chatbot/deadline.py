@@ -0,0 +1,115 @@
+"""턴 마감 시간과 agent ↔ tools 반복 제한
+
+진입점(main.py, service.py, batch.py)이 turn()으로 턴마다 마감 시각을 정하면
+같은 컨텍스트에서 실행되는 그래프 노드가 remaining()으로 남은 시간을 확인합니다.
+
+- call_model: LLM 호출(요약 포함)을 남은 시간 안에서 실행, 넘으면 취소하고 시간 초과 응답
+- call_tools: 남은 시간을 도구 호출 _meta(TIMEOUT_META_KEY)로 MCP 서버에 전달하고, 넘으면 취소
+  (서버에 notifications/cancelled를 보내 진행 중인 백엔드 요청도 중단)
+- 반복 제한: 한 턴에서 도구 단계가 MAX_TOOL_ITERATIONS번을 넘으면 도구를 더 실행하지 않고 종료
+
+마감 시간이 지나도 대화 상태는 항상 도구 호출/결과 쌍이 맞는 상태로 끝납니다.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 턴 하나의 최대 실행 시간(초, 0이면 무제한)
+TURN_TIMEOUT = float(os.getenv("TURN_TIMEOUT", "60"))
+# 한 턴에서 실행할 최대 도구 단계 수 (agent → tools 반복, 0이면 무제한)
+MAX_TOOL_ITERATIONS = int(os.getenv("MAX_TOOL_ITERATIONS", "8"))
+
+# MCP 서버(admission.DeadlineMiddleware)와 약속한 남은 시간(밀리초) _meta 키
+TIMEOUT_META_KEY = "memo/timeout_ms"
+
+TIMEOUT_REPLY = "⏱️ 응답 시간({timeout:g}초)을 넘겨 요청 처리를 중단했습니다."
+CANCELLED_REPLY = "⛔ 요청을 취소했습니다."
+ITERATION_LIMIT_REPLY = (
+    "🔁 도구 실행이 {limit}번 반복되어 요청 처리를 중단했습니다. "
+    "요청을 더 작은 단위로 나누어 다시 시도해 주세요."
+)
+
+# 현재 턴의 마감 시각 (time.monotonic 기준, 없으면 None)
+_deadline: ContextVar[Optional[float]] = ContextVar("turn_deadline", default=None)
+_timeout: ContextVar[float] = ContextVar("turn_timeout", default=0.0)
+
+
+class TurnTimeout(Exception):
+    """턴 마감 시간이 지나 작업을 취소함"""
+
+
+@contextmanager
+def turn(timeout: Optional[float] = None):
+    """with 블록에서 실행하는 턴의 마감 시각 설정 (기본 TURN_TIMEOUT초, 0이면 무제한)"""
+    timeout = TURN_TIMEOUT if timeout is None else timeout
+    deadline_token = _deadline.set(time.monotonic() + timeout if timeout > 0 else None)
+    timeout_token = _timeout.set(timeout)
+    try:
+        yield
+    finally:
+        _deadline.reset(deadline_token)
+        _timeout.reset(timeout_token)
+
+
+def remaining() -> Optional[float]:
+    """마감 시각까지 남은 시간(초, 마감 시간이 없으면 None)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout_reply(done: Optional[List[str]] = None) -> str:
+    """시간 초과 응답 - 이미 끝난 작업이 있으면 함께 안내"""
+    reply = TIMEOUT_REPLY.format(timeout=_timeout.get())
+    if done:
+        reply += "\n\n마감 전에 완료된 작업:\n" + "\n".join(f"- {line}" for line in done)
+    return reply
+
+
+def tool_steps(messages: List[BaseMessage]) -> int:
+    """이번 턴(마지막 사용자 메시지 이후)에 도구를 호출한 agent 단계 수"""
+    steps = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage) and message.tool_calls:
+            steps += 1
+    return steps
+
+
+def over_iteration_limit(messages: List[BaseMessage]) -> bool:
+    return MAX_TOOL_ITERATIONS > 0 and tool_steps(messages) > MAX_TOOL_ITERATIONS
+
+
+def iteration_limit_reply() -> str:
+    return ITERATION_LIMIT_REPLY.format(limit=MAX_TOOL_ITERATIONS)
+
+
+def close_turn(messages: List[BaseMessage], reply: str) -> List[BaseMessage]:
+    """중단된 턴을 끝내는 메시지 - 결과가 없는 도구 호출에 취소 결과를 채우고 reply로 응답
+
+    다음 턴에서 LLM이 짝이 맞지 않는 tool_call을 받지 않도록 합니다.
+    """
+    answered = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    closing: List[BaseMessage] = []
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage) and message.tool_calls:
+            closing.extend(
+                ToolMessage(content="오류 발생: 요청이 중단되어 실행하지 않았습니다.", tool_call_id=call["id"])
+                for call in message.tool_calls if call["id"] not in answered
+            )
+    closing.append(AIMessage(content=reply))
+    return closing
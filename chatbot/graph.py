@@ -9,21 +9,41 @@ class ChatbotState(TypedDict):
     """챗봇 상태 정의"""
     # 메시지 히스토리 (자동으로 메시지를 추가)
     messages: Annotated[Sequence[BaseMessage], add_messages]
+    # 모델 입력에서 제외된 이전 대화의 누적 요약
+    summary: str
+    # 요약에 반영된 앞쪽 메시지 수
+    summary_upto: int
 
 
 def create_graph():
     """LangGraph 워크플로우 생성"""
-    from nodes import call_model, should_continue, call_tools
+    from nodes import call_model, should_continue, call_tools, after_tools
+    from router import route_fast_path, after_router
+    from checkpoint import get_store, persist_step
+    
+    # 체크포인트가 설정되어 있으면 각 노드의 새 메시지를 단계마다 저장
+    wrap = persist_step if get_store() is not None else (lambda node: node)
     
     # 그래프 생성
     workflow = StateGraph(ChatbotState)
     
     # 노드 추가
-    workflow.add_node("agent", call_model)
-    workflow.add_node("tools", call_tools)
+    workflow.add_node("router", wrap(route_fast_path))
+    workflow.add_node("agent", wrap(call_model))
+    workflow.add_node("tools", wrap(call_tools))
+    
+    # 진입점 설정 - 단순 명령은 router에서 바로 처리
+    workflow.set_entry_point("router")
     
-    # 진입점 설정
-    workflow.set_entry_point("agent")
+    # router가 응답했으면 종료, 아니면 LLM 경로로
+    workflow.add_conditional_edges(
+        "router",
+        after_router,
+        {
+            "agent": "agent",
+            "end": END
+        }
+    )
     
     # 조건부 엣지 추가
     # agent 노드 실행 후 도구 호출이 필요한지 확인
@@ -36,8 +56,15 @@ def create_graph():
         }
     )
     
-    # tools 노드 실행 후 다시 agent로
-    workflow.add_edge("tools", "agent")
+    # tools 노드 실행 후 다시 agent로 (템플릿으로 바로 응답했으면 종료)
+    workflow.add_conditional_edges(
+        "tools",
+        after_tools,
+        {
+            "agent": "agent",
+            "end": END
+        }
+    )
     
     # 그래프 컴파일
     return workflow.compile()
@@ -0,0 +1,202 @@
+"""대화 히스토리 관리 - 토큰 예산 내로 모델 입력 메시지 정리
+
+call_model이 model.ainvoke 전에 호출합니다.
+- 메시지 토큰 수 계산
+- tool_call을 가진 AIMessage와 그 ToolMessage들을 한 단위로 유지
+- 이전 턴의 큰 도구 결과는 짧은 안내 문구로 대체
+- 예산을 넘으면 오래된 단위부터 제외 (선택적으로 누적 요약에 반영)
+"""
+import os
+import json
+from functools import lru_cache
+from typing import List, Optional, Tuple, Dict, Any
+from langchain_core.messages import (
+    BaseMessage,
+    AIMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 모델 입력 토큰 예산 (0이면 히스토리 관리 비활성화)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "8000"))
+# 이전 턴의 도구 결과가 이 글자 수를 넘으면 안내 문구로 대체
+HISTORY_STUB_TOOL_CHARS = int(os.getenv("HISTORY_STUB_TOOL_CHARS", "500"))
+# 제외된 오래된 턴을 누적 요약으로 유지할지 여부
+HISTORY_SUMMARY = os.getenv("HISTORY_SUMMARY", "false").lower() in ("1", "true", "yes")
+# 토큰 계산용 인코딩 (gpt-4o 계열)
+HISTORY_ENCODING = os.getenv("HISTORY_ENCODING", "o200k_base")
+
+# 메시지당 고정 오버헤드 (역할, 구분자)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = (
+    "다음은 메모 관리 챗봇과 사용자의 이전 대화입니다. "
+    "이후 대화에 필요한 사실(메모 ID, 제목, 사용자의 요청과 결과)만 "
+    "간결한 한국어로 요약하세요.\n\n"
+    "기존 요약:\n{summary}\n\n"
+    "새로 요약할 대화:\n{conversation}"
+)
+
+_encoding = None
+
+
+def _get_encoding():
+    """tiktoken 인코딩 지연 로드 (없으면 False)"""
+    global _encoding
+
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(HISTORY_ENCODING)
+        except Exception:
+            _encoding = False
+    return _encoding
+
+
+@lru_cache(maxsize=4096)
+def count_text_tokens(text: str) -> int:
+    """문자열 토큰 수 (tiktoken이 없으면 대략 4글자당 1토큰)"""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def count_message_tokens(message: BaseMessage) -> int:
+    """메시지 하나의 토큰 수"""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+    tokens = MESSAGE_OVERHEAD_TOKENS + count_text_tokens(content)
+
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        tokens += count_text_tokens(json.dumps(
+            [{"name": c["name"], "args": c["args"]} for c in tool_calls],
+            ensure_ascii=False
+        ))
+    return tokens
+
+
+def count_tokens(messages: List[BaseMessage]) -> int:
+    """메시지 목록 전체 토큰 수"""
+    return sum(count_message_tokens(m) for m in messages)
+
+
+def group_units(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """메시지를 나눌 수 없는 단위로 묶음
+
+    ToolMessage는 항상 바로 앞 단위(tool_call을 가진 AIMessage)에 붙여
+    잘라낼 때 tool_call과 결과가 분리되지 않도록 합니다.
+    """
+    units: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and units:
+            units[-1].append(message)
+        else:
+            units.append([message])
+    return units
+
+
+def stub_tool_message(message: ToolMessage) -> ToolMessage:
+    """큰 도구 결과를 짧은 안내 문구로 대체 (tool_call_id 유지)"""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    if len(content) <= HISTORY_STUB_TOOL_CHARS:
+        return message
+    return ToolMessage(
+        content=f"[이전 도구 결과 생략: {len(content)}자. 필요하면 도구로 다시 조회하세요]",
+        tool_call_id=message.tool_call_id,
+        id=message.id,
+    )
+
+
+def _last_human_index(messages: List[BaseMessage]) -> int:
+    """마지막 사용자 메시지 위치 (없으면 0)"""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return i
+    return 0
+
+
+def _format_for_summary(messages: List[BaseMessage]) -> str:
+    """요약 모델에 넘길 대화 텍스트"""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"사용자: {message.content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"도구 결과: {str(message.content)[:HISTORY_STUB_TOOL_CHARS]}")
+        elif isinstance(message, AIMessage):
+            if message.tool_calls:
+                calls = ", ".join(f"{c['name']}({json.dumps(c['args'], ensure_ascii=False)})" for c in message.tool_calls)
+                lines.append(f"챗봇 도구 호출: {calls}")
+            if message.content:
+                lines.append(f"챗봇: {message.content}")
+    return "\n".join(lines)
+
+
+async def summarize(summary_model, summary: str, messages: List[BaseMessage]) -> str:
+    """기존 요약에 새로 제외된 메시지를 반영한 누적 요약 생성"""
+    prompt = SUMMARY_PROMPT.format(
+        summary=summary or "(없음)",
+        conversation=_format_for_summary(messages)
+    )
+    response = await summary_model.ainvoke([HumanMessage(content=prompt)])
+    return response.content
+
+
+async def prepare_messages(
+    state: Dict[str, Any],
+    summary_model=None
+) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+    """모델에 보낼 메시지와 상태 갱신값 반환
+
+    Returns:
+        (모델 입력 메시지, 상태 업데이트 - 요약이 바뀐 경우 summary/summary_upto 포함)
+    """
+    messages = list(state["messages"])
+    if HISTORY_TOKEN_BUDGET <= 0:
+        return messages, {}
+
+    summary = state.get("summary") or ""
+    summary_upto = state.get("summary_upto") or 0
+    updates: Dict[str, Any] = {}
+
+    # 마지막 사용자 메시지 이전 턴의 큰 도구 결과는 안내 문구로 대체
+    current_turn = _last_human_index(messages)
+    messages = [
+        stub_tool_message(m) if isinstance(m, ToolMessage) and i < current_turn else m
+        for i, m in enumerate(messages)
+    ]
+
+    # 시스템 메시지는 항상 유지, 이미 요약에 반영된 메시지는 제외
+    system = [m for m in messages[:summary_upto] if isinstance(m, SystemMessage)]
+    rest = messages[summary_upto:]
+    current_turn = max(current_turn - summary_upto, 0)
+
+    def build(kept: List[BaseMessage]) -> List[BaseMessage]:
+        prefix = list(system)
+        if summary:
+            prefix.append(SystemMessage(content=f"이전 대화 요약:\n{summary}"))
+        return prefix + kept
+
+    units = group_units(rest)
+    dropped: List[BaseMessage] = []
+    consumed = 0
+    # 현재 턴(마지막 사용자 메시지부터)은 잘라내지 않음
+    while units and count_tokens(build([m for u in units for m in u])) > HISTORY_TOKEN_BUDGET:
+        if consumed + len(units[0]) > current_turn:
+            break
+        head = units.pop(0)
+        consumed += len(head)
+        dropped.extend(m for m in head if not isinstance(m, SystemMessage))
+        system.extend(m for m in head if isinstance(m, SystemMessage))
+
+    if dropped and summary_model is not None:
+        summary = await summarize(summary_model, summary, dropped)
+        updates = {"summary": summary, "summary_upto": summary_upto + consumed}
+
+    return build([m for u in units for m in u]), updates
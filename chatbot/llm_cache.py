@@ -0,0 +1,202 @@
+"""LLM 응답 캐시 - 정규화된 대화 prefix 기준 (agent 노드용, opt-in)
+
+같은 질문(예: "모든 메모를 보여줘")이 같은/다른 세션에서 반복될 때
+model.ainvoke를 다시 호출하지 않도록 응답을 재사용합니다.
+
+- 키: 정규화한 메시지 히스토리 + 바인딩된 도구 스키마 + 모델 이름 + 쓰기 세대(generation)
+- 도구 호출 응답은 읽기 전용 도구만 호출하는 경우에만 캐시
+- 쓰기 도구(create/update/delete)가 실행되면 세대를 올려 이전 응답을 모두 무효화
+- 메모리 LRU + TTL, 선택적으로 SQLite 파일에도 저장
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 캐시 설정
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+# SQLite 파일 경로 (비어 있으면 메모리에만 저장)
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+
+# 결과를 캐시해도 되는 읽기 전용 도구
+READ_ONLY_TOOLS = set(
+    os.getenv("LLM_CACHE_READ_ONLY_TOOLS", "list_memos,get_memo,get_memos,search_memos,count_memos").split(",")
+)
+# 실행되면 캐시 세대를 올리는 쓰기 도구
+WRITE_TOOLS = {
+    "create_memo", "update_memo", "delete_memo",
+    "create_memos", "update_memos", "delete_memos",
+}
+
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+_generation = 0
+_tool_schema_hash = ""
+_db: Optional[sqlite3.Connection] = None
+_stats = {"hits": 0, "misses": 0, "stores": 0, "uncacheable": 0, "generation_bumps": 0}
+
+
+def _get_db() -> Optional[sqlite3.Connection]:
+    """디스크 캐시 연결 (설정된 경우), 저장된 세대 복원"""
+    global _db, _generation
+
+    if _db is None and LLM_CACHE_DB:
+        _db = sqlite3.connect(LLM_CACHE_DB)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.executescript(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, message TEXT NOT NULL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+        )
+        row = _db.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        if row:
+            _generation = max(_generation, row[0])
+    return _db
+
+
+def set_tool_schema(tools: List[Any], model_name: str = ""):
+    """바인딩된 도구 스키마 해시 설정 - 도구가 바뀌면 이전 응답과 키가 달라짐"""
+    global _tool_schema_hash
+
+    schema = [
+        {"name": t.name, "description": t.description, "args": t.args_schema if isinstance(t.args_schema, dict) else str(t.args_schema)}
+        for t in tools
+    ]
+    payload = json.dumps({"model": model_name, "tools": schema}, ensure_ascii=False, sort_keys=True)
+    _tool_schema_hash = hashlib.sha256(payload.encode()).hexdigest()
+
+
+def bump_generation():
+    """쓰기 도구 실행 후 호출 - 이전에 캐시된 응답은 더 이상 사용되지 않음"""
+    global _generation
+
+    _generation += 1
+    _stats["generation_bumps"] += 1
+    db = _get_db() if LLM_CACHE_ENABLED else None
+    if db is not None:
+        with db:
+            db.execute(
+                "INSERT INTO meta (name, value) VALUES ('generation', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)",
+                (_generation,)
+            )
+
+
+def _normalize(message: BaseMessage) -> Dict[str, Any]:
+    """키 계산용 정규화 - 공백 차이와 무작위 tool_call id는 무시"""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+    normalized = {"type": message.type, "content": " ".join(content.split())}
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        normalized["tool_calls"] = [{"name": c["name"], "args": c["args"]} for c in tool_calls]
+    return normalized
+
+
+def make_key(messages: List[BaseMessage]) -> str:
+    """대화 prefix + 도구 스키마 + 세대로 캐시 키 생성"""
+    payload = json.dumps(
+        {
+            "generation": _generation,
+            "tools": _tool_schema_hash,
+            "messages": [_normalize(m) for m in messages],
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def is_cacheable(response: BaseMessage) -> bool:
+    """최종 응답이거나 읽기 전용 도구만 호출하는 응답만 캐시"""
+    tool_calls = getattr(response, "tool_calls", None) or []
+    return all(c["name"] in READ_ONLY_TOOLS for c in tool_calls)
+
+
+def _fresh_ids(message: AIMessage) -> AIMessage:
+    """캐시 응답을 재사용할 때 메시지/tool_call id를 새로 발급 (같은 대화 내 중복 방지)"""
+    tool_calls = [{**c, "id": f"call_{uuid.uuid4().hex[:24]}"} for c in message.tool_calls]
+    return AIMessage(content=message.content, tool_calls=tool_calls)
+
+
+def lookup(messages: List[BaseMessage]) -> Optional[AIMessage]:
+    """캐시된 응답 조회 (비활성화/미스면 None)"""
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    db = _get_db()
+    key = make_key(messages)
+    now = time.time()
+
+    entry = _entries.get(key)
+    if entry is None:
+        if db is not None:
+            row = db.execute("SELECT message, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                entry = (row[1], messages_from_dict([json.loads(row[0])])[0])
+                _entries[key] = entry
+                if len(_entries) > LLM_CACHE_MAX_ENTRIES:
+                    _entries.popitem(last=False)
+
+    if entry is None or now - entry[0] > LLM_CACHE_TTL:
+        _entries.pop(key, None)
+        _stats["misses"] += 1
+        return None
+
+    _entries.move_to_end(key)
+    _stats["hits"] += 1
+    return _fresh_ids(entry[1])
+
+
+def store(messages: List[BaseMessage], response: BaseMessage):
+    """응답 저장 (캐시 가능한 경우만)"""
+    if not LLM_CACHE_ENABLED or not isinstance(response, AIMessage):
+        return
+    if not is_cacheable(response):
+        _stats["uncacheable"] += 1
+        return
+
+    db = _get_db()
+    key = make_key(messages)
+    now = time.time()
+    # 토큰 사용량 등 호출별 메타데이터는 제외하고 내용과 도구 호출만 보관
+    message = AIMessage(content=response.content, tool_calls=response.tool_calls)
+    _entries[key] = (now, message)
+    _entries.move_to_end(key)
+    while len(_entries) > LLM_CACHE_MAX_ENTRIES:
+        _entries.popitem(last=False)
+    _stats["stores"] += 1
+
+    if db is not None:
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, message, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(message_to_dict(message), ensure_ascii=False), now)
+            )
+            if _stats["stores"] % 100 == 0:
+                # 만료 항목과 최대 개수를 넘는 오래된 항목 정리
+                db.execute("DELETE FROM entries WHERE created_at < ?", (now - LLM_CACHE_TTL,))
+                db.execute(
+                    "DELETE FROM entries WHERE key NOT IN "
+                    "(SELECT key FROM entries ORDER BY created_at DESC LIMIT ?)",
+                    (LLM_CACHE_MAX_ENTRIES,)
+                )
+
+
+def stats() -> Dict[str, Any]:
+    """캐시 적중/미스 통계"""
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        "size": len(_entries),
+        "generation": _generation,
+    }
@@ -1,23 +1,135 @@
-"""메모장 챗봇 실행 스크립트"""
+"""메모장 챗봇 실행 스크립트
+
+사용법:
+    python chatbot/main.py
+    python chatbot/main.py --profile-startup   # 시작 단계별 소요 시간 출력
+"""
+import time
+_import_started = time.perf_counter()
+
+import os
+import signal
 import asyncio
+import argparse
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 
 from graph import create_graph
 from nodes import initialize_mcp_client, cleanup_mcp_client
+from streaming import turn_events
+from checkpoint import get_store
+import router
+import llm_cache
+import tracing
+import startup
+import deadline
+
+# 모듈 import 시간 (그래프/노드 모듈과 langchain_core, langgraph 포함)
+startup.reset(_import_started)
+startup.record("imports", _import_started, time.perf_counter() - _import_started)
 
 # 환경 변수 로드
 load_dotenv()
 
+# 스트리밍 모드 (LLM 토큰과 도구 실행 이벤트를 실시간 출력)
+CHATBOT_STREAMING = os.getenv("CHATBOT_STREAMING", "true").lower() in ("1", "true", "yes")
+# 체크포인트(CHECKPOINT_DB) 사용 시 이어갈 대화 스레드 ID
+CHAT_THREAD_ID = os.getenv("CHAT_THREAD_ID", "repl")
+
+
+def close_cancelled(state):
+    """취소된 턴을 닫은 상태 반환 (짝이 없는 도구 호출 정리, 체크포인트에도 저장)"""
+    closing = deadline.close_turn(state["messages"], deadline.CANCELLED_REPLY)
+    store = get_store()
+    if store is not None:
+        store.save_step(CHAT_THREAD_ID, state["messages"], {"messages": closing})
+    print(f"\n\n{deadline.CANCELLED_REPLY}\n")
+    return {**state, "messages": list(state["messages"]) + closing}
+
+
+async def run_cancellable(turn):
+    """턴을 별도 태스크로 실행 - 실행 중 Ctrl+C는 REPL을 끝내지 않고 이 턴만 취소"""
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(turn)
+    previous = signal.getsignal(signal.SIGINT)
+    try:
+        loop.add_signal_handler(signal.SIGINT, task.cancel)
+    except (NotImplementedError, RuntimeError):
+        # 시그널 핸들러를 지원하지 않는 환경 (Windows 등)
+        previous = None
+    try:
+        return await task
+    finally:
+        if previous is not None:
+            loop.remove_signal_handler(signal.SIGINT)
+            signal.signal(signal.SIGINT, previous)
+
+
+async def invoke_turn(app, state, config=None):
+    """그래프를 스트리밍 없이 실행하고 마지막 응답을 출력한 뒤 최종 상태 반환"""
+    print("\n처리 중...")
+    final_state = state
+    try:
+        # 취소되었을 때 마지막으로 끝난 단계의 상태를 알 수 있도록 단계별 상태를 받음
+        async for final_state in app.astream(state, config, stream_mode="values"):
+            pass
+    except asyncio.CancelledError:
+        return close_cancelled(final_state)
+    
+    print(f"\nBot: {final_state['messages'][-1].content}\n")
+    return final_state
+
+
+async def stream_turn(app, state, config=None):
+    """그래프를 스트리밍으로 실행하며 토큰/도구 이벤트를 출력하고 최종 상태 반환"""
+    started = time.perf_counter()
+    first_output_at = None
+    final_state = state
+    printing_bot = False
+    progress = {"state": state}
+    
+    try:
+        async for event in turn_events(app, state, config, progress):
+            kind = event["type"]
+            if kind != "state" and first_output_at is None:
+                first_output_at = time.perf_counter()
+        
+            if kind in ("token", "message"):
+                if not printing_bot:
+                    print("\nBot: ", end="", flush=True)
+                    printing_bot = True
+                print(event["text"], end="", flush=True)
+            elif kind == "tool_start":
+                if printing_bot:
+                    print()
+                    printing_bot = False
+                print(f"  🔧 {event['name']}({event['args']}) 실행 중...", flush=True)
+            elif kind == "tool_end":
+                status = "✅" if event["ok"] else "❌"
+                print(f"  {status} {event['name']} 완료 ({event['elapsed']:.2f}s)", flush=True)
+            elif kind == "state":
+                final_state = event["state"]
+    except asyncio.CancelledError:
+        return close_cancelled(progress["state"])
+    
+    total = time.perf_counter() - started
+    ttft = (first_output_at - started) if first_output_at else total
+    print(f"\n\n⏱️ 첫 출력 {ttft:.2f}s · 전체 {total:.2f}s\n")
+    return final_state
+
 
-async def run_chatbot():
+async def run_chatbot(profile_startup: bool = False):
     """챗봇 실행"""
     try:
         # MCP 클라이언트 초기화
         await initialize_mcp_client()
         
         # 그래프 생성
-        app = create_graph()
+        with startup.phase("graph.compile"):
+            app = create_graph()
+        
+        if profile_startup:
+            print(f"\n🚦 시작 단계별 소요 시간\n{startup.report()}\n")
         
         print("=" * 60)
         print("🤖 메모장 챗봇에 오신 것을 환영합니다!")
@@ -28,10 +140,14 @@ async def run_chatbot():
         print("    '메모 1번을 조회해줘'")
         print("    '메모 1번의 제목을 변경해줘'")
         print("    '메모 1번을 삭제해줘'")
-        print("\n종료하려면 'quit', 'exit', 또는 '종료'를 입력하세요.\n")
+        print("\n종료하려면 'quit', 'exit', 또는 '종료'를 입력하세요. (응답 중 Ctrl+C는 현재 요청만 취소)\n")
         
-        # 대화 히스토리 (상태로 관리)
-        state = {"messages": []}
+        # 대화 히스토리 (상태로 관리) - 체크포인트가 있으면 이전 대화 이어가기
+        config = {"configurable": {"thread_id": CHAT_THREAD_ID}}
+        store = get_store()
+        state = store.load(CHAT_THREAD_ID) if store is not None else {"messages": []}
+        if state["messages"]:
+            print(f"💾 스레드 '{CHAT_THREAD_ID}'의 이전 대화 {len(state['messages'])}개 메시지를 불러왔습니다.\n")
         
         while True:
             try:
@@ -49,17 +165,10 @@ async def run_chatbot():
                 # 사용자 메시지 추가
                 state["messages"].append(HumanMessage(content=user_input))
                 
-                # 그래프 실행
-                print("\n처리 중...")
-                result = await app.ainvoke(state)
-                
-                # 상태 업데이트
-                state = result
-                
-                # 마지막 응답 출력
-                last_message = result["messages"][-1]
-                
-                print(f"\nBot: {last_message.content}\n")
+                # 그래프 실행 (TRACE_EXPORTER 설정 시 턴마다 새 trace, TURN_TIMEOUT초 마감 시간)
+                turn = stream_turn if CHATBOT_STREAMING else invoke_turn
+                with tracing.trace(thread_id=CHAT_THREAD_ID), deadline.turn():
+                    state = await run_cancellable(turn(app, state, config))
                 
             except KeyboardInterrupt:
                 print("\n\n챗봇을 종료합니다. 좋은 하루 되세요!")
@@ -68,13 +177,26 @@ async def run_chatbot():
                 print(f"\n❌ 오류 발생: {e}")
                 print("FastAPI 백엔드가 실행 중인지 확인하세요 (http://localhost:8000)\n")
     finally:
+        # 빠른 경로 통계 출력
+        if router.FAST_PATH_ENABLED:
+            print(f"⚡ 빠른 경로 통계: {router.stats()}")
+        if llm_cache.LLM_CACHE_ENABLED:
+            print(f"🗃️ LLM 응답 캐시 통계: {llm_cache.stats()}")
+        if tracing.TRACING_ENABLED:
+            print(f"📈 계측 통계: {tracing.stats()}")
+        
         # MCP 클라이언트 정리
         await cleanup_mcp_client()
 
 
 def main():
     """메인 함수"""
-    asyncio.run(run_chatbot())
+    parser = argparse.ArgumentParser(description="메모장 챗봇")
+    parser.add_argument("--profile-startup", action="store_true", help="시작 단계별 소요 시간 출력")
+    args = parser.parse_args()
+
+    tracing.configure_logging()
+    asyncio.run(run_chatbot(profile_startup=args.profile_startup))
 
 
 if __name__ == "__main__":
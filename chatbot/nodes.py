@@ -3,112 +3,288 @@ import os
 import sys
 import json
 import asyncio
-from typing import Literal
+import logging
+from typing import TYPE_CHECKING, Any, Literal, Tuple
 from contextlib import AsyncExitStack
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from dotenv import load_dotenv
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from mcp.client.sse import sse_client
-from langchain_mcp import MCPToolkit
+
+import history
+import llm_cache
+import tracing
+import tool_results
+import replies
+import startup
+import tool_cache
+import deadline
+
+# langchain_openai, mcp 전송 계층, langchain_mcp는 import 비용이 커서 사용하는 시점에 import
+# (사용하지 않는 전송 방식은 import하지 않고, 모델 생성은 MCP 연결과 동시에 진행)
+if TYPE_CHECKING:
+    from mcp import ClientSession
 
 # 환경 변수 로드
 load_dotenv()
 
 # MCP 연결 모드 설정
-MCP_MODE = os.getenv("MCP_MODE", "stdio")  # "stdio" 또는 "sse"
+MCP_MODE = os.getenv("MCP_MODE", "stdio")  # "stdio", "sse", "http" 또는 "inproc"
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8001/sse")
+# streamable-HTTP 모드 서버 주소 (mcp_server_sse.py --transport http)
+MCP_HTTP_URL = os.getenv("MCP_HTTP_URL", "http://localhost:8001/mcp")
+
+# 채팅 모델 이름
+CHAT_MODEL = "gpt-4o-mini"
 
-# MCP 서버 경로 (stdio 모드용)
-server_script = os.path.abspath(
-    os.path.join(os.path.dirname(__file__), '..', 'mcp-server', 'server.py')
+# 한 턴에서 동시에 실행할 최대 도구 호출 수
+MCP_TOOL_CONCURRENCY = int(os.getenv("MCP_TOOL_CONCURRENCY", "4"))
+
+# MCP 서버 경로 (stdio 모드용 스크립트, inproc 모드용 import 경로)
+server_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'mcp-server')
 )
+server_script = os.path.join(server_dir, 'server.py')
 
 # Python 실행 파일 경로
 python_cmd = sys.executable
 
+logger = logging.getLogger(__name__)
+
 # 전역 변수
 mcp_toolkit = None
 mcp_session = None
 exit_stack = None
 tools = []
+tools_by_name = {}
 model = None
+summary_model = None
+_revalidate_task = None
 
 
-async def initialize_mcp_client():
-    """MCP 클라이언트 초기화 및 도구 로드"""
-    global mcp_toolkit, mcp_session, exit_stack, tools, model
-    
-    if mcp_toolkit is not None:
-        return
+async def open_mcp_session(stack: AsyncExitStack, mode: str = None) -> "ClientSession":
+    """MCP 모드에 맞는 전송 계층으로 ClientSession 생성 (initialize 전)"""
+    mode = mode or MCP_MODE
     
-    # AsyncExitStack으로 리소스 관리
-    exit_stack = AsyncExitStack()
-    await exit_stack.__aenter__()
+    if mode == "inproc":
+        # inproc 모드: 같은 이벤트 루프에서 FastMCP 서버를 메모리 스트림으로 연결
+        print("⚡ inproc 모드로 MCP 서버 로드 중...")
+        from fastmcp.client.transports import FastMCPTransport
+        if server_dir not in sys.path:
+            sys.path.insert(0, server_dir)
+        import server as mcp_server
+        
+        return await stack.enter_async_context(
+            FastMCPTransport(mcp_server.mcp).connect_session()
+        )
     
-    if MCP_MODE == "sse":
+    if mode == "http":
+        # streamable-HTTP 모드: 여러 워커로 실행 중인 MCP 서버에 연결
+        from mcp.client.streamable_http import streamablehttp_client
+        print(f"🔗 streamable-HTTP 모드로 MCP 서버에 연결 중... ({MCP_HTTP_URL})")
+        read_stream, write_stream, _ = await stack.enter_async_context(
+            streamablehttp_client(MCP_HTTP_URL)
+        )
+    elif mode == "sse":
         # SSE 모드: 이미 실행 중인 MCP 서버에 연결
+        from mcp.client.sse import sse_client
         print(f"🔗 SSE 모드로 MCP 서버에 연결 중... ({MCP_SERVER_URL})")
-        read_stream, write_stream = await exit_stack.enter_async_context(
+        read_stream, write_stream = await stack.enter_async_context(
             sse_client(MCP_SERVER_URL)
         )
     else:
         # stdio 모드: MCP 서버를 subprocess로 실행
+        # (현재 환경 변수를 그대로 전달해 inproc 모드와 같은 설정으로 동작)
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
         print("🚀 stdio 모드로 MCP 서버 시작 중...")
         server_params = StdioServerParameters(
             command=python_cmd,
             args=[server_script],
-            env=None
+            env=dict(os.environ)
         )
         
-        read_stream, write_stream = await exit_stack.enter_async_context(
+        read_stream, write_stream = await stack.enter_async_context(
             stdio_client(server_params)
         )
     
-    # 세션 생성 및 초기화
-    mcp_session = await exit_stack.enter_async_context(
+    from mcp import ClientSession
+    return await stack.enter_async_context(
         ClientSession(read_stream, write_stream)
     )
-    await mcp_session.initialize()
+
+
+def _build_models():
+    """채팅 모델/요약 모델 생성 (langchain_openai import 포함, 스레드에서 실행)"""
+    with startup.phase("model.create"):
+        from langchain_openai import ChatOpenAI
+        
+        # 스트리밍 응답에도 토큰 사용량을 포함해야 tracing.record_tokens가 기록할 수 있음
+        chat_model = ChatOpenAI(model=CHAT_MODEL, temperature=0, stream_usage=True)
+        # 오래된 대화 요약용 모델 (도구 바인딩 없음, 요약 토큰은 스트리밍 출력하지 않음)
+        summarizer = None
+        if history.HISTORY_SUMMARY:
+            summarizer = ChatOpenAI(model=CHAT_MODEL, temperature=0, disable_streaming=True)
+    return chat_model, summarizer
+
+
+async def _list_tools(session, init_result) -> Tuple[Any, bool]:
+    """도구 목록 조회 - 디스크 캐시 키가 같으면 list_tools 왕복 생략 (결과, 캐시 사용 여부)"""
+    from mcp.types import ListToolsResult
     
-    # MCPToolkit 생성 및 초기화
-    mcp_toolkit = MCPToolkit(session=mcp_session)
-    await mcp_toolkit.initialize()
+    key = tool_cache.cache_key(init_result, MCP_MODE, server_dir, MCP_HTTP_URL if MCP_MODE == "http" else MCP_SERVER_URL)
+    cached = tool_cache.load(key)
+    if cached is not None:
+        try:
+            return ListToolsResult.model_validate(cached), True
+        except ValueError:
+            pass
     
-    # 도구 가져오기
-    tools = mcp_toolkit.get_tools()
+    result = await session.list_tools()
+    tool_cache.save(key, result.model_dump(mode="json", exclude_none=True))
+    return result, False
+
+
+def _bind_tools(chat_model, tools_result):
+    """도구 목록으로 MCPTool 생성 후 모델에 바인딩"""
+    global mcp_toolkit, tools, tools_by_name, model
+    from langchain_mcp import MCPToolkit
+    from langchain_mcp.toolkit import MCPTool
+    
+    # MCPToolkit.initialize()는 session.initialize()를 다시 호출하므로
+    # 조회한(또는 캐시한) 목록으로 MCPToolkit.get_tools()와 같은 MCPTool을 직접 생성
+    toolkit = MCPToolkit(session=mcp_session)
+    new_tools = [
+        MCPTool(
+            session=mcp_session,
+            name=tool.name,
+            description=tool.description or "",
+            args_schema=tool.inputSchema,
+        )
+        for tool in tools_result.tools
+    ]
+    
+    model = chat_model.bind_tools(new_tools)
+    tools = new_tools
+    tools_by_name = {t.name: t for t in new_tools}
+    mcp_toolkit = toolkit
+    llm_cache.set_tool_schema(new_tools, CHAT_MODEL)
+
+
+async def _revalidate_tools(chat_model, init_result, cached_result):
+    """원격 서버의 도구 목록이 캐시와 다르면 캐시와 바인딩 갱신 (백그라운드)"""
+    try:
+        result = await mcp_session.list_tools()
+    except Exception as e:
+        logger.debug("도구 목록 재확인 실패: %s", e)
+        return
+    if result.model_dump(mode="json") == cached_result.model_dump(mode="json"):
+        return
+    key = tool_cache.cache_key(init_result, MCP_MODE, server_dir, MCP_HTTP_URL if MCP_MODE == "http" else MCP_SERVER_URL)
+    tool_cache.save(key, result.model_dump(mode="json", exclude_none=True))
+    _bind_tools(chat_model, result)
+    logger.info("MCP 서버 도구 목록이 바뀌어 다시 바인딩했습니다: %s", [t.name for t in tools])
+
+
+async def initialize_mcp_client():
+    """MCP 클라이언트 초기화 및 도구 로드
+    
+    모델 생성(langchain_openai import 포함)은 스레드에서 MCP 연결/handshake와 동시에 진행하고,
+    도구 목록은 디스크 캐시(TOOL_SCHEMA_CACHE)가 유효하면 다시 조회하지 않습니다.
+    각 단계의 소요 시간은 startup 모듈에 기록됩니다. (--profile-startup)
+    """
+    global mcp_session, exit_stack, summary_model, _revalidate_task
+    
+    if mcp_toolkit is not None:
+        return
+    
+    # 스레드 풀에 바로 제출 (to_thread는 이벤트 루프가 돌아야 시작되어 stdio 연결 준비와 겹치지 않음)
+    models_task = asyncio.get_running_loop().run_in_executor(None, _build_models)
+    try:
+        # AsyncExitStack으로 리소스 관리
+        exit_stack = AsyncExitStack()
+        await exit_stack.__aenter__()
+        
+        # 세션 생성 및 초기화 (initialize는 한 번만)
+        with startup.phase("mcp.connect"):
+            mcp_session = await open_mcp_session(exit_stack)
+        with startup.phase("mcp.initialize"):
+            init_result = await mcp_session.initialize()
+        with startup.phase("mcp.list_tools"):
+            tools_result, from_cache = await _list_tools(mcp_session, init_result)
+        
+        with startup.phase("model.wait"):
+            chat_model, summary_model = await models_task
+    except BaseException:
+        models_task.cancel()
+        raise
     
     # 모델 초기화 (도구 바인딩)
-    model = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0
-    ).bind_tools(tools)
+    with startup.phase("model.bind_tools"):
+        _bind_tools(chat_model, tools_result)
+    
+    # 원격 서버는 소스 변경을 알 수 없으므로 캐시를 사용했으면 백그라운드로 다시 확인
+    if from_cache and MCP_MODE in ("sse", "http"):
+        _revalidate_task = asyncio.ensure_future(_revalidate_tools(chat_model, init_result, tools_result))
     
-    mode_text = "SSE 서버" if MCP_MODE == "sse" else "내장 서버"
-    print(f"✅ MCP {mode_text} 연결 완료! 사용 가능한 도구: {[t.name for t in tools]}")
+    mode_text = {"sse": "SSE 서버", "http": "HTTP 서버", "inproc": "인프로세스 서버"}.get(MCP_MODE, "내장 서버")
+    cache_text = " (도구 목록 캐시 사용)" if from_cache else ""
+    print(f"✅ MCP {mode_text} 연결 완료!{cache_text} 사용 가능한 도구: {[t.name for t in tools]}")
 
 
 async def cleanup_mcp_client():
     """MCP 클라이언트 정리"""
-    global exit_stack
+    global mcp_toolkit, mcp_session, exit_stack, tools, tools_by_name, model, _revalidate_task
+    
+    if _revalidate_task is not None:
+        _revalidate_task.cancel()
+        _revalidate_task = None
     
     if exit_stack is not None:
         await exit_stack.__aexit__(None, None, None)
         exit_stack = None
+    
+    # 다시 initialize_mcp_client를 호출하면 새로 연결하도록 초기화
+    mcp_toolkit = None
+    mcp_session = None
+    tools = []
+    tools_by_name = {}
+    model = None
 
 
 async def call_model(state):
-    """LLM 호출 노드"""
+    """LLM 호출 노드 - 턴 마감 시간이 지나면 LLM 호출을 취소하고 시간 초과 응답"""
     global model
     
     # MCP 클라이언트가 초기화되지 않았으면 초기화
     if model is None:
         await initialize_mcp_client()
     
-    messages = state["messages"]
-    response = await model.ainvoke(messages)
-    return {"messages": [response]}
+    left = deadline.remaining()
+    if left is not None and left <= 0:
+        return {"messages": [AIMessage(content=deadline.timeout_reply())]}
+    
+    with tracing.span("node.agent") as node_span:
+        async def invoke():
+            # 토큰 예산에 맞게 히스토리 정리 (도구 결과 축약, 오래된 턴 제외/요약)
+            messages, updates = await history.prepare_messages(state, summary_model=summary_model)
+            
+            # 같은 대화 prefix의 응답이 캐시되어 있으면 재사용 (LLM_CACHE_ENABLED)
+            response = llm_cache.lookup(messages)
+            node_span.set(messages=len(messages), llm_cache_hit=response is not None)
+            if response is None:
+                with tracing.span("llm.invoke"):
+                    response = await model.ainvoke(messages)
+                    tracing.record_tokens(response)
+                llm_cache.store(messages, response)
+            return response, updates
+        
+        try:
+            response, updates = await asyncio.wait_for(invoke(), left)
+        except asyncio.TimeoutError:
+            if not deadline.expired():
+                raise
+            node_span.set(timed_out=True)
+            return {"messages": [AIMessage(content=deadline.timeout_reply())]}
+    return {"messages": [response], **updates}
 
 
 def should_continue(state) -> Literal["continue", "end"]:
@@ -122,85 +298,164 @@ def should_continue(state) -> Literal["continue", "end"]:
     return "end"
 
 
+class ToolCallError(Exception):
+    """MCP 도구가 오류 결과(isError)를 반환함"""
+
+
+async def _cancel_request(request_id: int, reason: str):
+    """진행 중인 MCP 요청 취소를 서버에 알림 (서버는 도구 실행과 백엔드 요청을 중단)"""
+    from mcp import types
+    notification = types.CancelledNotification(
+        params=types.CancelledNotificationParams(requestId=request_id, reason=reason)
+    )
+    try:
+        await asyncio.wait_for(mcp_session.send_notification(types.ClientNotification(notification)), 1)
+    except Exception as e:
+        logger.debug("MCP 요청 취소 알림 실패: %s", e)
+
+
+async def call_mcp_tool(name: str, args: dict):
+    """MCP 세션으로 도구를 직접 호출하고 결과를 한 번만 파싱해 반환
+    
+    MCPTool.ainvoke는 결과를 [{"type":"text","text":"..."}] JSON 문자열로 다시 감싸므로
+    세션의 CallToolResult에서 text를 바로 꺼내 파싱합니다.
+    턴 마감 시간이 있으면 남은 시간을 _meta로 서버에 전달하고, 그 안에 끝나지 않거나
+    턴이 취소되면 서버에도 취소를 알립니다.
+    """
+    left = deadline.remaining()
+    if left is not None and left <= 0:
+        raise deadline.TurnTimeout(f"턴 마감 시간이 지나 {name}을(를) 실행하지 않았습니다.")
+    meta = {deadline.TIMEOUT_META_KEY: int(left * 1000)} if left is not None else None
+    
+    request_ids = []
+    
+    async def send():
+        # 이번 요청의 JSON-RPC ID - mcp ClientSession(BaseSession.send_request)이 첫 await 전에
+        # _request_id를 요청 ID로 쓰고 1 증가시키는 동작에 의존 (공개 API가 없음, 없으면 취소 알림 생략)
+        request_id = getattr(mcp_session, "_request_id", None)
+        if request_id is not None:
+            request_ids.append(request_id)
+        return await mcp_session.call_tool(name, arguments=args, meta=meta)
+    
+    try:
+        result = await asyncio.wait_for(send(), left)
+    except asyncio.TimeoutError as e:
+        if request_ids:
+            await _cancel_request(request_ids[0], "turn deadline exceeded")
+        raise deadline.TurnTimeout(f"턴 마감 시간 안에 {name} 결과를 받지 못해 취소했습니다.") from e
+    except asyncio.CancelledError:
+        if request_ids:
+            await _cancel_request(request_ids[0], "cancelled by client")
+        raise
+    text = next((block.text for block in result.content if block.type == "text"), "")
+    # 출력 스키마 검증 실패도 isError로 오지만 본문은 도구 결과이므로 프리픽스를 떼고 사용
+    if result.isError and not text.startswith(tool_results.VALIDATION_ERROR_PREFIX):
+        raise ToolCallError(text)
+    return tool_results.decode_tool_text(text)
+
+
+async def _execute_tool_call(tool_call, semaphore) -> Tuple[ToolMessage, Any]:
+    """단일 도구 호출 실행 - 실패해도 예외 대신 오류 ToolMessage 반환
+    
+    (ToolMessage, 파싱된 결과 또는 발생한 예외)를 반환합니다.
+    """
+    tool_name = tool_call["name"]
+    tool_args = tool_call["args"]
+    
+    # MCP 도구 확인
+    if tool_name not in tools_by_name:
+        return ToolMessage(
+            content=f"오류 발생: 알 수 없는 도구 '{tool_name}'",
+            tool_call_id=tool_call["id"]
+        ), KeyError(tool_name)
+    
+    try:
+        # MCP를 통해 도구 실행 (세마포어 대기 시간은 span에 포함하지 않음)
+        async with semaphore:
+            with tracing.span("mcp.tool", tool=tool_name):
+                result = await call_mcp_tool(tool_name, tool_args)
+
+        logger.debug("Raw tool result type: %s", type(result))
+        
+        # 토큰을 적게 쓰는 형식으로 인코딩 (TOOL_RESULT_FORMAT)
+        content = tool_results.encode_tool_result(result)
+        
+        logger.debug("Final content preview: %.200s...", content)
+        
+        return ToolMessage(
+            content=str(content),
+            tool_call_id=tool_call["id"]
+        ), result
+    except Exception as e:
+        return ToolMessage(
+            content=f"오류 발생: {str(e)}",
+            tool_call_id=tool_call["id"]
+        ), e
+
+
+def _is_first_tool_step(messages) -> bool:
+    """이번 턴(마지막 사용자 메시지 이후)에 아직 도구 결과가 없는지 확인"""
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return True
+        if isinstance(message, ToolMessage):
+            return False
+    return True
+
+
 async def call_tools(state):
-    """도구 실행 노드 - MCP 클라이언트를 통해 실행"""
-    global tools
+    """도구 실행 노드 - MCP 클라이언트를 통해 실행
     
+    여러 도구 호출을 MCP_TOOL_CONCURRENCY 한도 내에서 동시에 실행하고,
+    ToolMessage는 원래 tool_call 순서대로 반환합니다.
+    반복 제한(MAX_TOOL_ITERATIONS)을 넘었거나 턴 마감 시간이 지났으면 응답을 붙여 턴을 끝냅니다.
+    """
     messages = state["messages"]
     last_message = messages[-1]
     
-    tool_messages = []
+    # agent ↔ tools 반복이 제한을 넘으면 도구를 실행하지 않고 종료
+    if deadline.over_iteration_limit(messages):
+        logger.warning("도구 단계가 %d번을 넘어 턴을 중단합니다.", deadline.MAX_TOOL_ITERATIONS)
+        return {"messages": deadline.close_turn(messages, deadline.iteration_limit_reply())}
+    if deadline.expired():
+        return {"messages": deadline.close_turn(messages, deadline.timeout_reply())}
     
-    # 도구 호출 실행
-    for tool_call in last_message.tool_calls:
-        tool_name = tool_call["name"]
-        tool_args = tool_call["args"]
-        
-        # MCP 도구 찾기
-        selected_tool = None
-        for t in tools:
-            if t.name == tool_name:
-                selected_tool = t
-                break
+    # 도구 호출 동시 실행 (하나가 실패해도 나머지는 계속 진행)
+    semaphore = asyncio.Semaphore(MCP_TOOL_CONCURRENCY)
+    with tracing.span("node.tools", calls=len(last_message.tool_calls)) as node_span:
+        outcomes = await asyncio.gather(
+            *(_execute_tool_call(tool_call, semaphore) for tool_call in last_message.tool_calls)
+        )
+        tool_messages = [message for message, _ in outcomes]
         
-        if selected_tool:
-            try:
-                # MCP를 통해 도구 실행
-                result = await selected_tool.ainvoke(tool_args)
-
-                print(f"Raw tool result type: {type(result)}")
-                
-                # FastMCP 응답 형식 처리
-                content = result
-                
-                # 문자열로 반환된 경우 JSON 파싱 시도
-                if isinstance(result, str):
-                    try:
-                        result = json.loads(result)
-                        print(f"Parsed string to: {type(result)}")
-                    except json.JSONDecodeError:
-                        print("Result is a plain string, not JSON")
-                        content = result
-                
-                # 리스트인지 확인 (FastMCP 형식: [{"type":"text","text":"..."}])
-                if isinstance(result, list) and len(result) > 0:
-                    print(f"Result is a list with {len(result)} items")
-                    
-                    # 첫 번째 아이템이 딕셔너리이고 "text" 키가 있는지 확인
-                    if isinstance(result[0], dict) and "text" in result[0]:
-                        print("Found FastMCP format, extracting 'text' field...")
-                        text_content = result[0]["text"]
-                        
-                        # "Output validation error: " 프리픽스 제거
-                        if isinstance(text_content, str) and text_content.startswith("Output validation error: "):
-                            print("Found validation error prefix, extracting actual data...")
-                            text_content = text_content.replace("Output validation error: ", "", 1)
-                        
-                        # text 필드의 내용이 JSON 문자열이면 파싱하여 보기 좋게 포맷팅
-                        try:
-                            parsed = json.loads(text_content) if isinstance(text_content, str) else text_content
-                            content = json.dumps(parsed, ensure_ascii=False, indent=2)
-                            print("Successfully parsed and formatted JSON content")
-                        except (json.JSONDecodeError, TypeError):
-                            # JSON이 아니면 그대로 사용
-                            content = text_content
-                            print("Text content is not JSON, using as-is")
-                
-                print(f"Final content preview: {str(content)[:200]}...")
-                
-                tool_messages.append(
-                    ToolMessage(
-                        content=str(content),
-                        tool_call_id=tool_call["id"]
-                    )
-                )
-            except Exception as e:
-                tool_messages.append(
-                    ToolMessage(
-                        content=f"오류 발생: {str(e)}",
-                        tool_call_id=tool_call["id"]
-                    )
-                )
+        # 정형화된 CRUD 결과는 LLM을 다시 부르지 않고 템플릿으로 바로 응답 (DIRECT_ANSWER_ENABLED)
+        # 앞 단계 결과를 보고 다음 도구를 고르는 다단계 요청은 첫 단계에서만 적용
+        reply = None
+        if deadline.expired():
+            # 마감 전에 끝난 쓰기 작업은 사용자에게 알림
+            done = [
+                replies.render_reply(call["name"], call.get("args") or {}, data) or f"{call['name']} 완료"
+                for call, (_, data) in zip(last_message.tool_calls, outcomes)
+                if call["name"] in llm_cache.WRITE_TOOLS and not isinstance(data, Exception)
+            ]
+            reply = deadline.timeout_reply(done)
+        elif _is_first_tool_step(messages[:-1]):
+            reply = replies.render_direct_answer(last_message.tool_calls, [data for _, data in outcomes])
+        node_span.set(direct_answer=reply is not None, timed_out=deadline.expired())
+    
+    # 쓰기 도구가 실행되었으면 캐시된 LLM 응답은 더 이상 믿을 수 없음
+    if any(c["name"] in llm_cache.WRITE_TOOLS for c in last_message.tool_calls):
+        llm_cache.bump_generation()
 
     #print("tool_messages : ", tool_messages)
+    if reply is not None:
+        return {"messages": tool_messages + [AIMessage(content=reply)]}
     return {"messages": tool_messages}
+
+
+def after_tools(state) -> Literal["agent", "end"]:
+    """도구 결과로 바로 응답했거나 턴이 중단되었으면 종료, 아니면 LLM이 결과를 보고 응답"""
+    last_message = state["messages"][-1]
+    if isinstance(last_message, AIMessage) and not last_message.tool_calls:
+        return "end"
+    return "agent"
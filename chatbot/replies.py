@@ -0,0 +1,136 @@
+"""도구 결과 응답 템플릿 - LLM 없이 정형화된 도구 결과를 사용자 응답으로 변환
+
+빠른 경로(router)와 도구 실행 후 바로 응답하는 경로(nodes.call_tools)가 함께 사용합니다.
+예상한 형식의 결과가 아니면 None을 반환하여 LLM이 응답하도록 넘깁니다.
+"""
+import os
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 도구 실행 후 LLM을 다시 부르지 않고 템플릿으로 응답 (기본 비활성화)
+DIRECT_ANSWER_ENABLED = os.getenv("DIRECT_ANSWER_ENABLED", "false").lower() in ("1", "true", "yes")
+# 바로 응답할 도구 - 한 단계의 도구 호출이 모두 이 목록에 있고 모두 성공해야 함
+DIRECT_ANSWER_TOOLS = set(
+    os.getenv(
+        "DIRECT_ANSWER_TOOLS",
+        "create_memo,update_memo,delete_memo,create_memos,update_memos,delete_memos"
+    ).split(",")
+)
+# "모든 메모" 조회 시 기본 최대 개수 (list_memos 도구 기본값)
+DEFAULT_LIST_LIMIT = 10
+
+
+def _memo_line(memo: Dict[str, Any]) -> str:
+    return f"[ID {memo.get('id')}] {memo.get('title')}"
+
+
+def _list_memos(args: Dict[str, Any], data: Any) -> Optional[str]:
+    if not isinstance(data, list):
+        return None
+    if not data:
+        return "저장된 메모가 없습니다."
+    limit = args.get("limit", DEFAULT_LIST_LIMIT)
+    lines = [f"총 {len(data)}개의 메모가 있습니다:"]
+    for i, memo in enumerate(data, 1):
+        lines.append(f"{i}. {_memo_line(memo)} (생성일: {str(memo.get('created_at', ''))[:10]})")
+    if len(data) >= limit:
+        lines.append(f"(최대 {limit}개까지 표시했습니다)")
+    return "\n".join(lines)
+
+
+def _get_memo(args: Dict[str, Any], data: Any) -> Optional[str]:
+    if not isinstance(data, dict) or "id" not in data:
+        return None
+    return (
+        "메모 정보:\n"
+        f"ID: {data['id']}\n"
+        f"제목: {data.get('title')}\n"
+        f"내용: {data.get('content') or '(없음)'}\n"
+        f"생성일: {data.get('created_at')}\n"
+        f"수정일: {data.get('updated_at')}"
+    )
+
+
+def _create_memo(args: Dict[str, Any], data: Any) -> Optional[str]:
+    if not isinstance(data, dict) or "id" not in data:
+        return None
+    return f"메모를 생성했습니다. (ID: {data['id']}, 제목: {data.get('title')})"
+
+
+def _update_memo(args: Dict[str, Any], data: Any) -> Optional[str]:
+    if not isinstance(data, dict) or "id" not in data:
+        return None
+    return f"메모를 수정했습니다. (ID: {data['id']}, 제목: {data.get('title')})"
+
+
+def _delete_memo(args: Dict[str, Any], data: Any) -> Optional[str]:
+    if not isinstance(data, dict) or data.get("status") != "success":
+        return None
+    return f"메모를 삭제했습니다. (ID: {args.get('memo_id')})"
+
+
+def _batch(action: str, describe: Callable[[Any], str]) -> Callable[[Dict[str, Any], Any], Optional[str]]:
+    """배치 도구 템플릿 - 일부라도 실패했으면 LLM이 설명하도록 None"""
+
+    def render(args: Dict[str, Any], data: Any) -> Optional[str]:
+        if not isinstance(data, dict) or data.get("failed") != 0 or not isinstance(data.get("results"), list):
+            return None
+        lines = [f"메모 {data.get('succeeded')}개를 {action}했습니다."]
+        lines.extend(f"- {describe(item.get('result'))}" for item in data["results"])
+        return "\n".join(lines)
+
+    return render
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any], Any], Optional[str]]] = {
+    "list_memos": _list_memos,
+    "get_memo": _get_memo,
+    "create_memo": _create_memo,
+    "update_memo": _update_memo,
+    "delete_memo": _delete_memo,
+    "create_memos": _batch("생성", lambda memo: _memo_line(memo or {})),
+    "update_memos": _batch("수정", lambda memo: _memo_line(memo or {})),
+    "delete_memos": _batch("삭제", lambda result: (result or {}).get("message", "")),
+}
+
+
+# 쓰기 도구 실패 응답에 쓰는 동작 이름
+WRITE_ACTIONS = {"create_memo": "생성", "update_memo": "수정", "delete_memo": "삭제"}
+
+
+def render_write_failure(tool_name: str, args: Dict[str, Any], error: Any, confirmed: bool = True) -> str:
+    """쓰기 도구 실패 응답 - confirmed가 False면 실패 여부를 알 수 없는 결과 (예상과 다른 응답)"""
+    target = f"메모 {args['memo_id']}번" if "memo_id" in args else "메모"
+    action = WRITE_ACTIONS.get(tool_name, "처리")
+    if confirmed:
+        return f"{target}을(를) {action}하지 못했습니다: {error}"
+    return f"{target} {action} 요청의 결과를 확인하지 못했습니다. 메모 목록에서 확인해 주세요. (응답: {error})"
+
+
+def render_reply(tool_name: str, args: Dict[str, Any], data: Any) -> Optional[str]:
+    """도구 결과를 응답 템플릿으로 변환 - 예상한 형식이 아니면 None"""
+    renderer = RENDERERS.get(tool_name)
+    if renderer is None:
+        return None
+    return renderer(args, data)
+
+
+def render_direct_answer(calls: List[Dict[str, Any]], results: List[Any]) -> Optional[str]:
+    """한 단계의 도구 호출 결과로 최종 응답 생성 - 하나라도 대상이 아니거나 실패했으면 None
+
+    results의 항목이 예외면 실패한 호출로 봅니다.
+    """
+    if not DIRECT_ANSWER_ENABLED or not calls:
+        return None
+    replies = []
+    for call, data in zip(calls, results):
+        if call["name"] not in DIRECT_ANSWER_TOOLS or isinstance(data, Exception):
+            return None
+        reply = render_reply(call["name"], call.get("args") or {}, data)
+        if reply is None:
+            return None
+        replies.append(reply)
+    return "\n\n".join(replies)
@@ -0,0 +1,153 @@
+"""빠른 경로 라우터 - 단순한 메모 명령은 LLM 없이 바로 처리
+
+"메모 1번을 조회해줘", "모든 메모를 보여줘", "메모 3번 삭제" 같은 정형화된 입력을
+정규식으로 인식하여 MCP 도구를 직접 호출하고 템플릿으로 응답합니다.
+확신할 수 없는 입력이나 예상과 다른 도구 결과는 모두 기존 LLM 경로(agent)로 넘깁니다.
+단, 삭제 같은 쓰기 도구가 실패하면 LLM이 같은 작업을 다시 실행하지 않도록 실패를 바로 응답합니다.
+"""
+import os
+import re
+import time
+import uuid
+from typing import Literal, Optional, Tuple, Dict, Any, List
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from dotenv import load_dotenv
+
+import nodes
+import llm_cache
+import tool_results
+import replies
+
+# 환경 변수 로드
+load_dotenv()
+
+# 빠른 경로 사용 여부
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+# "모든 메모" 조회 시 가져올 최대 개수
+FAST_PATH_LIST_LIMIT = 100
+
+# 명령 패턴 (입력 전체가 일치해야 함)
+_SHOW = r"(보여\s*줘|보여\s*주세요|보여\s*줄래|조회해\s*줘|조회해\s*주세요|조회|알려\s*줘)"
+_DELETE = r"(삭제해\s*줘|삭제해\s*주세요|삭제|지워\s*줘|지워\s*주세요)"
+
+PATTERNS: List[Tuple[str, "re.Pattern"]] = [
+    ("list_memos", re.compile(rf"^(모든|전체)\s*메모(를|들을)?\s*(다\s*)?{_SHOW}$")),
+    ("list_memos", re.compile(rf"^메모\s*목록(을|를)?(\s*{_SHOW})?$")),
+    ("list_memos", re.compile(r"^(show|list)\s+(me\s+)?(all\s+)?(my\s+)?memos$")),
+    ("get_memo", re.compile(rf"^메모\s*(?P<id>\d+)\s*번?\s*(을|를)?\s*{_SHOW}$")),
+    ("get_memo", re.compile(rf"^(?P<id>\d+)\s*번\s*메모(를|을)?\s*{_SHOW}$")),
+    ("get_memo", re.compile(r"^(show|get|open)\s+(me\s+)?memo\s*#?(?P<id>\d+)$")),
+    ("delete_memo", re.compile(rf"^메모\s*(?P<id>\d+)\s*번?\s*(을|를)?\s*{_DELETE}$")),
+    ("delete_memo", re.compile(rf"^(?P<id>\d+)\s*번\s*메모(를|을)?\s*{_DELETE}$")),
+    ("delete_memo", re.compile(r"^(delete|remove)\s+memo\s*#?(?P<id>\d+)$")),
+]
+
+# 적중률/지연 시간 카운터
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "fallbacks": 0,
+    "write_failures": 0,
+    "total_latency": 0.0,
+}
+
+
+def match_command(text: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """입력을 (도구 이름, 인자)로 변환 - 확신할 수 없으면 None"""
+    normalized = re.sub(r"\s+", " ", text.strip().lower()).rstrip(".!?~ ")
+
+    for tool_name, pattern in PATTERNS:
+        match = pattern.match(normalized)
+        if match is None:
+            continue
+        if tool_name == "list_memos":
+            return tool_name, {"skip": 0, "limit": FAST_PATH_LIST_LIMIT}
+        return tool_name, {"memo_id": int(match.group("id"))}
+    return None
+
+
+async def route_fast_path(state):
+    """빠른 경로 노드 - 처리하면 도구 호출/결과/응답 메시지를 추가, 아니면 아무것도 추가하지 않음"""
+    if not FAST_PATH_ENABLED:
+        return {"messages": []}
+
+    last_message = state["messages"][-1]
+    if not isinstance(last_message, HumanMessage):
+        return {"messages": []}
+
+    command = match_command(str(last_message.content))
+    if command is None:
+        _stats["misses"] += 1
+        return {"messages": []}
+
+    if nodes.model is None:
+        await nodes.initialize_mcp_client()
+
+    tool_name, args = command
+    if tool_name not in nodes.tools_by_name:
+        _stats["misses"] += 1
+        return {"messages": []}
+
+    is_write = tool_name in llm_cache.WRITE_TOOLS
+    started = time.perf_counter()
+    try:
+        data = await nodes.call_mcp_tool(tool_name, args)
+    except Exception as e:
+        if not is_write:
+            _stats["fallbacks"] += 1
+            return {"messages": []}
+        # 쓰기는 LLM 경로로 넘기면 같은 작업을 다시 실행하므로 실패를 바로 응답
+        # (시간 초과 등으로 백엔드에서는 실행되었을 수 있으므로 응답 캐시도 무효화)
+        llm_cache.bump_generation()
+        _stats["write_failures"] += 1
+        return _handled(tool_name, args, f"오류 발생: {e}", replies.render_write_failure(tool_name, args, e))
+
+    if is_write:
+        llm_cache.bump_generation()
+    
+    reply = replies.render_reply(tool_name, args, data)
+    if reply is None:
+        if is_write:
+            _stats["write_failures"] += 1
+            content = tool_results.encode_tool_result(data)
+            return _handled(tool_name, args, content, replies.render_write_failure(tool_name, args, data, confirmed=False))
+        # 오류 응답 등 예상과 다른 결과는 LLM이 설명하도록 넘김
+        _stats["fallbacks"] += 1
+        return {"messages": []}
+
+    _stats["hits"] += 1
+    _stats["total_latency"] += time.perf_counter() - started
+    return _handled(tool_name, args, tool_results.encode_tool_result(data), reply)
+
+
+def _handled(tool_name: str, args: Dict[str, Any], tool_content: str, reply: str):
+    """빠른 경로에서 끝낸 턴의 메시지 - 이후 턴에서 모델이 맥락을 알 수 있도록 도구 호출과 결과도 히스토리에 남김"""
+    tool_call_id = f"fast_{uuid.uuid4().hex[:12]}"
+    return {
+        "messages": [
+            AIMessage(content="", tool_calls=[{"name": tool_name, "args": args, "id": tool_call_id}]),
+            ToolMessage(content=tool_content, tool_call_id=tool_call_id),
+            AIMessage(content=reply),
+        ]
+    }
+
+
+def after_router(state) -> Literal["agent", "end"]:
+    """빠른 경로에서 응답했으면 종료, 아니면 LLM 경로로"""
+    last_message = state["messages"][-1]
+    if isinstance(last_message, AIMessage) and not last_message.tool_calls:
+        return "end"
+    return "agent"
+
+
+def stats() -> Dict[str, Any]:
+    """빠른 경로 적중률과 평균 지연 시간"""
+    handled = _stats["hits"] + _stats["misses"] + _stats["fallbacks"] + _stats["write_failures"]
+    return {
+        "hits": _stats["hits"],
+        "misses": _stats["misses"],
+        "fallbacks": _stats["fallbacks"],
+        "write_failures": _stats["write_failures"],
+        "hit_rate": round(_stats["hits"] / handled, 4) if handled else 0.0,
+        "avg_latency_ms": round(_stats["total_latency"] / _stats["hits"] * 1000, 2) if _stats["hits"] else 0.0,
+    }
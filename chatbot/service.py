@@ -0,0 +1,358 @@
+"""메모장 챗봇 HTTP 서비스 - 여러 사용자의 대화를 한 프로세스에서 처리
+
+하나의 컴파일된 그래프와 MCP 클라이언트/모델을 모든 세션이 공유하고,
+대화 상태는 세션 ID별로 보관합니다.
+
+엔드포인트:
+    POST   /chat                 {"session_id"?, "message"} → {"session_id", "reply", "elapsed"}
+    POST   /chat/stream          같은 요청, SSE로 토큰/도구 이벤트 스트리밍
+    DELETE /sessions/{id}        세션 삭제
+    GET    /health               상태 및 부하 지표
+
+사용법:
+    python chatbot/service.py --port 8002
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from langchain_core.messages import HumanMessage
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from dotenv import load_dotenv
+
+from graph import create_graph
+from nodes import initialize_mcp_client, cleanup_mcp_client
+from streaming import turn_events
+from checkpoint import get_store
+import tracing
+import deadline
+
+# 환경 변수 로드
+load_dotenv()
+
+# 서비스 설정
+CHAT_SERVICE_HOST = os.getenv("CHAT_SERVICE_HOST", "0.0.0.0")
+CHAT_SERVICE_PORT = int(os.getenv("CHAT_SERVICE_PORT", "8002"))
+# 동시에 실행할 최대 턴 수 / 대기열 최대 길이
+CHAT_MAX_CONCURRENT_TURNS = int(os.getenv("CHAT_MAX_CONCURRENT_TURNS", "32"))
+CHAT_MAX_PENDING_TURNS = int(os.getenv("CHAT_MAX_PENDING_TURNS", "128"))
+# 유휴 세션 만료 시간(초) / 최대 세션 수
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "3600"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "10000"))
+
+
+class Overloaded(Exception):
+    """대기열이 가득 차 요청을 받을 수 없음"""
+
+
+class AdmissionController:
+    """전역 동시 실행 턴 수 제한과 대기열 길이 제한"""
+
+    def __init__(self, max_concurrent: int, max_pending: int):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_pending = max_pending
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def is_full(self) -> bool:
+        """실행 슬롯과 대기열이 모두 찼는지"""
+        return self.semaphore.locked() and self.waiting >= self.max_pending
+
+    @asynccontextmanager
+    async def slot(self):
+        """실행 슬롯 확보 - 대기열이 가득 차면 Overloaded"""
+        if self.is_full():
+            self.rejected += 1
+            raise Overloaded()
+
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+
+
+class Session:
+    """세션별 대화 상태와 직렬화용 락"""
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.state = {"messages": []}
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+
+
+class SessionStore:
+    """세션 ID → Session (유휴 만료, 최대 개수 제한)"""
+
+    def __init__(self, ttl: float, max_sessions: int):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, Session] = {}
+
+    def get_or_create(self, session_id: Optional[str]) -> Session:
+        """세션 조회, 없으면 생성"""
+        self.evict_expired()
+
+        session_id = session_id or uuid.uuid4().hex
+        session = self.sessions.get(session_id)
+        if session is None:
+            if len(self.sessions) >= self.max_sessions:
+                self._evict_oldest_idle()
+            session = self.sessions[session_id] = Session(session_id)
+            # 체크포인트가 있으면 재시작 전 대화 이어가기
+            store = get_store()
+            if store is not None:
+                session.state = store.load(session_id)
+        session.last_active = time.monotonic()
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        """세션 삭제 (저장된 체크포인트 포함)"""
+        store = get_store()
+        if store is not None:
+            store.delete(session_id)
+        return self.sessions.pop(session_id, None) is not None
+
+    def evict_expired(self):
+        """TTL이 지난 유휴 세션 제거 (실행 중인 세션은 유지)"""
+        deadline = time.monotonic() - self.ttl
+        expired = [
+            sid for sid, s in self.sessions.items()
+            if s.last_active < deadline and not s.lock.locked()
+        ]
+        for sid in expired:
+            del self.sessions[sid]
+
+    def _evict_oldest_idle(self):
+        """가장 오래 사용하지 않은 유휴 세션 제거"""
+        idle = [s for s in self.sessions.values() if not s.lock.locked()]
+        if idle:
+            oldest = min(idle, key=lambda s: s.last_active)
+            del self.sessions[oldest.id]
+
+
+# 프로세스 전역 공유 객체
+graph_app = None
+sessions = SessionStore(CHAT_SESSION_TTL, CHAT_MAX_SESSIONS)
+admission = AdmissionController(CHAT_MAX_CONCURRENT_TURNS, CHAT_MAX_PENDING_TURNS)
+
+
+async def _parse_chat_request(request: Request):
+    """요청 본문에서 (session_id, message) 추출"""
+    try:
+        body = await request.json()
+    except ValueError:
+        # JSON이 아니거나 UTF-8이 아닌 본문 (JSONDecodeError, UnicodeDecodeError)
+        return None, None
+    if not isinstance(body, dict):
+        # 배열/문자열 등 객체가 아닌 JSON 본문
+        return None, None
+    session_id = body.get("session_id")
+    if not isinstance(session_id, (str, type(None))):
+        return None, None
+    message = str(body.get("message") or "").strip()
+    return session_id, message
+
+
+def _thread_config(session: Session) -> dict:
+    """세션 ID를 체크포인트 스레드 ID로 사용"""
+    return {"configurable": {"thread_id": session.id}}
+
+
+def _recover_state(session: Session):
+    """턴이 중간에 실패하면 이미 저장된 단계까지 체크포인트에서 다시 불러옴"""
+    store = get_store()
+    if store is not None:
+        session.state = store.load(session.id)
+
+
+def _close_cancelled(session: Session, state):
+    """클라이언트 연결이 끊겨 취소된 턴을 닫고 세션과 체크포인트에 반영
+
+    짝이 없는 도구 호출이 남으면 다음 턴에서 LLM 호출이 실패하므로 취소 결과로 채웁니다.
+    """
+    closing = deadline.close_turn(state["messages"], deadline.CANCELLED_REPLY)
+    store = get_store()
+    if store is not None:
+        store.save_step(session.id, state["messages"], {"messages": closing})
+    session.state = {**state, "messages": list(state["messages"]) + closing}
+    session.last_active = time.monotonic()
+
+
+def _overloaded_response() -> JSONResponse:
+    return JSONResponse(
+        {"error": "서버가 혼잡합니다. 잠시 후 다시 시도하세요."},
+        status_code=503,
+        headers={"Retry-After": "1"}
+    )
+
+
+async def chat(request: Request):
+    """한 턴 실행 후 최종 응답 반환"""
+    session_id, message = await _parse_chat_request(request)
+    if not message:
+        return JSONResponse({"error": "message가 필요합니다."}, status_code=400)
+
+    session = sessions.get_or_create(session_id)
+    started = time.perf_counter()
+    trace_id = None
+
+    # 같은 세션의 메시지는 순서대로 하나씩 처리
+    async with session.lock:
+        try:
+            async with admission.slot():
+                state = {**session.state, "messages": list(session.state["messages"]) + [HumanMessage(content=message)]}
+                # 턴 마감 시간(TURN_TIMEOUT)이 지나면 그래프가 시간 초과 응답으로 턴을 끝냄
+                with tracing.trace(thread_id=session.id), deadline.turn():
+                    trace_id = tracing.current_trace_id()
+                    result = await graph_app.ainvoke(state, _thread_config(session))
+        except Overloaded:
+            return _overloaded_response()
+        except Exception as e:
+            _recover_state(session)
+            return JSONResponse({"session_id": session.id, "error": str(e)}, status_code=500)
+
+        session.state = result
+        session.last_active = time.monotonic()
+
+    return JSONResponse(
+        {
+            "session_id": session.id,
+            "reply": result["messages"][-1].content,
+            "elapsed": round(time.perf_counter() - started, 3),
+        },
+        # 느린 턴을 계측 기록(TRACE_EXPORTER)에서 찾을 수 있도록 trace_id 전달
+        headers={"X-Trace-Id": trace_id} if trace_id else None
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def chat_stream(request: Request):
+    """한 턴 실행하며 토큰/도구 이벤트를 SSE로 전송"""
+    session_id, message = await _parse_chat_request(request)
+    if not message:
+        return JSONResponse({"error": "message가 필요합니다."}, status_code=400)
+    if admission.is_full():
+        admission.rejected += 1
+        return _overloaded_response()
+
+    session = sessions.get_or_create(session_id)
+
+    async def event_stream():
+        started = time.perf_counter()
+        yield _sse("session", {"session_id": session.id})
+
+        async with session.lock:
+            # 마지막으로 받은 그래프 상태 (연결이 끊기면 이 상태에서 턴을 닫음)
+            progress = {}
+            try:
+                async with admission.slot():
+                    state = {**session.state, "messages": list(session.state["messages"]) + [HumanMessage(content=message)]}
+                    progress["state"] = state
+                    with tracing.trace(thread_id=session.id), deadline.turn():
+                        async for event in turn_events(graph_app, state, _thread_config(session), progress):
+                            if event["type"] == "state":
+                                session.state = event["state"]
+                                session.last_active = time.monotonic()
+                                continue
+                            yield _sse(event["type"], {k: v for k, v in event.items() if k != "type"})
+            except Overloaded:
+                yield _sse("error", {"error": "서버가 혼잡합니다. 잠시 후 다시 시도하세요."})
+                return
+            except Exception as e:
+                _recover_state(session)
+                yield _sse("error", {"error": str(e)})
+                return
+            except BaseException:
+                # 클라이언트 연결 끊김 (CancelledError/GeneratorExit)
+                if "state" in progress:
+                    _close_cancelled(session, progress["state"])
+                raise
+
+        yield _sse("done", {"elapsed": round(time.perf_counter() - started, 3)})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+async def delete_session(request: Request):
+    """세션 삭제"""
+    removed = sessions.remove(request.path_params["session_id"])
+    return JSONResponse({"removed": removed}, status_code=200 if removed else 404)
+
+
+async def health(request: Request):
+    """상태 및 부하 지표"""
+    return JSONResponse({
+        "status": "ok",
+        "sessions": len(sessions.sessions),
+        "active_turns": admission.active,
+        "waiting_turns": admission.waiting,
+        "rejected_turns": admission.rejected,
+    })
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """MCP 클라이언트와 그래프를 한 번만 만들어 모든 세션이 공유"""
+    global graph_app
+
+    await initialize_mcp_client()
+    graph_app = create_graph()
+    try:
+        yield
+    finally:
+        await cleanup_mcp_client()
+
+
+app = Starlette(
+    routes=[
+        Route("/chat", chat, methods=["POST"]),
+        Route("/chat/stream", chat_stream, methods=["POST"]),
+        Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        Route("/health", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    """서비스 실행"""
+    import uvicorn
+    tracing.configure_logging()
+
+    parser = argparse.ArgumentParser(description="메모장 챗봇 HTTP 서비스")
+    parser.add_argument("--host", default=CHAT_SERVICE_HOST, help="바인드 주소")
+    parser.add_argument("--port", type=int, default=CHAT_SERVICE_PORT, help="포트")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🤖 메모장 챗봇 HTTP 서비스 시작")
+    print("=" * 60)
+    print(f"서버 주소: http://{args.host}:{args.port}")
+    print("POST /chat, POST /chat/stream, GET /health\n")
+
+    # MCP 세션이 프로세스 전역이므로 단일 워커로 실행
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
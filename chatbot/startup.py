@@ -0,0 +1,52 @@
+"""챗봇 시작 단계별 소요 시간 측정 (--profile-startup)
+
+initialize_mcp_client 등 시작 경로의 각 단계를 phase()로 감싸 기록하고,
+report()로 단계별 시간표를 만듭니다. 동시에 진행되는 단계(모델 생성 등)는
+시간이 겹치므로 합계가 전체 시간보다 클 수 있습니다.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# (단계 이름, 시작 시각, 소요 시간) - 기록 순서대로
+_phases: List[Tuple[str, float, float]] = []
+_origin = time.perf_counter()
+
+
+def reset(origin: float = None):
+    """기록을 지우고 측정 기준 시각(perf_counter 값, 기본 지금)을 다시 설정"""
+    global _origin
+    _phases.clear()
+    _origin = time.perf_counter() if origin is None else origin
+
+
+def record(name: str, started: float, elapsed: float):
+    """이미 측정한 단계 기록 (started는 perf_counter 값)"""
+    _phases.append((name, started - _origin, elapsed))
+
+
+@contextmanager
+def phase(name: str):
+    """with 블록의 소요 시간을 단계로 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, started, time.perf_counter() - started)
+
+
+def timings() -> Dict[str, float]:
+    """단계 이름 → 소요 시간(초)"""
+    return {name: elapsed for name, _, elapsed in _phases}
+
+
+def report() -> str:
+    """단계별 시작 시각/소요 시간 표"""
+    if not _phases:
+        return "기록된 시작 단계가 없습니다."
+    total = max(offset + elapsed for _, offset, elapsed in _phases)
+    lines = [f"{'단계':<22} {'시작':>9} {'소요':>9}"]
+    for name, offset, elapsed in _phases:
+        lines.append(f"{name:<22} {offset * 1000:>7.1f}ms {elapsed * 1000:>7.1f}ms")
+    lines.append(f"{'전체':<22} {'':>9} {total * 1000:>7.1f}ms")
+    return "\n".join(lines)
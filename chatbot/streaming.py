@@ -0,0 +1,67 @@
+"""그래프 스트리밍 이벤트 변환
+
+LangGraph astream 출력(messages/updates/values)을 REPL과 HTTP 서비스가
+공통으로 사용할 수 있는 단순한 이벤트 dict로 바꿉니다.
+
+이벤트 종류:
+    token       - LLM 토큰 조각 {"text"}
+    tool_start  - 도구 호출 시작 {"id", "name", "args"}
+    tool_end    - 도구 호출 완료 {"id", "name", "ok", "elapsed"}
+    message     - 토큰 스트리밍 없이 만들어진 응답 {"text"} (빠른 경로, 시간 초과 안내 등)
+    state       - 턴 종료 후 최종 상태 {"state"}
+"""
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+
+async def turn_events(app, state, config=None, progress: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """한 턴을 스트리밍 실행하며 이벤트 생성
+
+    progress를 주면 단계가 끝날 때마다 progress["state"]에 그때까지의 상태를 기록합니다.
+    (턴이 취소되었을 때 마지막으로 끝난 단계의 상태를 알 수 있음)
+    """
+    final_state = state
+    # 이번 agent 단계에서 토큰으로 내보낸 텍스트
+    streamed = ""
+    pending_tools = {}
+
+    async for mode, chunk in app.astream(state, config, stream_mode=["messages", "updates", "values"]):
+        if mode == "messages":
+            message, metadata = chunk
+            # agent 노드의 LLM 토큰만 전달 (도구 호출 인자 조각은 제외)
+            if metadata.get("langgraph_node") != "agent" or not isinstance(message, AIMessageChunk):
+                continue
+            if not message.content:
+                continue
+            streamed += message.content
+            yield {"type": "token", "text": message.content}
+
+        elif mode == "updates":
+            for update in chunk.values():
+                for message in (update or {}).get("messages", []):
+                    if isinstance(message, AIMessage) and message.tool_calls:
+                        streamed = ""
+                        for call in message.tool_calls:
+                            pending_tools[call["id"]] = (call["name"], time.perf_counter())
+                            yield {"type": "tool_start", "id": call["id"], "name": call["name"], "args": call["args"]}
+                    elif isinstance(message, ToolMessage):
+                        name, started = pending_tools.pop(message.tool_call_id, ("tool", time.perf_counter()))
+                        yield {
+                            "type": "tool_end",
+                            "id": message.tool_call_id,
+                            "name": name,
+                            "ok": not str(message.content).startswith("오류 발생"),
+                            "elapsed": time.perf_counter() - started,
+                        }
+                    elif isinstance(message, AIMessage) and message.content and message.content != streamed:
+                        # 토큰으로 나가지 않은 응답 (빠른 경로, 바로 응답, 스트리밍 중 시간 초과 안내 등)
+                        yield {"type": "message", "text": f"\n\n{message.content}" if streamed else message.content}
+                        streamed = message.content
+
+        elif mode == "values":
+            final_state = chunk
+            if progress is not None:
+                progress["state"] = chunk
+
+    yield {"type": "state", "state": final_state}
@@ -0,0 +1,84 @@
+"""MCP 도구 목록 디스크 캐시 - 재시작 시 list_tools 왕복 생략
+
+initialize 응답의 서버 정보, 프로토콜 버전, 클라이언트 라이브러리 버전과
+서버 위치(로컬 서버는 소스 파일 크기/수정 시각, 원격 서버는 URL)로 키를 만들어
+키가 같을 때만 저장된 도구 목록을 사용합니다.
+원격 서버는 소스 변경을 알 수 없으므로 호출하는 쪽에서 백그라운드로 다시 확인합니다.
+"""
+import os
+import json
+import hashlib
+import logging
+from importlib import metadata
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 캐시 파일 경로 (비어 있으면 비활성화)
+TOOL_SCHEMA_CACHE = os.path.expanduser(os.getenv("TOOL_SCHEMA_CACHE", "~/.cache/memo-chatbot/mcp_tools.json"))
+
+# 캐시 파일 형식 버전 (형식이 바뀌면 올림)
+CACHE_FORMAT = 1
+
+logger = logging.getLogger(__name__)
+
+
+def _version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _source_fingerprint(server_dir: str) -> list:
+    """로컬 서버 소스 파일의 (이름, 크기, 수정 시각) 목록"""
+    fingerprint = []
+    for name in sorted(os.listdir(server_dir)):
+        if name.endswith(".py"):
+            stat = os.stat(os.path.join(server_dir, name))
+            fingerprint.append((name, stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+def cache_key(init_result: Any, mode: str, server_dir: str, server_url: str) -> str:
+    """도구 목록이 같다고 볼 수 있는 조건의 해시"""
+    server_info = init_result.serverInfo
+    payload = {
+        "format": CACHE_FORMAT,
+        "server": [server_info.name, server_info.version],
+        "protocol": str(init_result.protocolVersion),
+        "mcp": _version("mcp"),
+        "langchain_mcp": _version("langchain-mcp"),
+        "location": server_url if mode in ("sse", "http") else _source_fingerprint(server_dir),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def load(key: str) -> Optional[Dict[str, Any]]:
+    """키가 같으면 저장된 list_tools 결과(dict) 반환"""
+    if not TOOL_SCHEMA_CACHE:
+        return None
+    try:
+        with open(TOOL_SCHEMA_CACHE, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("key") != key:
+        return None
+    return entry.get("tools")
+
+
+def save(key: str, tools_result: Dict[str, Any]):
+    """list_tools 결과 저장 (임시 파일에 쓴 뒤 교체, 실패해도 무시)"""
+    if not TOOL_SCHEMA_CACHE:
+        return
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(TOOL_SCHEMA_CACHE)), exist_ok=True)
+        tmp_path = f"{TOOL_SCHEMA_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "tools": tools_result}, f, ensure_ascii=False)
+        os.replace(tmp_path, TOOL_SCHEMA_CACHE)
+    except OSError as e:
+        logger.debug("도구 목록 캐시 저장 실패: %s", e)
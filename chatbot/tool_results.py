@@ -0,0 +1,85 @@
+"""MCP 도구 결과 디코딩/인코딩 - 모델 입력 토큰을 줄이는 ToolMessage 내용 생성
+
+TOOL_RESULT_FORMAT으로 인코딩 방식을 선택합니다.
+- table   : 메모 목록처럼 dict 리스트는 CSV(헤더 + 행), 그 밖에는 compact JSON (기본값)
+- compact : 공백 없는 JSON
+- pretty  : 들여쓰기 JSON (이전 동작)
+
+목록 결과의 긴 content 필드는 TOOL_RESULT_MAX_CONTENT_CHARS 글자로 자르고
+get_memo로 전체 내용을 조회하라는 표시를 붙입니다. (단건 조회 결과는 자르지 않음)
+"""
+import io
+import os
+import csv
+import json
+from typing import Any, Dict, List
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+TOOL_RESULT_FORMAT = os.getenv("TOOL_RESULT_FORMAT", "table").lower()
+# 목록 결과의 content 최대 글자 수 (0이면 자르지 않음)
+TOOL_RESULT_MAX_CONTENT_CHARS = int(os.getenv("TOOL_RESULT_MAX_CONTENT_CHARS", "300"))
+
+VALIDATION_ERROR_PREFIX = "Output validation error: "
+
+
+def decode_tool_text(text: str) -> Any:
+    """FastMCP 텍스트 결과를 한 번만 파싱 - JSON이면 파싱된 객체, 아니면 문자열"""
+    # "Output validation error: " 프리픽스 제거
+    if text.startswith(VALIDATION_ERROR_PREFIX):
+        text = text[len(VALIDATION_ERROR_PREFIX):]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # JSON이 아니면 그대로 사용
+        return text
+
+
+def _truncate_content(item: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    """긴 content를 자르고 후속 조회 방법 표시"""
+    content = item.get("content")
+    if not isinstance(content, str) or len(content) <= limit:
+        return item
+    hint = f", 전체 내용은 get_memo(memo_id={item['id']})" if "id" in item else ""
+    return {**item, "content": f"{content[:limit]}…(+{len(content) - limit}자{hint})"}
+
+
+def _is_records(data: Any) -> bool:
+    return isinstance(data, list) and bool(data) and all(isinstance(row, dict) for row in data)
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value)
+
+
+def _to_table(rows: List[Dict[str, Any]]) -> str:
+    """dict 리스트를 CSV로 변환 (열 순서는 처음 등장한 키 순서)"""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(row.get(column)) for column in columns])
+    return buffer.getvalue().rstrip("\n")
+
+
+def encode_tool_result(data: Any, fmt: str = None) -> str:
+    """ToolMessage 내용 생성 - 설정된 형식으로 인코딩"""
+    if isinstance(data, str):
+        return data
+    fmt = fmt or TOOL_RESULT_FORMAT
+
+    if TOOL_RESULT_MAX_CONTENT_CHARS > 0 and _is_records(data):
+        data = [_truncate_content(row, TOOL_RESULT_MAX_CONTENT_CHARS) for row in data]
+
+    if fmt == "pretty":
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    if fmt == "table" and _is_records(data):
+        return _to_table(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,175 @@
+"""챗봇 계측 - 턴/노드/MCP 도구 호출 구간(span)과 LLM 토큰 사용량 기록
+
+TRACE_EXPORTER로 내보내기 방식을 선택합니다.
+- none  : 비활성화 (기본값, span()이 아무것도 하지 않는 공유 객체를 반환)
+- log   : 'tracing' 로거로 span을 한 줄 JSON으로 출력
+- jsonl : TRACE_FILE에 span을 한 줄씩 JSON으로 추가
+
+한 턴의 span은 같은 trace_id를 가지며 parent_id로 중첩 관계를 표현합니다.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 계측 설정
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACING_ENABLED = TRACE_EXPORTER in ("log", "jsonl")
+# 로그 레벨 (DEBUG로 설정하면 도구 결과 미리보기 등 디버그 출력 표시)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+
+logger = logging.getLogger("tracing")
+
+_current_trace: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("span", default=None)
+
+_file = None
+# span 이름별 [횟수, 총 시간(초), 오류 수]
+_span_stats: Dict[str, list] = {}
+_token_stats = {"llm_calls": 0, "input_tokens": 0, "output_tokens": 0}
+
+
+def configure_logging():
+    """LOG_LEVEL로 루트 로거 설정 (stdout은 대화 출력용이므로 stderr 사용)"""
+    logging.basicConfig(
+        level=getattr(logging, LOG_LEVEL, logging.WARNING),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+
+
+class Span:
+    """측정 구간 - with 블록 동안의 시간과 속성 기록"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "started", "wall_started", "_tokens")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], trace_id: Optional[str] = None):
+        parent = _current_span.get()
+        self.name = name
+        self.trace_id = trace_id or _current_trace.get() or uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None and parent.trace_id == self.trace_id else None
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """span 속성 추가"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._tokens = (_current_trace.set(self.trace_id), _current_span.set(self))
+        self.wall_started = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        trace_token, span_token = self._tokens
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+        stat = _span_stats.setdefault(self.name, [0, 0.0, 0])
+        stat[0] += 1
+        stat[1] += duration
+        if exc_type is not None:
+            stat[2] += 1
+
+        _export({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.wall_started,
+            "duration_ms": round(duration * 1000, 3),
+            "status": "ok" if exc_type is None else "error",
+            "error": repr(exc) if exc is not None else None,
+            "attrs": self.attrs,
+        })
+        return False
+
+
+class _NoopSpan:
+    """비활성화 시 사용하는 공유 span (기록하지 않음)"""
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _export(record: Dict[str, Any]):
+    """설정된 내보내기 방식으로 span 기록"""
+    global _file
+
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    if TRACE_EXPORTER == "jsonl":
+        if _file is None:
+            _file = open(TRACE_FILE, "a", encoding="utf-8", buffering=1)
+        _file.write(line + "\n")
+    else:
+        logger.info(line)
+
+
+def span(name: str, **attrs):
+    """측정 구간 시작 - with tracing.span("mcp.tool", tool=...) as s: ..."""
+    if not TRACING_ENABLED:
+        return _NOOP_SPAN
+    return Span(name, attrs)
+
+
+def trace(name: str = "turn", trace_id: Optional[str] = None, **attrs):
+    """새 trace의 최상위 span 시작 (한 턴마다 호출, 하위 노드/도구 span이 같은 trace_id 공유)"""
+    if not TRACING_ENABLED:
+        return _NOOP_SPAN
+    return Span(name, attrs, trace_id=trace_id or uuid.uuid4().hex)
+
+
+def current_trace_id() -> Optional[str]:
+    """현재 trace_id (trace 밖이거나 비활성화면 None)"""
+    return _current_trace.get()
+
+
+def record_tokens(response: Any):
+    """LLM 응답의 토큰 사용량을 현재 span과 누적 통계에 기록"""
+    if not TRACING_ENABLED:
+        return
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return
+
+    _token_stats["llm_calls"] += 1
+    _token_stats["input_tokens"] += usage.get("input_tokens", 0)
+    _token_stats["output_tokens"] += usage.get("output_tokens", 0)
+    current = _current_span.get()
+    if current is not None:
+        current.set(input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+
+
+def stats() -> Dict[str, Any]:
+    """span 이름별 횟수/평균 시간/오류 수와 토큰 사용량 합계"""
+    return {
+        "spans": {
+            name: {
+                "count": count,
+                "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+                "errors": errors,
+            }
+            for name, (count, total, errors) in sorted(_span_stats.items())
+        },
+        "tokens": dict(_token_stats),
+    }
@@ -0,0 +1,276 @@
+"""도구 호출 수락 제어 - 전체 동시 실행 제한, 세션별 속도 제한, 대기열
+
+SSE/HTTP로 MCP 서버를 여러 클라이언트가 공유할 때 한 에이전트 루프가
+백엔드를 독점하지 않도록 모든 도구 호출을 FastMCP 미들웨어에서 조율합니다.
+
+- 동시 실행: 전체 MCP_MAX_CONCURRENT_TOOLS개까지, 나머지는 대기열에서 대기
+- 대기열: 최대 MCP_MAX_QUEUED_TOOLS개, 가득 차거나 MCP_QUEUE_TIMEOUT초를 넘기면 과부하 오류
+- 우선순위: 읽기 도구가 쓰기 도구보다 먼저 실행 (쓰기는 MCP_WRITE_QUEUE_DELAY초만큼 뒤로 밀려
+  계속 들어오는 읽기에 밀려 굶지 않음)
+- 속도 제한: 세션별 토큰 버킷 (초당 MCP_SESSION_RATE개, 순간 최대 MCP_SESSION_BURST개, 기본 비활성화)
+  MCP 세션(또는 클라이언트 주소) 단위이므로 챗봇 서비스/배치 실행처럼 여러 대화가 MCP 세션
+  하나를 공유하는 클라이언트에는 전체 호출 속도 상한으로 작동함
+- 마감 시간: 도구 호출 _meta에 남은 시간(TIMEOUT_META_KEY, 밀리초)이 있으면 대기열 대기와
+  백엔드 요청을 그 안에 끝냄 (DeadlineMiddleware, 클라이언트 취소는 notifications/cancelled로 처리)
+
+제한은 프로세스(워커)마다 따로 적용됩니다.
+"""
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware
+
+import metrics
+import resilience
+
+# 환경 변수 로드
+load_dotenv()
+
+ADMISSION_ENABLED = os.getenv("MCP_ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# 전체 동시 실행 도구 호출 수 / 대기열 길이 / 대기열 최대 대기 시간(초, 0이면 무제한)
+MAX_CONCURRENT_TOOLS = int(os.getenv("MCP_MAX_CONCURRENT_TOOLS", "16"))
+MAX_QUEUED_TOOLS = int(os.getenv("MCP_MAX_QUEUED_TOOLS", "64"))
+QUEUE_TIMEOUT = float(os.getenv("MCP_QUEUE_TIMEOUT", "10"))
+# 쓰기 도구가 대기열에서 읽기 도구에게 양보하는 시간(초)
+WRITE_QUEUE_DELAY = float(os.getenv("MCP_WRITE_QUEUE_DELAY", "0.5"))
+# 세션별 초당 호출 수와 순간 최대 호출 수 (속도 0이면 비활성화)
+SESSION_RATE = float(os.getenv("MCP_SESSION_RATE", "0"))
+SESSION_BURST = int(os.getenv("MCP_SESSION_BURST", "20"))
+
+# 클라이언트가 도구 호출 _meta로 보내는 남은 시간(밀리초) 키
+TIMEOUT_META_KEY = "memo/timeout_ms"
+
+# 대기열에서 먼저 실행할 읽기 전용 도구
+READ_TOOLS = {"list_memos", "get_memo", "get_memos", "search_memos", "count_memos"}
+# 유지할 세션 버킷 수 (오래 사용하지 않은 세션부터 제거)
+MAX_BUCKETS = 10000
+
+
+class OverloadedError(ToolError):
+    """대기열이 가득 찼거나 대기 시간이 초과됨"""
+
+
+class RateLimitedError(ToolError):
+    """세션 호출 속도 제한 초과"""
+
+
+class DeadlineExceededError(ToolError):
+    """호출한 쪽이 정한 마감 시간이 지나 도구를 실행하지 않음"""
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 최대 burst개의 토큰"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """토큰 하나 사용 - 성공하면 0, 부족하면 다음 토큰까지 기다릴 시간(초)"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Scheduler:
+    """동시 실행 슬롯과 우선순위 대기열"""
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.active = 0
+        self.queued = 0
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self, is_read: bool, timeout: float = 0) -> float:
+        """슬롯 하나 획득 - 대기한 시간(초) 반환, 대기열이 가득 차면 OverloadedError"""
+        if self.active < self.max_concurrent and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return 0.0
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise OverloadedError(
+                f"MCP 서버가 과부하 상태입니다. (실행 중 {self.active}개, 대기 {self.queued}개) 잠시 후 다시 시도하세요."
+            )
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        # 쓰기는 WRITE_QUEUE_DELAY만큼 늦게 들어온 것으로 취급하여 그 사이의 읽기가 먼저 실행
+        due = started + (0 if is_read else WRITE_QUEUE_DELAY)
+        heapq.heappush(self._waiters, (due, next(self._seq), future))
+        self.queued += 1
+        try:
+            if timeout > 0:
+                await asyncio.wait_for(asyncio.shield(future), timeout)
+            else:
+                await future
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if future.done() and not future.cancelled():
+                # 슬롯을 넘겨받은 직후 취소됨 - 다음 대기자에게 넘김
+                self.release()
+            else:
+                future.cancel()
+                self.queued -= 1
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise OverloadedError(
+                    f"MCP 서버가 바빠 {timeout:g}초 안에 도구를 실행하지 못했습니다. 잠시 후 다시 시도하세요."
+                ) from e
+            raise
+        self.admitted += 1
+        return time.monotonic() - started
+
+    def release(self):
+        """슬롯 반납 - 대기자가 있으면 그대로 넘김"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # 취소/시간 초과로 떠난 대기자
+                continue
+            self.queued -= 1
+            future.set_result(None)
+            return
+        self.active -= 1
+
+
+scheduler = Scheduler(MAX_CONCURRENT_TOOLS, MAX_QUEUED_TOOLS)
+_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+_stats = {"rate_limited": 0, "deadline_calls": 0, "deadline_exceeded": 0}
+
+
+def _client_key(ctx: Any) -> str:
+    """속도 제한 단위 - MCP 세션 (stateless HTTP는 요청마다 세션이 새로 생기므로 클라이언트 주소)"""
+    request_context = ctx.request_context if ctx is not None else None
+    request = request_context.request if request_context is not None else None
+    if request is not None:
+        session_id = request.headers.get("mcp-session-id") or request.query_params.get("session_id")
+        if session_id:
+            return session_id
+        if request.client is not None:
+            return f"addr:{request.client.host}"
+    if request_context is None:
+        return "local"
+    return ctx.session_id
+
+
+def check_rate(key: str):
+    """세션 토큰 버킷 확인 - 초과 시 RateLimitedError"""
+    if SESSION_RATE <= 0:
+        return
+    bucket = _buckets.get(key)
+    if bucket is None:
+        bucket = _buckets[key] = TokenBucket(SESSION_RATE, SESSION_BURST)
+        if len(_buckets) > MAX_BUCKETS:
+            _buckets.popitem(last=False)
+    else:
+        _buckets.move_to_end(key)
+
+    retry_after = bucket.take()
+    if retry_after > 0:
+        _stats["rate_limited"] += 1
+        raise RateLimitedError(
+            f"호출 속도 제한(초당 {SESSION_RATE:g}회)을 넘었습니다. {retry_after:.1f}초 후 다시 시도하세요."
+        )
+
+
+class AdmissionMiddleware(Middleware):
+    """모든 도구 호출을 속도 제한 → 대기열 → 실행 순서로 처리"""
+
+    async def on_call_tool(self, context, call_next):
+        if not ADMISSION_ENABLED:
+            return await call_next(context)
+
+        check_rate(_client_key(context.fastmcp_context))
+        is_read = context.message.name in READ_TOOLS
+        # 요청 마감 시간이 더 짧으면 그만큼만 대기
+        timeout = QUEUE_TIMEOUT
+        left = resilience.remaining()
+        deadline_bound = left is not None and (timeout <= 0 or left < timeout)
+        if deadline_bound:
+            timeout = left
+            if timeout <= 0:
+                _stats["deadline_exceeded"] += 1
+                raise DeadlineExceededError("요청 마감 시간이 지나 도구를 실행하지 않았습니다.")
+        try:
+            waited = await scheduler.acquire(is_read, timeout)
+        except OverloadedError as e:
+            # 대기가 QUEUE_TIMEOUT이 아니라 클라이언트 마감 시간으로 끊긴 경우
+            if deadline_bound and isinstance(e.__cause__, asyncio.TimeoutError):
+                _stats["deadline_exceeded"] += 1
+                raise DeadlineExceededError(
+                    "요청 마감 시간 안에 대기열을 통과하지 못해 도구를 실행하지 않았습니다."
+                ) from e
+            raise
+        metrics.observe("mcp_admission_wait_seconds", waited, kind="read" if is_read else "write")
+        try:
+            return await call_next(context)
+        finally:
+            scheduler.release()
+
+
+def _request_timeout(ctx: Any) -> Optional[float]:
+    """도구 호출 _meta의 남은 시간(초) - 없거나 형식이 다르면 None"""
+    request_context = ctx.request_context if ctx is not None else None
+    meta = request_context.meta if request_context is not None else None
+    value = (meta.model_extra or {}).get(TIMEOUT_META_KEY) if meta is not None else None
+    try:
+        return max(float(value), 0.0) / 1000 if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class DeadlineMiddleware(Middleware):
+    """클라이언트가 보낸 남은 시간을 이 도구 호출의 마감 시간으로 설정
+
+    대기열 대기와 백엔드 요청(resilience.call)은 남은 시간만큼만 기다리고, 마감 후에는
+    새 백엔드 요청을 보내지 않습니다. 도구 실행 전체를 타임아웃으로 감싸지는 않습니다.
+    클라이언트의 notifications/cancelled와 동시에 만료되면 취소가 오류 결과로 바뀌어
+    MCP 세션이 이미 취소된 요청에 다시 응답하다 세션이 종료되기 때문입니다.
+    AdmissionMiddleware보다 먼저 등록해야 대기열 대기 시간도 마감 시간에 포함됩니다.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        timeout = _request_timeout(context.fastmcp_context)
+        if timeout is None:
+            return await call_next(context)
+
+        _stats["deadline_calls"] += 1
+        with resilience.request_deadline(timeout):
+            return await call_next(context)
+
+
+def stats() -> Dict[str, Any]:
+    """동시 실행/대기열/속도 제한 통계"""
+    return {
+        "enabled": ADMISSION_ENABLED,
+        "active": scheduler.active,
+        "queued": scheduler.queued,
+        "max_concurrent": scheduler.max_concurrent,
+        "max_queued": scheduler.max_queued,
+        "admitted": scheduler.admitted,
+        "rejected": scheduler.rejected,
+        "timed_out": scheduler.timed_out,
+        "rate_limited": _stats["rate_limited"],
+        "deadline_calls": _stats["deadline_calls"],
+        "deadline_exceeded": _stats["deadline_exceeded"],
+        "sessions": len(_buckets),
+    }
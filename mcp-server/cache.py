@@ -0,0 +1,145 @@
+"""메모 읽기 캐시 (LRU + TTL)
+
+get_memo / list_memos 결과를 MCP 서버 프로세스 안에 보관하여
+같은 대화에서 반복되는 조회가 백엔드로 가지 않도록 합니다.
+쓰기 도구(create/update/delete)가 캐시를 갱신하거나 무효화합니다.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 캐시 설정
+CACHE_ENABLED = os.getenv("MEMO_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_TTL = float(os.getenv("MEMO_CACHE_TTL", "30"))
+CACHE_MAX_MEMOS = int(os.getenv("MEMO_CACHE_MAX_MEMOS", "1024"))
+CACHE_MAX_PAGES = int(os.getenv("MEMO_CACHE_MAX_PAGES", "128"))
+
+# 캐시 미스를 None 값과 구분하기 위한 표식
+MISS = object()
+
+
+class TTLCache:
+    """크기 제한(LRU)과 만료 시간(TTL)을 가진 캐시"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """값 조회 - 없거나 만료되었으면 MISS 반환"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISS
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISS
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """값 저장 - 크기를 넘으면 가장 오래 사용하지 않은 항목 제거"""
+        if self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """특정 키 무효화"""
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        """전체 무효화"""
+        self.invalidations += len(self._data)
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/미스/제거 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# 메모 ID별 캐시와 (skip, limit) 페이지 캐시
+memo_cache = TTLCache(CACHE_MAX_MEMOS, CACHE_TTL)
+page_cache = TTLCache(CACHE_MAX_PAGES, CACHE_TTL)
+
+
+def get_memo(memo_id: int) -> Any:
+    """캐시된 메모 조회 (비활성화 시 항상 MISS)"""
+    if not CACHE_ENABLED:
+        return MISS
+    return memo_cache.get(memo_id)
+
+
+def get_page(skip: int, limit: int) -> Any:
+    """캐시된 메모 목록 페이지 조회"""
+    if not CACHE_ENABLED:
+        return MISS
+    return page_cache.get((skip, limit))
+
+
+def store_memo(memo: Optional[Dict[str, Any]]):
+    """메모 저장 (생성/수정/조회 결과)"""
+    if CACHE_ENABLED and isinstance(memo, dict) and "id" in memo:
+        memo_cache.set(memo["id"], memo)
+
+
+def store_page(skip: int, limit: int, memos: Any):
+    """목록 페이지 저장 - 포함된 메모도 ID별 캐시에 채움"""
+    if not CACHE_ENABLED:
+        return
+    page_cache.set((skip, limit), memos)
+    if isinstance(memos, list):
+        for memo in memos:
+            store_memo(memo)
+
+
+def invalidate_memo(memo_id: int):
+    """메모 삭제 시 ID별 항목 제거"""
+    memo_cache.invalidate(memo_id)
+
+
+def invalidate_pages():
+    """메모 집합이 바뀌었으므로 모든 목록 페이지 무효화"""
+    page_cache.clear()
+
+
+def stats() -> Dict[str, Any]:
+    """캐시 통계 (백엔드 요청 절감량 확인용)"""
+    return {
+        "enabled": CACHE_ENABLED,
+        "memos": memo_cache.stats(),
+        "pages": page_cache.stats(),
+    }
@@ -0,0 +1,86 @@
+"""메모 백엔드용 공유 HTTP 클라이언트 (커넥션 풀)
+
+MCP 서버 프로세스당 하나의 httpx.AsyncClient를 유지하여
+도구 호출마다 TCP/TLS 연결을 새로 맺지 않도록 합니다.
+"""
+import os
+import sys
+import httpx
+from typing import Optional
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 커넥션 풀 설정
+HTTP_MAX_CONNECTIONS = int(os.getenv("MEMO_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("MEMO_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("MEMO_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("MEMO_HTTP2", "false").lower() in ("1", "true", "yes")
+
+# 타임아웃 설정 (초)
+HTTP_TIMEOUT = float(os.getenv("MEMO_HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("MEMO_HTTP_CONNECT_TIMEOUT", "5"))
+
+# 전역 클라이언트
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 사용 가능 여부 (h2 패키지 필요)"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_client() -> httpx.AsyncClient:
+    """설정값으로 새 AsyncClient 생성"""
+    http2 = HTTP2_ENABLED
+    if http2 and not _http2_available():
+        # stdio 모드에서는 stdout이 MCP 채널이므로 stderr로 출력
+        print("⚠️ MEMO_HTTP2가 설정되었지만 h2 패키지가 없어 HTTP/1.1을 사용합니다. (pip install httpx[http2])",
+              file=sys.stderr)
+        http2 = False
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        http2=http2,
+    )
+
+
+async def start_client() -> httpx.AsyncClient:
+    """공유 클라이언트 시작 (이미 있으면 그대로 반환)"""
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = create_client()
+    return _client
+
+
+async def close_client():
+    """공유 클라이언트 종료"""
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """공유 클라이언트 반환
+
+    서버 lifespan 밖에서 tools 모듈을 직접 사용하는 경우를 위해
+    클라이언트가 없으면 지연 생성합니다.
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = create_client()
+    return _client
@@ -1,18 +1,122 @@
-"""MCP SSE 서버 - HTTP 서버로 실행 (FastMCP)"""
-import sys
+"""MCP HTTP 서버 - SSE 또는 streamable-HTTP 전송으로 실행 (FastMCP + uvicorn)
+
+엔드포인트:
+    GET  /sse, POST /messages/   SSE 전송 (--transport sse, 기본값)
+    POST /mcp                    streamable-HTTP 전송 (--transport http)
+    GET  /health                 상태 확인 (로드 밸런서/헬스 체크용)
+    GET  /metrics                Prometheus 지표 (METRICS_EXPORTER 설정 시)
+
+여러 워커(--workers)는 streamable-HTTP 전송에서만 지원합니다.
+워커 간 세션을 공유하지 않으므로 이때는 요청마다 독립적인 stateless 모드로 실행합니다.
+(SSE는 /sse 연결과 /messages 요청이 같은 프로세스로 가야 하므로 단일 워커)
+
+여러 워커에서는 한 대화의 요청도 여러 워커로 나뉘므로, 다른 워커의 쓰기를 알 수 없는
+프로세스 내 상태(메모 캐시, 로컬 복제본, 상주 검색 색인)를 끄고 매번 백엔드에서 읽습니다.
+
+사용법:
+    python mcp-server/mcp_server_sse.py                              # SSE, 포트 8001
+    python mcp-server/mcp_server_sse.py --transport http --workers 4
+"""
 import os
+import sys
+import argparse
+from dotenv import load_dotenv
 
 # 현재 디렉토리를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from server import mcp
 
-if __name__ == "__main__":
+# 환경 변수 로드
+load_dotenv()
+
+# HTTP 서버 설정
+MCP_HTTP_HOST = os.getenv("MCP_HTTP_HOST", "0.0.0.0")
+MCP_HTTP_PORT = int(os.getenv("MCP_HTTP_PORT", "8001"))
+MCP_HTTP_TRANSPORT = os.getenv("MCP_HTTP_TRANSPORT", "sse")  # "sse" 또는 "http"
+MCP_HTTP_WORKERS = int(os.getenv("MCP_HTTP_WORKERS", "1"))
+# keep-alive 유지 시간 / 종료 시 진행 중인 요청을 기다리는 시간 (초)
+MCP_HTTP_KEEPALIVE = int(os.getenv("MCP_HTTP_KEEPALIVE", "15"))
+MCP_HTTP_GRACEFUL_TIMEOUT = int(os.getenv("MCP_HTTP_GRACEFUL_TIMEOUT", "10"))
+# 워커당 동시 연결 상한 (0이면 제한 없음, 초과 시 503) / listen backlog
+MCP_HTTP_LIMIT_CONCURRENCY = int(os.getenv("MCP_HTTP_LIMIT_CONCURRENCY", "0"))
+MCP_HTTP_BACKLOG = int(os.getenv("MCP_HTTP_BACKLOG", "2048"))
+
+
+def create_app():
+    """ASGI 앱 생성 (uvicorn 워커 프로세스마다 호출)"""
+    from server import mcp
+
+    transport = os.getenv("MCP_HTTP_TRANSPORT", MCP_HTTP_TRANSPORT)
+    if transport == "sse":
+        return mcp.http_app(transport="sse")
+    stateless = int(os.getenv("MCP_HTTP_WORKERS", MCP_HTTP_WORKERS)) > 1
+    if stateless:
+        _disable_worker_local_state()
+    return mcp.http_app(transport="http", stateless_http=stateless)
+
+
+def _disable_worker_local_state():
+    """워커마다 따로 유지되어 다른 워커의 쓰기 후 오래된 결과를 돌려줄 수 있는 상태 끄기"""
+    import cache
+    import replica
+    import search_index
+
+    enabled = [
+        name for name, on in (
+            ("MEMO_CACHE_ENABLED", cache.CACHE_ENABLED),
+            ("MEMO_REPLICA_ENABLED", replica.REPLICA_ENABLED),
+            ("MEMO_SEARCH_INDEX_ENABLED", search_index.SEARCH_INDEX_ENABLED),
+        ) if on
+    ]
+    if enabled:
+        print(f"⚠️ 여러 워커에서는 워커 간 일관성을 위해 {', '.join(enabled)}를 끕니다.", file=sys.stderr)
+    cache.CACHE_ENABLED = False
+    replica.REPLICA_ENABLED = False
+    search_index.SEARCH_INDEX_ENABLED = False
+
+
+def main(argv=None):
+    """HTTP 서버 실행"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="MCP HTTP 서버")
+    parser.add_argument("--host", default=MCP_HTTP_HOST, help="바인드 주소")
+    parser.add_argument("--port", type=int, default=MCP_HTTP_PORT, help="포트")
+    parser.add_argument("--transport", choices=["sse", "http"], default=MCP_HTTP_TRANSPORT,
+                        help="MCP 전송 방식 (sse 또는 streamable-HTTP)")
+    parser.add_argument("--workers", type=int, default=MCP_HTTP_WORKERS, help="워커 프로세스 수 (http 전송만)")
+    parser.add_argument("--log-level", default="info", help="uvicorn 로그 레벨")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and args.transport == "sse":
+        parser.error("SSE 전송은 세션이 프로세스에 묶여 있어 --workers 1만 지원합니다. 여러 워커는 --transport http를 사용하세요.")
+
+    # 워커 프로세스가 create_app에서 같은 설정을 읽도록 환경 변수로 전달
+    os.environ["MCP_HTTP_TRANSPORT"] = args.transport
+    os.environ["MCP_HTTP_WORKERS"] = str(args.workers)
+
+    endpoint = "/sse" if args.transport == "sse" else "/mcp"
     print("=" * 60)
-    print("🚀 MCP 서버 (SSE 모드) 시작")
+    print(f"🚀 MCP 서버 ({args.transport.upper()} 모드) 시작")
     print("=" * 60)
-    print("서버 주소: http://localhost:8001")
-    print("SSE 엔드포인트: http://localhost:8001/sse")
+    print(f"서버 주소: http://{args.host}:{args.port}")
+    print(f"MCP 엔드포인트: http://{args.host}:{args.port}{endpoint}")
+    print(f"워커: {args.workers}개 · 헬스 체크: /health")
     print("\nCtrl+C를 눌러 서버를 종료할 수 있습니다.\n")
-    
-    # FastMCP의 내장 SSE 서버 실행 (포트 8001)
-    mcp.run(transport="sse", port=8001)
+
+    uvicorn.run(
+        "mcp_server_sse:create_app",
+        factory=True,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        timeout_keep_alive=MCP_HTTP_KEEPALIVE,
+        timeout_graceful_shutdown=MCP_HTTP_GRACEFUL_TIMEOUT,
+        limit_concurrency=MCP_HTTP_LIMIT_CONCURRENCY or None,
+        backlog=MCP_HTTP_BACKLOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
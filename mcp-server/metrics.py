@@ -0,0 +1,156 @@
+"""MCP 서버 계측 - 백엔드 HTTP 요청 소요 시간 히스토그램
+
+METRICS_EXPORTER로 내보내기 방식을 선택합니다.
+- none       : 비활성화 (기본값, timer()가 아무것도 하지 않는 공유 객체를 반환)
+- prometheus : 메모리에 집계하고 HTTP 서버의 GET /metrics에서 Prometheus 텍스트 형식으로 제공
+- jsonl      : prometheus와 같이 집계하면서 측정값을 METRICS_FILE에 한 줄씩 JSON으로 추가
+"""
+import os
+import json
+import time
+from typing import Any, Dict, Tuple
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 계측 설정
+METRICS_EXPORTER = os.getenv("METRICS_EXPORTER", "none").lower()
+METRICS_FILE = os.getenv("METRICS_FILE", "mcp_metrics.jsonl")
+METRICS_ENABLED = METRICS_EXPORTER in ("prometheus", "jsonl")
+
+# 히스토그램 버킷 상한 (초)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_file = None
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram과 같은 의미)"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+# (메트릭 이름, 정렬된 라벨) → 히스토그램
+_histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+
+
+def observe(name: str, seconds: float, **labels: Any):
+    """측정값 하나 기록"""
+    if not METRICS_ENABLED:
+        return
+    global _file
+
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    histogram = _histograms.get(key)
+    if histogram is None:
+        histogram = _histograms[key] = Histogram()
+    histogram.observe(seconds)
+
+    if METRICS_EXPORTER == "jsonl":
+        if _file is None:
+            _file = open(METRICS_FILE, "a", encoding="utf-8", buffering=1)
+        _file.write(json.dumps(
+            {"ts": time.time(), "metric": name, "labels": dict(key[1]), "seconds": round(seconds, 6)},
+            ensure_ascii=False
+        ) + "\n")
+
+
+class Timer:
+    """with 블록 소요 시간을 기록 - 블록 안에서 labels에 라벨 추가 가능 (예: 응답 상태 코드)"""
+
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name: str, labels: Dict[str, Any]):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.labels.setdefault("status", "error")
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _NoopTimer:
+    """비활성화 시 사용하는 공유 타이머 (기록하지 않음)"""
+
+    @property
+    def labels(self) -> Dict[str, Any]:
+        # 호출마다 새 dict - 블록 안에서 추가한 라벨이 공유 인스턴스에 쌓이지 않음
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def timer(name: str, **labels: Any):
+    """소요 시간 측정 - with metrics.timer("memo_backend_request_seconds", method="GET") as t: ..."""
+    if not METRICS_ENABLED:
+        return _NOOP_TIMER
+    return Timer(name, labels)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _format_labels(labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = tuple(labels) + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render_prometheus(gauges: Dict[str, float] = None, counters: Dict[str, float] = None) -> str:
+    """
+    집계된 히스토그램과 추가 게이지/카운터를 Prometheus 텍스트 형식으로 변환
+
+    counters는 프로세스 시작 후 단조 증가하는 누적값으로, rate()를 쓸 수 있도록
+    이름에 _total을 붙여 counter 타입으로 내보냅니다. (크기/상태/경과 시간은 gauges)
+    """
+    lines = []
+    seen = set()
+    for (name, labels), histogram in sorted(_histograms.items()):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {histogram.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+    for name, value in sorted((counters or {}).items()):
+        lines.append(f"# TYPE {name}_total counter")
+        lines.append(f"{name}_total {value}")
+
+    for name, value in sorted((gauges or {}).items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,288 @@
+"""메모 로컬 복제본 - 백엔드를 주기적으로 동기화한 SQLite 사본에서 읽기 (opt-in)
+
+한 사용자의 메모는 작고 천천히 바뀌므로, MEMO_REPLICA_ENABLED이면 MCP 서버가
+메모 전체의 로컬 사본을 유지하고 get_memo/list_memos를 네트워크 없이 응답합니다.
+
+- 동기화: MEMO_REPLICA_SYNC_INTERVAL초마다 백그라운드에서 실행
+  - 증분: updated_at 기준 워터마크 이후 변경분만 요청 (MEMO_REPLICA_DELTA_PARAM 쿼리 파라미터)
+    백엔드가 파라미터를 무시하고 이전 메모까지 돌려주면 이후로는 전체 동기화만 사용
+  - 전체: 목록 전체를 읽어 바뀐 행만 반영하고, 목록에 없는 행(다른 클라이언트가 삭제)은 제거
+    (증분만으로는 삭제를 알 수 없으므로 MEMO_REPLICA_FULL_SYNC_EVERY번마다, 그리고 마지막 전체
+    동기화가 MEMO_REPLICA_MAX_STALENESS초를 넘기기 전에 전체 동기화)
+- 쓰기: 이 서버의 생성/수정/삭제는 백엔드 성공 후 바로 반영 (write-through)
+- 신선도: 마지막 전체 동기화 후 MEMO_REPLICA_MAX_STALENESS초가 지나면 원격 경로로 읽음
+  (증분 동기화는 삭제를 반영하지 못하므로 삭제까지 반영된 시각 기준)
+- 목록 순서: 마지막 전체 동기화에서 백엔드가 돌려준 순서, 이후 생성된 메모는 뒤에 추가
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+REPLICA_ENABLED = os.getenv("MEMO_REPLICA_ENABLED", "false").lower() in ("1", "true", "yes")
+# SQLite 파일 경로 (기본: 메모리)
+REPLICA_DB = os.getenv("MEMO_REPLICA_DB", ":memory:")
+# 동기화 주기 / 로컬 읽기를 허용하는 최대 경과 시간 (초)
+REPLICA_SYNC_INTERVAL = float(os.getenv("MEMO_REPLICA_SYNC_INTERVAL", "5"))
+REPLICA_MAX_STALENESS = float(os.getenv("MEMO_REPLICA_MAX_STALENESS", "30"))
+# 증분 동기화에 사용할 백엔드 쿼리 파라미터 (비어 있으면 항상 전체 동기화)
+REPLICA_DELTA_PARAM = os.getenv("MEMO_REPLICA_DELTA_PARAM", "updated_since")
+# 증분 동기화 N번마다 전체 동기화 (삭제 반영)
+REPLICA_FULL_SYNC_EVERY = int(os.getenv("MEMO_REPLICA_FULL_SYNC_EVERY", "12"))
+# 동기화 시 페이지 크기
+REPLICA_PAGE_SIZE = int(os.getenv("MEMO_REPLICA_PAGE_SIZE", "100"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memos (
+    id INTEGER PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT '',
+    touched REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memos_seq ON memos (seq);
+"""
+
+logger = logging.getLogger(__name__)
+
+# (페이지 크기, 추가 쿼리 파라미터) → 목록을 처음부터 페이지 단위로 내보내는 비동기 이터레이터
+PageSource = Callable[[int, Optional[Dict[str, Any]]], AsyncIterator[List[Dict[str, Any]]]]
+
+
+class Replica:
+    """메모 SQLite 사본"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA mmap_size=67108864")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # 이 프로세스에서 동기화가 끝난 시각 (파일 사본도 재시작 후 첫 동기화 전까지는 사용하지 않음)
+        self.synced_at = 0.0
+        # 마지막 전체 동기화를 시작한 시각 (이 시각까지의 삭제가 반영됨)
+        self.full_synced_at = 0.0
+        self.watermark = ""
+        self.delta_supported = bool(REPLICA_DELTA_PARAM)
+        self.syncs_since_full = 0
+        self.stats = {
+            "local_reads": 0, "local_misses": 0, "stale_reads": 0,
+            "full_syncs": 0, "delta_syncs": 0, "sync_errors": 0,
+            "applied": 0, "removed": 0, "last_sync_ms": 0.0,
+        }
+
+    def is_fresh(self) -> bool:
+        return self.full_synced_at > 0 and time.monotonic() - self.full_synced_at <= REPLICA_MAX_STALENESS
+
+    # --- 읽기 ---
+
+    def get(self, memo_id: int) -> Optional[Dict[str, Any]]:
+        """사본의 메모 (없으면 None - 마지막 동기화 이후 다른 곳에서 생성되었을 수 있음)"""
+        row = self.conn.execute("SELECT data FROM memos WHERE id = ?", (memo_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, skip: int, limit: int) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT data FROM memos ORDER BY seq, id LIMIT ? OFFSET ?", (limit, skip)
+        ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM memos").fetchone()[0]
+
+    # --- 쓰기 ---
+
+    def _apply(self, memo: Dict[str, Any], seq: Optional[int], touched: float) -> bool:
+        """메모 한 건 반영 - 사본이 더 최신이면 건너뜀 (반영 여부 반환)"""
+        updated_at = str(memo.get("updated_at") or "")
+        row = self.conn.execute("SELECT seq, updated_at FROM memos WHERE id = ?", (memo["id"],)).fetchone()
+        if row is not None:
+            if updated_at < row[1]:
+                # 동기화 중에 이 서버가 먼저 쓴 더 최신 버전 유지
+                return False
+            if seq is None:
+                seq = row[0]
+            elif updated_at == row[1] and seq == row[0]:
+                self.conn.execute("UPDATE memos SET touched = ? WHERE id = ?", (touched, memo["id"]))
+                return False
+        elif seq is None:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM memos").fetchone()[0]
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO memos (id, seq, updated_at, touched, data) VALUES (?, ?, ?, ?, ?)",
+            (memo["id"], seq, updated_at, touched, json.dumps(memo, ensure_ascii=False))
+        )
+        if updated_at > self.watermark:
+            self.watermark = updated_at
+        return True
+
+    def upsert(self, memo: Any):
+        """이 서버의 생성/수정 결과 반영 (write-through)"""
+        if not isinstance(memo, dict) or "id" not in memo:
+            return
+        self._apply(memo, None, time.time())
+        self.conn.commit()
+
+    def remove(self, memo_id: int):
+        self.conn.execute("DELETE FROM memos WHERE id = ?", (memo_id,))
+        self.conn.commit()
+
+    # --- 동기화 ---
+
+    async def _full_sync(self, pages: PageSource):
+        """목록 전체를 읽어 바뀐 행 반영, 목록에 없는 행 제거"""
+        started = time.time()
+        started_monotonic = time.monotonic()
+        seen = set()
+        seq = 0
+        async with aclosing(pages(REPLICA_PAGE_SIZE, None)) as page_iter:
+            async for page in page_iter:
+                for memo in page:
+                    seen.add(memo["id"])
+                    self.stats["applied"] += self._apply(memo, seq, started)
+                    seq += 1
+                self.conn.commit()
+
+        # 동기화 시작 후 이 서버가 쓴 행(touched >= started)은 목록에 없어도 유지
+        stale = [
+            memo_id for (memo_id,) in self.conn.execute("SELECT id FROM memos WHERE touched < ?", (started,))
+            if memo_id not in seen
+        ]
+        self.conn.executemany("DELETE FROM memos WHERE id = ?", [(memo_id,) for memo_id in stale])
+        self.conn.commit()
+        self.watermark = self.conn.execute("SELECT COALESCE(MAX(updated_at), '') FROM memos").fetchone()[0]
+        self.stats["removed"] += len(stale)
+        self.stats["full_syncs"] += 1
+        self.syncs_since_full = 0
+        self.full_synced_at = started_monotonic
+
+    async def _delta_sync(self, pages: PageSource) -> bool:
+        """워터마크 이후 변경분만 반영 - 백엔드가 파라미터를 지원하지 않으면 False"""
+        watermark = self.watermark
+        touched = time.time()
+        # 중간에 멈추면 미리 요청한 다음 페이지도 바로 취소되도록 aclosing
+        async with aclosing(pages(REPLICA_PAGE_SIZE, {REPLICA_DELTA_PARAM: watermark})) as page_iter:
+            async for page in page_iter:
+                if any(str(memo.get("updated_at") or "") < watermark for memo in page):
+                    logger.info("백엔드가 %s 파라미터를 지원하지 않아 전체 동기화만 사용합니다.", REPLICA_DELTA_PARAM)
+                    self.delta_supported = False
+                    self.conn.rollback()
+                    self.watermark = watermark
+                    return False
+                for memo in page:
+                    self.stats["applied"] += self._apply(memo, None, touched)
+        self.conn.commit()
+        self.stats["delta_syncs"] += 1
+        self.syncs_since_full += 1
+        return True
+
+    async def sync(self, pages: PageSource):
+        """증분 또는 전체 동기화 한 번"""
+        started = time.perf_counter()
+        full = (
+            not self.delta_supported
+            or not self.watermark
+            or self.full_synced_at == 0
+            or self.syncs_since_full >= REPLICA_FULL_SYNC_EVERY
+            # 다음 주기까지 기다리면 삭제 반영이 최대 경과 시간을 넘김
+            or time.monotonic() - self.full_synced_at + REPLICA_SYNC_INTERVAL > REPLICA_MAX_STALENESS
+        )
+        if full or not await self._delta_sync(pages):
+            await self._full_sync(pages)
+        self.synced_at = time.monotonic()
+        self.stats["last_sync_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+
+replica: Optional[Replica] = None
+_sync_task: Optional[asyncio.Task] = None
+_sync_lock = asyncio.Lock()
+
+
+def get() -> Optional[Replica]:
+    """신선한 사본 (비활성화되었거나 최대 경과 시간을 넘었으면 None)"""
+    if replica is None:
+        return None
+    if not replica.is_fresh():
+        replica.stats["stale_reads"] += 1
+        return None
+    return replica
+
+
+def upsert(memo: Any):
+    if replica is not None:
+        replica.upsert(memo)
+
+
+def remove(memo_id: int):
+    if replica is not None:
+        replica.remove(memo_id)
+
+
+async def refresh(pages: PageSource):
+    """지금 동기화 (이미 진행 중이면 끝날 때까지 기다림)"""
+    if replica is None:
+        return
+    async with _sync_lock:
+        await replica.sync(pages)
+
+
+async def _sync_loop(pages: PageSource):
+    while True:
+        try:
+            await refresh(pages)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            replica.stats["sync_errors"] += 1
+            logger.warning("메모 복제본 동기화 실패: %s", e)
+        await asyncio.sleep(REPLICA_SYNC_INTERVAL)
+
+
+def start(pages: PageSource):
+    """사본을 열고 백그라운드 동기화 시작 (MEMO_REPLICA_ENABLED일 때만)"""
+    global replica, _sync_task
+    if not REPLICA_ENABLED or _sync_task is not None:
+        return
+    if replica is None:
+        replica = Replica(REPLICA_DB)
+    _sync_task = asyncio.ensure_future(_sync_loop(pages))
+
+
+async def stop():
+    """백그라운드 동기화 중지"""
+    global _sync_task
+    if _sync_task is None:
+        return
+    _sync_task.cancel()
+    try:
+        await _sync_task
+    except asyncio.CancelledError:
+        pass
+    _sync_task = None
+
+
+def stats() -> Dict[str, Any]:
+    """사본 크기, 신선도, 로컬 읽기/동기화 통계"""
+    if replica is None:
+        return {"enabled": REPLICA_ENABLED, "active": False}
+    return {
+        "enabled": REPLICA_ENABLED,
+        "active": _sync_task is not None,
+        "memos": replica.count(),
+        "fresh": replica.is_fresh(),
+        "age_s": round(time.monotonic() - replica.synced_at, 1) if replica.synced_at else None,
+        "full_age_s": round(time.monotonic() - replica.full_synced_at, 1) if replica.full_synced_at else None,
+        "watermark": replica.watermark,
+        "delta_supported": replica.delta_supported,
+        **replica.stats,
+    }
@@ -0,0 +1,253 @@
+"""메모 백엔드 호출 복원력 - 마감 시간, 재시도, 헤지 요청, 서킷 브레이커
+
+tools._request가 모든 백엔드 요청을 call()로 감쌉니다.
+
+- 마감 시간: 재시도를 포함한 호출 전체가 MEMO_CALL_DEADLINE초를 넘으면 DeadlineExceeded
+  (도구 호출에 요청 마감 시간이 있으면 둘 중 짧은 쪽, request_deadline()으로 설정)
+- 재시도: 멱등 요청(GET/PUT)만 연결 오류/시간 초과/429/502/503/504에 대해 지터 백오프로 재시도
+- 헤지: 읽기 요청이 최근 p95 지연 시간 안에 끝나지 않으면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+- 서킷 브레이커: 연속 실패가 MEMO_BREAKER_FAILURES번이면 MEMO_BREAKER_RESET초 동안 즉시 실패(CircuitOpenError),
+  이후 요청 하나로 복구 여부 확인 (half-open)
+"""
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+import httpx
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 호출 전체 마감 시간(초, 0이면 비활성화)
+CALL_DEADLINE = float(os.getenv("MEMO_CALL_DEADLINE", "5"))
+# 멱등 요청 재시도 횟수와 백오프(초)
+RETRY_ATTEMPTS = int(os.getenv("MEMO_RETRY_ATTEMPTS", "2"))
+RETRY_BACKOFF = float(os.getenv("MEMO_RETRY_BACKOFF", "0.1"))
+RETRY_BACKOFF_MAX = float(os.getenv("MEMO_RETRY_BACKOFF_MAX", "1.0"))
+# 헤지 요청 (읽기 전용, 기본 비활성화) - 지연 시간 기준은 최근 p95, MEMO_HEDGE_DELAY가 있으면 고정값
+HEDGE_ENABLED = os.getenv("MEMO_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_DELAY = float(os.getenv("MEMO_HEDGE_DELAY", "0"))
+HEDGE_MIN_DELAY = float(os.getenv("MEMO_HEDGE_MIN_DELAY", "0.05"))
+# 서킷 브레이커 (연속 실패 횟수 0이면 비활성화)
+BREAKER_FAILURES = int(os.getenv("MEMO_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("MEMO_BREAKER_RESET", "10"))
+
+# 재시도할 응답 상태 코드
+RETRY_STATUS = {429, 502, 503, 504}
+# p95 계산에 사용할 최근 성공 요청 수
+LATENCY_WINDOW = 200
+
+Send = Callable[[], Awaitable[httpx.Response]]
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 백엔드 요청을 보내지 않음"""
+
+
+class DeadlineExceeded(Exception):
+    """재시도를 포함한 호출이 마감 시간을 넘김"""
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (closed → open → half-open → closed)"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """요청 전 확인 - 열려 있으면 CircuitOpenError"""
+        if self.failure_threshold <= 0 or self.state == "closed":
+            return
+        remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probe_in_flight:
+            # 복구 확인용 요청 하나만 통과
+            self.probe_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(
+            f"메모 백엔드 장애로 요청을 차단 중입니다. (연속 실패 {self.failures}회, {max(remaining, 0):.0f}초 후 재시도)"
+        )
+
+    def record_success(self):
+        self.failures = 0
+        self.probe_in_flight = False
+        self.state = "closed"
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.failure_threshold > 0 and (self.state == "half_open" or self.failures >= self.failure_threshold):
+            if self.state != "open":
+                self.opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET)
+_latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+_stats = {"calls": 0, "retries": 0, "hedged": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+# 도구 호출을 요청한 쪽의 마감 시각 (time.monotonic 기준, 없으면 None)
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(timeout: float):
+    """with 블록 안의 백엔드 호출이 timeout초 뒤에 끝나도록 마감 시각 설정"""
+    token = _request_deadline.set(time.monotonic() + timeout)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+@contextmanager
+def no_request_deadline():
+    """with 블록 안의 백엔드 호출에서 요청 마감 시간 해제 (여러 요청이 함께 기다리는 공유 작업용)"""
+    token = _request_deadline.set(None)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """요청 마감 시각까지 남은 시간(초, 마감 시간이 없으면 None)"""
+    deadline = _request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _is_failure(response: httpx.Response) -> bool:
+    """브레이커 기준 실패 응답 (4xx는 백엔드 정상 응답으로 간주)"""
+    return response.status_code >= 500 or response.status_code == 429
+
+
+def hedge_delay() -> float:
+    """헤지 요청을 보내기까지 기다릴 시간 - 최근 성공 요청의 p95"""
+    if HEDGE_DELAY > 0:
+        return HEDGE_DELAY
+    if len(_latencies) < 20:
+        return max(HEDGE_MIN_DELAY, 0.5)
+    ordered = sorted(_latencies)
+    return max(HEDGE_MIN_DELAY, ordered[int(len(ordered) * 0.95) - 1])
+
+
+async def _timed(send: Send) -> httpx.Response:
+    started = time.perf_counter()
+    response = await send()
+    if response.status_code < 500:
+        _latencies.append(time.perf_counter() - started)
+    return response
+
+
+async def _hedged(send: Send) -> httpx.Response:
+    """p95 안에 응답이 없으면 두 번째 요청을 보내 먼저 성공한 응답 사용"""
+    first = asyncio.ensure_future(_timed(send))
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay())
+        if not done:
+            _stats["hedged"] += 1
+            tasks.add(asyncio.ensure_future(_timed(send)))
+
+        while True:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.discard(task)
+                # 실패(예외/5xx/429)면 다른 요청이 아직 진행 중일 때 그 응답을 기다림
+                failed = task.exception() is not None or _is_failure(task.result())
+                if not failed or not tasks:
+                    if task is not first:
+                        _stats["hedge_wins"] += 1
+                    return task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _attempts(send: Send, idempotent: bool, hedge: bool) -> httpx.Response:
+    """재시도 루프 - 멱등 요청만 재시도"""
+    attempts = 1 + (RETRY_ATTEMPTS if idempotent else 0)
+    for attempt in range(attempts):
+        response, error = None, None
+        try:
+            response = await (_hedged(send) if hedge and HEDGE_ENABLED else _timed(send))
+        except (httpx.TransportError, asyncio.TimeoutError) as e:
+            error = e
+
+        retryable = error is not None or response.status_code in RETRY_STATUS
+        if not retryable or attempt == attempts - 1:
+            if error is not None:
+                raise error
+            return response
+
+        # 전체 지터 백오프 (마감 시간은 바깥의 wait_for가 보장)
+        _stats["retries"] += 1
+        await asyncio.sleep(random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt)))
+    raise AssertionError("unreachable")
+
+
+async def call(send: Send, idempotent: bool = False, hedge: bool = False) -> httpx.Response:
+    """백엔드 요청 하나를 마감 시간/재시도/헤지/서킷 브레이커로 감싸 실행"""
+    _stats["calls"] += 1
+    timeout = CALL_DEADLINE if CALL_DEADLINE > 0 else None
+    left = remaining()
+    caller_bound = left is not None and (timeout is None or left < timeout)
+    if caller_bound:
+        if left <= 0:
+            _stats["deadline_exceeded"] += 1
+            raise DeadlineExceeded("요청 마감 시간이 지나 메모 백엔드를 호출하지 않았습니다.")
+        timeout = left
+    breaker.before_call()
+
+    try:
+        if timeout is not None:
+            response = await asyncio.wait_for(_attempts(send, idempotent, hedge), timeout)
+        else:
+            response = await _attempts(send, idempotent, hedge)
+    except asyncio.TimeoutError as e:
+        _stats["deadline_exceeded"] += 1
+        if caller_bound:
+            # 호출한 쪽의 남은 시간이 짧았던 것이므로 백엔드 장애로 세지 않음
+            breaker.probe_in_flight = False
+            raise DeadlineExceeded(f"요청 마감 시간({timeout:.2f}초) 안에 메모 백엔드 응답이 오지 않았습니다.") from e
+        breaker.record_failure()
+        raise DeadlineExceeded(f"메모 백엔드 응답이 {CALL_DEADLINE:g}초 안에 오지 않았습니다.") from e
+    except httpx.TransportError:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # 취소 등 백엔드 상태를 알 수 없는 경우 확인용 요청 기회만 반납
+        breaker.probe_in_flight = False
+        raise
+
+    if _is_failure(response):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def stats() -> Dict[str, Any]:
+    """서킷 브레이커 상태와 재시도/헤지/마감 시간 통계"""
+    return {
+        **_stats,
+        "breaker_state": breaker.state,
+        "consecutive_failures": breaker.failures,
+        "breaker_opened": breaker.opened,
+        "breaker_rejected": breaker.rejected,
+        "hedge_delay_ms": round(hedge_delay() * 1000, 1),
+    }
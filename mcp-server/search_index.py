@@ -0,0 +1,290 @@
+"""메모 전문 검색 색인 (문자 n-gram 역색인 + BM25)
+
+MCP 서버 프로세스 안에 메모 제목/내용의 역색인을 유지하여
+search_memos 도구가 목록 전체를 모델에 보내지 않고 상위 결과만 돌려주도록 합니다.
+
+- 토큰화: NFKC 정규화 + 소문자 변환 후 단어별 문자 n-gram (띄어쓰기/조사에 강한 한국어 검색)
+  n보다 짧은 검색어(예: 한 글자)는 색인 대신 제목/내용 부분 문자열로 찾음
+- 순위: BM25 (제목은 MEMO_SEARCH_TITLE_BOOST배 가중)
+- 구축: 첫 검색 시 백엔드 목록을 페이지 단위로 스트리밍하여 색인 (구축 중 쓰기는 새 색인에 재적용)
+- 갱신: 쓰기 도구(create/update/delete)가 upsert/remove로 즉시 반영,
+  다른 클라이언트의 변경은 MEMO_SEARCH_REBUILD_INTERVAL마다 백그라운드에서 재구축하여 반영
+  (재구축 중에는 기존 색인으로 바로 검색)
+- 상주 색인 끔(MEMO_SEARCH_INDEX_ENABLED=false, 여러 워커): 검색마다 목록을 읽어 그 검색용 색인을
+  만듦 (다른 워커의 쓰기가 바로 보이지만 검색마다 백엔드 전체를 읽음)
+"""
+import os
+import re
+import math
+import time
+import heapq
+import asyncio
+import logging
+import unicodedata
+from collections import Counter
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+import resilience
+
+# 환경 변수 로드
+load_dotenv()
+
+# 검색 색인 설정
+# 프로세스에 색인을 유지할지 여부 (끄면 검색마다 새로 구축)
+SEARCH_INDEX_ENABLED = os.getenv("MEMO_SEARCH_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_NGRAM = int(os.getenv("MEMO_SEARCH_NGRAM", "2"))
+SEARCH_PAGE_SIZE = int(os.getenv("MEMO_SEARCH_PAGE_SIZE", "100"))
+SEARCH_MAX_RESULTS = int(os.getenv("MEMO_SEARCH_MAX_RESULTS", "20"))
+SEARCH_TITLE_BOOST = int(os.getenv("MEMO_SEARCH_TITLE_BOOST", "2"))
+SEARCH_SNIPPET_CHARS = int(os.getenv("MEMO_SEARCH_SNIPPET_CHARS", "120"))
+# 전체 재구축 주기(초) - 0이면 처음 한 번만 구축
+SEARCH_REBUILD_INTERVAL = float(os.getenv("MEMO_SEARCH_REBUILD_INTERVAL", "300"))
+
+# BM25 매개변수
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+logger = logging.getLogger(__name__)
+
+# 백엔드 목록을 처음부터 페이지 단위로 내보내는 비동기 이터레이터 생성 함수
+PageSource = Callable[[int], AsyncIterator[List[Dict[str, Any]]]]
+
+
+def _normalize(text: Optional[str]) -> str:
+    return unicodedata.normalize("NFKC", text).lower() if text else ""
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """단어별 문자 n-gram 목록 (n보다 짧은 단어는 단어 그대로)"""
+    if not text:
+        return []
+    text = _normalize(text)
+    terms = []
+    for word in _WORD.findall(text):
+        if len(word) <= SEARCH_NGRAM:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + SEARCH_NGRAM] for i in range(len(word) - SEARCH_NGRAM + 1))
+    return terms
+
+
+class InvertedIndex:
+    """메모 ID → 용어 빈도 역색인"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_terms: Dict[int, Counter] = {}
+        self.doc_len: Dict[int, int] = {}
+        self.docs: Dict[int, Dict[str, Any]] = {}
+        self.total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def upsert(self, memo: Dict[str, Any]):
+        """메모 추가 또는 갱신"""
+        memo_id = memo["id"]
+        self.remove(memo_id)
+
+        terms = Counter(tokenize(memo.get("content")))
+        for term in tokenize(memo.get("title")):
+            terms[term] += SEARCH_TITLE_BOOST
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[memo_id] = tf
+
+        length = sum(terms.values())
+        self.doc_terms[memo_id] = terms
+        self.doc_len[memo_id] = length
+        self.total_len += length
+        self.docs[memo_id] = {"id": memo_id, "title": memo.get("title"), "content": memo.get("content") or ""}
+
+    def remove(self, memo_id: int):
+        """메모 제거 (없으면 무시)"""
+        terms = self.doc_terms.pop(memo_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(memo_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(memo_id)
+        self.docs.pop(memo_id, None)
+
+    def _substring_posting(self, word: str) -> Dict[int, int]:
+        """n-gram보다 짧은 검색어를 제목/내용 부분 문자열로 찾은 메모 ID → 등장 횟수"""
+        posting = {}
+        for memo_id, doc in self.docs.items():
+            tf = _normalize(doc["content"]).count(word) + _normalize(doc["title"]).count(word) * SEARCH_TITLE_BOOST
+            if tf:
+                posting[memo_id] = tf
+        return posting
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """BM25 점수 상위 limit개 결과"""
+        words = _WORD.findall(_normalize(query))
+        query_terms = set(tokenize(" ".join(w for w in words if len(w) >= SEARCH_NGRAM)))
+        short_words = {w for w in words if len(w) < SEARCH_NGRAM}
+        if not (query_terms or short_words) or not self.docs:
+            return []
+
+        n = len(self.docs)
+        avg_len = self.total_len / n
+        scores: Dict[int, float] = {}
+        postings = [self.postings.get(term) for term in query_terms]
+        postings += [self._substring_posting(word) for word in short_words]
+        for posting in postings:
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for memo_id, tf in posting.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[memo_id] / avg_len)
+                scores[memo_id] = scores.get(memo_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [
+            {
+                "id": memo_id,
+                "title": self.docs[memo_id]["title"],
+                "snippet": _snippet(self.docs[memo_id]["content"], query),
+                "score": round(score, 4),
+            }
+            for memo_id, score in top
+        ]
+
+
+def _snippet(content: str, query: str) -> str:
+    """질의 단어가 처음 나오는 위치 주변의 내용 일부"""
+    if len(content) <= SEARCH_SNIPPET_CHARS:
+        return content
+    lowered = content.lower()
+    positions = [lowered.find(word) for word in query.lower().split()]
+    start = min((p for p in positions if p >= 0), default=0)
+    start = max(0, start - SEARCH_SNIPPET_CHARS // 4)
+    snippet = content[start:start + SEARCH_SNIPPET_CHARS]
+    return ("…" if start > 0 else "") + snippet + ("…" if start + SEARCH_SNIPPET_CHARS < len(content) else "")
+
+
+# 현재 색인 (첫 검색 전에는 None)
+_index: Optional[InvertedIndex] = None
+_built_at = 0.0
+_build_lock = asyncio.Lock()
+_rebuild_task: Optional[asyncio.Task] = None
+# 재구축 중에 들어온 쓰기 (새 색인에 재적용)
+_pending: Optional[List[tuple]] = None
+_stats = {"builds": 0, "build_errors": 0, "last_build_ms": 0.0, "searches": 0, "upserts": 0, "removes": 0}
+
+
+def _is_fresh() -> bool:
+    if _index is None:
+        return False
+    return SEARCH_REBUILD_INTERVAL <= 0 or time.monotonic() - _built_at < SEARCH_REBUILD_INTERVAL
+
+
+async def _rebuild(pages: PageSource):
+    """백엔드 목록을 페이지 단위로 읽어 새 색인을 만든 뒤 교체"""
+    global _index, _built_at, _pending
+
+    started = time.perf_counter()
+    _pending = []
+    try:
+        index = InvertedIndex()
+        async with aclosing(pages(SEARCH_PAGE_SIZE)) as page_iter:
+            async for page in page_iter:
+                for memo in page:
+                    index.upsert(memo)
+
+        # 구축 중 이미 읽은 페이지에 반영되지 않았을 수 있는 쓰기 재적용
+        for op, value in _pending:
+            if op == "upsert":
+                index.upsert(value)
+            else:
+                index.remove(value)
+    finally:
+        _pending = None
+
+    _index = index
+    _built_at = time.monotonic()
+    _stats["builds"] += 1
+    _stats["last_build_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+
+async def _rebuild_in_background(pages: PageSource):
+    # 재구축을 시작시킨 도구 호출의 마감 시간에 묶이지 않도록 해제
+    with resilience.no_request_deadline():
+        async with _build_lock:
+            if _is_fresh():
+                return
+            try:
+                await _rebuild(pages)
+            except Exception as e:
+                _stats["build_errors"] += 1
+                logger.warning("검색 색인 재구축 실패: %s", e)
+
+
+async def ensure_ready(pages: PageSource):
+    """색인이 없으면 구축, 오래되었으면 기존 색인으로 검색하면서 백그라운드에서 재구축"""
+    global _rebuild_task
+    if _index is None:
+        # 검색할 색인이 아직 없으므로 첫 구축만 기다림
+        async with _build_lock:
+            if _index is None:
+                await _rebuild(pages)
+        return
+    if not _is_fresh() and (_rebuild_task is None or _rebuild_task.done()):
+        _rebuild_task = asyncio.ensure_future(_rebuild_in_background(pages))
+
+
+async def search_once(pages: PageSource, query: str, limit: int) -> List[Dict[str, Any]]:
+    """상주 색인 없이 이번 검색만을 위한 색인을 만들어 검색 (SEARCH_INDEX_ENABLED가 꺼져 있을 때)"""
+    _stats["searches"] += 1
+    index = InvertedIndex()
+    async with aclosing(pages(SEARCH_PAGE_SIZE)) as page_iter:
+        async for page in page_iter:
+            for memo in page:
+                index.upsert(memo)
+    return index.search(query, max(1, min(limit, SEARCH_MAX_RESULTS)))
+
+
+def search(query: str, limit: int) -> List[Dict[str, Any]]:
+    """색인 검색 (ensure_ready 이후 호출)"""
+    _stats["searches"] += 1
+    if _index is None:
+        return []
+    return _index.search(query, max(1, min(limit, SEARCH_MAX_RESULTS)))
+
+
+def upsert(memo: Any):
+    """생성/수정된 메모 반영 (색인이 아직 없으면 무시 - 첫 검색 때 구축)"""
+    if not isinstance(memo, dict) or "id" not in memo:
+        return
+    if _pending is not None:
+        _pending.append(("upsert", memo))
+    if _index is not None:
+        _index.upsert(memo)
+        _stats["upserts"] += 1
+
+
+def remove(memo_id: int):
+    """삭제된 메모 제거"""
+    if _pending is not None:
+        _pending.append(("remove", memo_id))
+    if _index is not None:
+        _index.remove(memo_id)
+        _stats["removes"] += 1
+
+
+def stats() -> Dict[str, Any]:
+    """색인 크기와 구축/검색 통계"""
+    return {
+        **_stats,
+        "enabled": SEARCH_INDEX_ENABLED,
+        "documents": len(_index) if _index is not None else 0,
+        "terms": len(_index.postings) if _index is not None else 0,
+        "age_s": round(time.monotonic() - _built_at, 1) if _index is not None else None,
+    }
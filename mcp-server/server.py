@@ -1,15 +1,39 @@
 """MCP 서버 - 메모 관리 도구를 제공하는 MCP 서버 (FastMCP)"""
 import sys
 import os
-from typing import Optional
-from fastmcp import FastMCP
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any
+from fastmcp import FastMCP, Context
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 
 # 현재 디렉토리를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import tools
+import http_client
+import metrics
+import admission
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """서버 수명 주기 - 공유 HTTP 클라이언트와 로컬 복제본 동기화 시작/종료"""
+    await http_client.start_client()
+    tools.start_replica()
+    try:
+        yield {}
+    finally:
+        await tools.stop_replica()
+        await http_client.close_client()
+
 
 # FastMCP 서버 인스턴스 생성
-mcp = FastMCP("memo-manager")
+mcp = FastMCP("memo-manager", lifespan=lifespan)
+# 도구 호출 수락 제어 (클라이언트 마감 시간, 동시 실행 제한, 세션별 속도 제한, 읽기 우선 대기열)
+# 먼저 등록한 미들웨어가 바깥쪽 - 대기열 대기 시간도 마감 시간에 포함
+mcp.add_middleware(admission.DeadlineMiddleware())
+mcp.add_middleware(admission.AdmissionMiddleware())
 
 @mcp.tool()
 async def create_memo(title: str, content: Optional[str] = None) -> dict:
@@ -27,32 +51,34 @@ async def create_memo(title: str, content: Optional[str] = None) -> dict:
 
 
 @mcp.tool()
-async def list_memos(skip: int = 0, limit: int = 10) -> list:
+async def list_memos(skip: int = 0, limit: int = 10, fresh: bool = False) -> list:
     """
     메모 목록을 조회합니다.
     
     Args:
         skip: 건너뛸 메모 수 (페이징, 기본값: 0)
         limit: 조회할 메모 수 (기본값: 10, 최대: 100)
+        fresh: 다른 곳에서 방금 바뀐 내용까지 확인해야 할 때만 True (기본값: False)
     
     Returns:
         메모 목록
     """
-    return await tools.list_memos(skip=skip, limit=limit)
+    return await tools.list_memos(skip=skip, limit=limit, fresh=fresh)
 
 
 @mcp.tool()
-async def get_memo(memo_id: int) -> dict:
+async def get_memo(memo_id: int, fresh: bool = False) -> dict:
     """
     특정 메모를 조회합니다.
     
     Args:
         memo_id: 조회할 메모 ID
+        fresh: 다른 곳에서 방금 바뀐 내용까지 확인해야 할 때만 True (기본값: False)
     
     Returns:
         메모 정보
     """
-    return await tools.get_memo(memo_id=memo_id)
+    return await tools.get_memo(memo_id=memo_id, fresh=fresh)
 
 
 @mcp.tool()
@@ -89,5 +115,201 @@ async def delete_memo(memo_id: int) -> dict:
     return await tools.delete_memo(memo_id=memo_id)
 
 
+@mcp.tool()
+async def create_memos(memos: List[Dict[str, Any]]) -> dict:
+    """
+    여러 메모를 한 번에 생성합니다. 메모를 여러 개 만들 때는 create_memo를 반복 호출하지 말고 이 도구를 사용하세요.
+    
+    Args:
+        memos: 생성할 메모 목록. 각 항목은 {"title": 제목(필수), "content": 내용(선택)}
+    
+    Returns:
+        항목별 결과 (index, ok, result 또는 error)와 성공/실패 개수
+    """
+    return await tools.create_memos(memos=memos)
+
+
+@mcp.tool()
+async def get_memos(memo_ids: List[int]) -> dict:
+    """
+    여러 메모를 한 번에 조회합니다.
+    
+    Args:
+        memo_ids: 조회할 메모 ID 목록
+    
+    Returns:
+        항목별 결과 (index, ok, result 또는 error)와 성공/실패 개수
+    """
+    return await tools.get_memos(memo_ids=memo_ids)
+
+
+@mcp.tool()
+async def update_memos(updates: List[Dict[str, Any]]) -> dict:
+    """
+    여러 메모를 한 번에 수정합니다.
+    
+    Args:
+        updates: 수정 목록. 각 항목은 {"memo_id": 메모 ID(필수), "title": 새 제목(선택), "content": 새 내용(선택)}
+    
+    Returns:
+        항목별 결과 (index, ok, result 또는 error)와 성공/실패 개수
+    """
+    return await tools.update_memos(updates=updates)
+
+
+@mcp.tool()
+async def delete_memos(memo_ids: List[int]) -> dict:
+    """
+    여러 메모를 한 번에 삭제합니다. 메모를 여러 개 지울 때는 delete_memo를 반복 호출하지 말고 이 도구를 사용하세요.
+    
+    Args:
+        memo_ids: 삭제할 메모 ID 목록
+    
+    Returns:
+        항목별 결과 (index, ok, result 또는 error)와 성공/실패 개수
+    """
+    return await tools.delete_memos(memo_ids=memo_ids)
+
+
+@mcp.tool()
+async def search_memos(query: str, limit: int = 10) -> dict:
+    """
+    메모 제목과 내용에서 검색어와 관련된 메모를 찾습니다. 특정 내용의 메모를 찾을 때는 list_memos로 전체를 훑지 말고 이 도구를 사용하세요.
+    
+    Args:
+        query: 검색어 (단어 일부만 입력해도 검색됨)
+        limit: 반환할 최대 결과 수 (기본값: 10, 최대: 20)
+    
+    Returns:
+        관련도 순 검색 결과 (id, title, snippet, score). 전체 내용은 get_memo로 조회하세요.
+    """
+    return await tools.search_memos(query=query, limit=limit)
+
+
+@mcp.tool()
+async def count_memos() -> dict:
+    """
+    전체 메모 수를 셉니다. 메모 개수만 필요할 때는 list_memos로 목록을 가져오지 말고 이 도구를 사용하세요.
+    
+    Returns:
+        메모 수 (count)와 조회한 페이지 수 (pages)
+    """
+    return await tools.count_memos()
+
+
+@mcp.tool()
+async def export_memos(ctx: Context, format: str = "jsonl", max_items: int = 0) -> dict:
+    """
+    메모를 서버의 파일로 내보냅니다. 내보낸 내용은 응답에 포함되지 않고 파일 경로만 반환됩니다.
+    
+    Args:
+        format: 파일 형식 ("jsonl" 또는 "csv", 기본값: "jsonl")
+        max_items: 내보낼 최대 메모 수 (기본값: 0 = 전체)
+    
+    Returns:
+        파일 경로 (path), 형식, 메모 수 (count), 파일 크기 (bytes)
+    """
+    async def on_progress(count: int):
+        await ctx.report_progress(count, max_items or None, f"{count}개 메모 기록")
+    
+    return await tools.export_memos(format=format, max_items=max_items, on_progress=on_progress)
+
+
+@mcp.resource("memo://stats/cache")
+def cache_stats() -> dict:
+    """메모 캐시 적중/미스/제거 통계"""
+    return tools.cache_stats()
+
+
+@mcp.resource("memo://stats/search")
+def search_stats() -> dict:
+    """검색 색인 크기와 구축/검색 통계"""
+    return tools.search_stats()
+
+
+@mcp.resource("memo://stats/singleflight")
+def singleflight_stats() -> dict:
+    """동시 동일 읽기 요청 합치기 통계"""
+    return tools.singleflight_stats()
+
+
+@mcp.resource("memo://stats/backend")
+def backend_stats() -> dict:
+    """메모 백엔드 서킷 브레이커 상태와 재시도/헤지/마감 시간 통계"""
+    return tools.backend_stats()
+
+
+@mcp.resource("memo://stats/replica")
+def replica_stats() -> dict:
+    """로컬 복제본 크기, 신선도, 로컬 읽기/동기화 통계"""
+    return tools.replica_stats()
+
+
+@mcp.resource("memo://stats/admission")
+def admission_stats() -> dict:
+    """도구 호출 동시 실행/대기열/속도 제한 통계"""
+    return admission.stats()
+
+
+_started_at = time.time()
+
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    """상태 확인 (HTTP 전송 모드) - 백엔드 서킷이 열려 있으면 degraded"""
+    backend = tools.backend_stats()
+    degraded = backend["breaker_state"] != "closed"
+    return JSONResponse(
+        {
+            "status": "degraded" if degraded else "ok",
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - _started_at, 1),
+            "backend": {
+                "breaker_state": backend["breaker_state"],
+                "consecutive_failures": backend["consecutive_failures"],
+            },
+        },
+        status_code=503 if degraded else 200
+    )
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Prometheus 형식 지표 (HTTP 전송 모드에서만 제공, METRICS_EXPORTER 설정 필요)"""
+    if not metrics.METRICS_ENABLED:
+        return PlainTextResponse("METRICS_EXPORTER가 설정되지 않았습니다.\n", status_code=404)
+
+    # 단조 증가하는 누적값은 counters(_total), 현재 크기/상태/경과 시간은 gauges
+    stats = tools.cache_stats()
+    counters = {
+        f"memo_cache_{kind}_{field}": stats[name][field]
+        for name, kind in (("memos", "memo"), ("pages", "page"))
+        for field in ("hits", "misses", "evictions")
+    }
+    gauges = {f"memo_cache_{kind}_size": stats[name]["size"] for name, kind in (("memos", "memo"), ("pages", "page"))}
+    for tool_name, flight in tools.singleflight_stats().items():
+        for field in ("leaders", "coalesced", "cancelled"):
+            counters[f"memo_singleflight_{tool_name}_{field}"] = flight[field]
+    backend = tools.backend_stats()
+    gauges["memo_backend_breaker_state"] = {"closed": 0, "half_open": 1, "open": 2}[backend["breaker_state"]]
+    for field in ("retries", "hedged", "hedge_wins", "deadline_exceeded", "breaker_opened", "breaker_rejected"):
+        counters[f"memo_backend_{field}"] = backend[field]
+    replica = tools.replica_stats()
+    if replica["enabled"] and replica["active"]:
+        gauges["memo_replica_age_seconds"] = replica["age_s"] if replica["age_s"] is not None else -1
+        gauges["memo_replica_memos"] = replica["memos"]
+        for field in ("local_reads", "local_misses", "stale_reads", "full_syncs", "delta_syncs", "sync_errors"):
+            counters[f"memo_replica_{field}"] = replica[field]
+    for field, value in admission.stats().items():
+        if field in ("active", "queued", "sessions"):
+            gauges[f"mcp_admission_{field}"] = value
+        elif field not in ("enabled", "max_concurrent", "max_queued"):
+            counters[f"mcp_admission_{field}"] = value
+    return PlainTextResponse(
+        metrics.render_prometheus(gauges, counters),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 if __name__ == "__main__":
     mcp.run()
@@ -0,0 +1,107 @@
+"""동시 동일 읽기 요청 합치기 (single-flight)
+
+같은 키(예: get_memo의 memo_id)로 진행 중인 백엔드 요청이 있으면
+새 요청을 보내지 않고 그 결과(또는 예외)를 함께 받습니다.
+
+- 기다리던 호출 하나가 취소되어도 공유 요청은 계속 진행 (asyncio.shield)
+- 마지막 대기자까지 취소되면 공유 요청도 취소
+- 쓰기 후에는 forget()으로 진행 중인 요청과 분리하여 이후 읽기가 새 요청을 보내도록 함
+- 공유 요청은 처음 요청한 호출의 마감 시간 없이 실행하고, 호출마다 자기 마감 시간까지만 기다림
+  (마감 시간이 짧은 호출 때문에 더 오래 기다릴 수 있는 호출까지 실패하지 않도록)
+"""
+import os
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from dotenv import load_dotenv
+
+import resilience
+
+# 환경 변수 로드
+load_dotenv()
+
+SINGLEFLIGHT_ENABLED = os.getenv("MEMO_SINGLEFLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class _Call:
+    """진행 중인 공유 요청과 대기자 수"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+async def _shared(fn: Callable[[], Awaitable[Any]]) -> Any:
+    """공유 요청 실행 - 태스크가 복사해 온 처음 호출자의 요청 마감 시간은 해제"""
+    with resilience.no_request_deadline():
+        return await fn()
+
+
+class SingleFlight:
+    """키별로 진행 중인 요청을 하나로 합치는 그룹"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key로 진행 중인 요청이 있으면 그 결과를, 없으면 fn()을 실행한 결과를 반환"""
+        if not SINGLEFLIGHT_ENABLED:
+            return await fn()
+
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(_shared(fn)))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._release(key, call))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            left = resilience.remaining()
+            if left is None:
+                return await asyncio.shield(call.task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(call.task), max(left, 0))
+            except asyncio.TimeoutError as e:
+                self._abandon(key, call)
+                raise resilience.DeadlineExceeded(
+                    f"요청 마감 시간({left:.2f}초) 안에 메모 백엔드 응답이 오지 않았습니다."
+                ) from e
+        except asyncio.CancelledError:
+            self._abandon(key, call)
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _abandon(self, key: Hashable, call: _Call):
+        """대기자 하나가 떠남 - 마지막 대기자면 결과를 받을 곳이 없으므로 백엔드 요청도 취소"""
+        if call.waiters == 1 and not call.task.done():
+            self._release(key, call)
+            call.task.cancel()
+            self.cancelled += 1
+
+    def _release(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def forget(self, key: Hashable):
+        """진행 중인 요청과 분리 (이미 기다리는 호출은 그대로 결과를 받음)"""
+        self._calls.pop(key, None)
+
+    def forget_all(self):
+        self._calls.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """요청 합치기 통계 - coalesced는 백엔드로 가지 않고 공유된 호출 수"""
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+        }
@@ -1,9 +1,24 @@
 """메모 관리 MCP 도구 정의"""
 import os
+import csv
+import json
+import time
+import uuid
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import Optional, List, Dict, Any, Callable, Awaitable, AsyncIterator, Deque
 import httpx
-from typing import Optional, List, Dict, Any
 from dotenv import load_dotenv
 
+import cache
+import http_client
+import metrics
+import search_index
+import resilience
+import replica
+from singleflight import SingleFlight
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -11,6 +26,54 @@ load_dotenv()
 MEMO_API_URL = os.getenv("MEMO_API_URL", "http://localhost:8000")
 API_BASE = f"{MEMO_API_URL}/api/v1/memos"
 
+# 배치 도구 설정
+BATCH_CONCURRENCY = int(os.getenv("MEMO_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_ITEMS = int(os.getenv("MEMO_BATCH_MAX_ITEMS", "100"))
+
+# 전체 목록 페이지 조회 설정 (페이지 크기 / 미리 읽을 페이지 수)
+PAGE_SIZE = int(os.getenv("MEMO_PAGE_SIZE", "100"))
+PAGE_PREFETCH = int(os.getenv("MEMO_PAGE_PREFETCH", "1"))
+
+# export_memos 파일 저장 디렉토리와 CSV 열
+EXPORT_DIR = os.getenv("MEMO_EXPORT_DIR", "exports")
+EXPORT_FIELDS = ["id", "title", "content", "created_at", "updated_at"]
+
+# 동시에 들어온 같은 읽기 요청을 하나의 백엔드 요청으로 합침 (memo_id / (skip, limit) 기준)
+memo_flight = SingleFlight()
+page_flight = SingleFlight()
+# 쓰기마다 증가 - 쓰기 전에 시작된 읽기 결과가 캐시를 덮어쓰지 않도록 확인
+_write_epoch = 0
+
+
+def _after_write(memo_id: int):
+    """쓰기 후 진행 중인 읽기와 분리 (이후 읽기는 새 백엔드 요청을 보냄)"""
+    global _write_epoch
+    _write_epoch += 1
+    memo_flight.forget(memo_id)
+    page_flight.forget_all()
+
+
+# 재시도해도 결과가 같은 요청 (DELETE는 재시도하면 404가 되므로 제외)
+IDEMPOTENT_METHODS = {"GET", "PUT"}
+
+
+async def _request(method: str, url: str, route: str, hedge: bool = False, **kwargs) -> httpx.Response:
+    """
+    공유 클라이언트로 백엔드 요청
+    
+    마감 시간/재시도/헤지/서킷 브레이커(resilience)를 거치며,
+    METRICS_EXPORTER 설정 시 시도마다 메서드/경로/상태별 소요 시간을 기록합니다.
+    """
+    client = http_client.get_client()
+    
+    async def send() -> httpx.Response:
+        with metrics.timer("memo_backend_request_seconds", method=method, route=route) as timer:
+            response = await client.request(method, url, **kwargs)
+            timer.labels["status"] = response.status_code
+        return response
+    
+    return await resilience.call(send, idempotent=method in IDEMPOTENT_METHODS, hedge=hedge)
+
 
 async def create_memo(title: str, content: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -23,49 +86,113 @@ async def create_memo(title: str, content: Optional[str] = None) -> Dict[str, An
     Returns:
         생성된 메모 정보 (id, title, content, created_at, updated_at)
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            API_BASE,
-            json={"title": title, "content": content}
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await _request(
+        "POST",
+        API_BASE,
+        "/memos",
+        json={"title": title, "content": content}
+    )
+    response.raise_for_status()
+    memo = response.json()
+    
+    # 새 메모가 생겼으므로 목록 캐시 무효화
+    _after_write(memo["id"])
+    cache.invalidate_pages()
+    cache.store_memo(memo)
+    search_index.upsert(memo)
+    replica.upsert(memo)
+    return memo
 
 
-async def list_memos(skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+async def list_memos(skip: int = 0, limit: int = 10, fresh: bool = False) -> List[Dict[str, Any]]:
     """
     메모 목록을 조회합니다.
     
     Args:
         skip: 건너뛸 메모 수 (페이징)
         limit: 조회할 메모 수 (최대 100)
+        fresh: True면 로컬 복제본/캐시를 거치지 않고 백엔드에서 조회
     
     Returns:
         메모 목록
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
+    if fresh:
+        # 백엔드에서 읽은 최신 페이지로 캐시와 복제본도 갱신 (get_memo(fresh=True)와 같음)
+        epoch = _write_epoch
+        memos = await _fetch_page(skip, limit)
+        if epoch == _write_epoch:
+            cache.store_page(skip, limit, memos)
+            for memo in memos:
+                replica.upsert(memo)
+        return memos
+    
+    local = replica.get()
+    if local is not None:
+        local.stats["local_reads"] += 1
+        return local.list(skip, limit)
+    
+    cached = cache.get_page(skip, limit)
+    if cached is not cache.MISS:
+        return cached
+    
+    async def fetch():
+        epoch = _write_epoch
+        response = await _request(
+            "GET",
             API_BASE,
+            "/memos",
+            hedge=True,
             params={"skip": skip, "limit": limit}
         )
         response.raise_for_status()
-        return response.json()
+        memos = response.json()
+        if epoch == _write_epoch:
+            cache.store_page(skip, limit, memos)
+        return memos
+    
+    return await page_flight.do((skip, limit), fetch)
 
 
-async def get_memo(memo_id: int) -> Dict[str, Any]:
+async def get_memo(memo_id: int, fresh: bool = False) -> Dict[str, Any]:
     """
     특정 메모를 조회합니다.
     
     Args:
         memo_id: 조회할 메모 ID
+        fresh: True면 로컬 복제본/캐시를 거치지 않고 백엔드에서 조회
     
     Returns:
         메모 정보
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_BASE}/{memo_id}")
+    if not fresh:
+        local = replica.get()
+        if local is not None:
+            memo = local.get(memo_id)
+            if memo is not None:
+                local.stats["local_reads"] += 1
+                return memo
+            # 마지막 동기화 이후 다른 곳에서 생성되었을 수 있으므로 백엔드 확인
+            local.stats["local_misses"] += 1
+        
+        cached = cache.get_memo(memo_id)
+        if cached is not cache.MISS:
+            return cached
+    
+    async def fetch():
+        epoch = _write_epoch
+        response = await _request("GET", f"{API_BASE}/{memo_id}", "/memos/{id}", hedge=True)
+        if response.status_code == 404 and epoch == _write_epoch:
+            replica.remove(memo_id)
         response.raise_for_status()
-        return response.json()
+        memo = response.json()
+        if epoch == _write_epoch:
+            cache.store_memo(memo)
+            replica.upsert(memo)
+        return memo
+    
+    if fresh:
+        return await fetch()
+    return await memo_flight.do(memo_id, fetch)
 
 
 async def update_memo(
@@ -90,13 +217,22 @@ async def update_memo(
     if content is not None:
         update_data["content"] = content
     
-    async with httpx.AsyncClient() as client:
-        response = await client.put(
-            f"{API_BASE}/{memo_id}",
-            json=update_data
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await _request(
+        "PUT",
+        f"{API_BASE}/{memo_id}",
+        "/memos/{id}",
+        json=update_data
+    )
+    response.raise_for_status()
+    memo = response.json()
+    
+    # 수정된 메모로 갱신하고 목록 캐시 무효화
+    _after_write(memo_id)
+    cache.store_memo(memo)
+    cache.invalidate_pages()
+    search_index.upsert(memo)
+    replica.upsert(memo)
+    return memo
 
 
 async def delete_memo(memo_id: int) -> Dict[str, str]:
@@ -109,7 +245,347 @@ async def delete_memo(memo_id: int) -> Dict[str, str]:
     Returns:
         삭제 성공 메시지
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.delete(f"{API_BASE}/{memo_id}")
-        response.raise_for_status()
-        return {"status": "success", "message": f"메모 {memo_id}가 삭제되었습니다."}
+    response = await _request("DELETE", f"{API_BASE}/{memo_id}", "/memos/{id}")
+    
+    # 실패(예: 404)한 경우에도 캐시된 항목은 더 이상 믿을 수 없으므로 먼저 무효화
+    _after_write(memo_id)
+    cache.invalidate_memo(memo_id)
+    cache.invalidate_pages()
+    if response.is_success or response.status_code == 404:
+        search_index.remove(memo_id)
+        replica.remove(memo_id)
+    response.raise_for_status()
+    return {"status": "success", "message": f"메모 {memo_id}가 삭제되었습니다."}
+
+
+async def _fetch_page(skip: int, limit: int, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """목록 페이지 하나 조회 (목록 캐시를 거치지 않음, params는 추가 쿼리 파라미터)"""
+    response = await _request("GET", API_BASE, "/memos", params={**(params or {}), "skip": skip, "limit": limit})
+    response.raise_for_status()
+    return response.json()
+
+
+async def iter_memo_pages(
+    page_size: Optional[int] = None,
+    prefetch: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    메모 목록 전체를 페이지 단위로 내보내는 비동기 제너레이터입니다.
+    
+    현재 페이지를 처리하는 동안 다음 페이지를 최대 prefetch개까지 미리 요청하며,
+    page_size보다 짧은 페이지가 오면 끝납니다. 호출자가 중간에 멈추면
+    (contextlib.aclosing 사용 권장) 진행 중인 요청을 취소합니다.
+    
+    Args:
+        page_size: 페이지 크기 (백엔드 최대 100)
+        prefetch: 미리 읽을 페이지 수 (0이면 순차 조회)
+        params: 페이지마다 붙일 추가 쿼리 파라미터
+    """
+    page_size = page_size or PAGE_SIZE
+    prefetch = PAGE_PREFETCH if prefetch is None else prefetch
+    pending: Deque[asyncio.Task] = deque()
+    next_skip = 0
+    
+    def schedule():
+        nonlocal next_skip
+        pending.append(asyncio.ensure_future(_fetch_page(next_skip, page_size, params)))
+        next_skip += page_size
+    
+    try:
+        while True:
+            # 현재 페이지를 기다리는 동안 다음 페이지들도 진행되도록 미리 요청
+            while len(pending) <= prefetch:
+                schedule()
+            page = await pending.popleft()
+            if page:
+                yield page
+            if len(page) < page_size:
+                break
+    finally:
+        # 멈추거나 앞 페이지가 실패하면 미리 요청한 페이지를 취소하고 끝날 때까지 기다림
+        # (결과를 받지 않은 태스크의 예외 경고와 불필요한 백엔드 요청 방지)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def iter_memos(max_items: int = 0, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+    """메모를 하나씩 내보내는 비동기 제너레이터 (max_items개에서 멈춤, 0이면 전체)"""
+    count = 0
+    async with aclosing(iter_memo_pages(**kwargs)) as pages:
+        async for page in pages:
+            for memo in page:
+                yield memo
+                count += 1
+                if max_items and count >= max_items:
+                    return
+
+
+async def count_memos() -> Dict[str, Any]:
+    """
+    전체 메모 수를 셉니다. (메모를 모두 메모리에 모으지 않고 페이지 단위로 셈)
+    
+    Returns:
+        메모 수와 조회한 페이지 수
+    """
+    count = 0
+    pages = 0
+    async with aclosing(iter_memo_pages()) as page_iter:
+        async for page in page_iter:
+            count += len(page)
+            pages += 1
+    return {"count": count, "pages": pages}
+
+
+async def export_memos(
+    format: str = "jsonl",
+    max_items: int = 0,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """
+    메모를 MEMO_EXPORT_DIR 아래 파일로 내보냅니다. 페이지를 받는 대로 파일에 기록합니다.
+    
+    Args:
+        format: 파일 형식 ("jsonl" 또는 "csv")
+        max_items: 내보낼 최대 메모 수 (0이면 전체)
+        on_progress: 페이지마다 지금까지 기록한 메모 수로 호출되는 콜백
+    
+    Returns:
+        파일 경로, 메모 수, 파일 크기
+    """
+    if format not in ("jsonl", "csv"):
+        raise ValueError(f"지원하지 않는 형식입니다: {format} (jsonl 또는 csv)")
+    
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.abspath(os.path.join(
+        EXPORT_DIR, f"memos-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.{format}"
+    ))
+    count = 0
+    
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction="ignore") if format == "csv" else None
+        if writer is not None:
+            writer.writeheader()
+        async with aclosing(iter_memo_pages()) as pages:
+            async for page in pages:
+                if max_items:
+                    page = page[:max_items - count]
+                for memo in page:
+                    if writer is not None:
+                        writer.writerow(memo)
+                    else:
+                        f.write(json.dumps(memo, ensure_ascii=False) + "\n")
+                count += len(page)
+                if on_progress is not None:
+                    await on_progress(count)
+                if max_items and count >= max_items:
+                    break
+    
+    return {"path": path, "format": format, "count": count, "bytes": os.path.getsize(path)}
+
+
+async def search_memos(query: str, limit: int = 10) -> Dict[str, Any]:
+    """
+    메모 제목과 내용을 전문 검색합니다.
+    
+    Args:
+        query: 검색어
+        limit: 반환할 최대 결과 수 (최대 MEMO_SEARCH_MAX_RESULTS)
+    
+    Returns:
+        관련도 순 상위 결과 (id, title, snippet, score)
+    """
+    pages = lambda page_size: iter_memo_pages(page_size=page_size)
+    if not search_index.SEARCH_INDEX_ENABLED:
+        results = await search_index.search_once(pages, query, limit)
+    else:
+        await search_index.ensure_ready(pages)
+        results = search_index.search(query, limit)
+    return {"query": query, "count": len(results), "results": results}
+
+
+async def _run_batch(
+    items: List[Any],
+    operation: Callable[[Any], Awaitable[Any]]
+) -> Dict[str, Any]:
+    """
+    배치 항목을 제한된 동시성으로 백엔드에 분산 실행합니다.
+    
+    각 항목의 성공/실패를 개별적으로 기록하며, 하나가 실패해도
+    나머지 항목은 계속 처리됩니다. 단, 서킷 브레이커가 열리면 아직
+    시작하지 않은 항목은 백엔드로 보내지 않고 skipped로 표시합니다.
+    
+    Returns:
+        항목별 결과 (index, ok, result 또는 error)와 성공/실패/미실행 개수
+    """
+    if len(items) > BATCH_MAX_ITEMS:
+        raise ValueError(f"배치 항목은 최대 {BATCH_MAX_ITEMS}개까지 처리할 수 있습니다. (요청: {len(items)}개)")
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    # 서킷 브레이커가 열린 뒤 남은 항목을 중단시키기 위한 원인 메시지
+    breaker_error: Optional[str] = None
+    
+    async def run_one(index: int, item: Any) -> Dict[str, Any]:
+        nonlocal breaker_error
+        async with semaphore:
+            if breaker_error is not None:
+                # half-open 전환 시점에 남은 항목이 한꺼번에 프로브로 나가지 않도록 실행하지 않음
+                return {"index": index, "ok": False, "skipped": True, "error": breaker_error}
+            try:
+                return {"index": index, "ok": True, "result": await operation(item)}
+            except httpx.HTTPStatusError as e:
+                return {"index": index, "ok": False, "error": f"HTTP {e.response.status_code}: {e.response.text}"}
+            except resilience.CircuitOpenError as e:
+                breaker_error = breaker_error or str(e)
+                return {"index": index, "ok": False, "skipped": True, "error": str(e)}
+            except KeyError as e:
+                return {"index": index, "ok": False, "error": f"필수 항목 누락: {e}"}
+            except Exception as e:
+                return {"index": index, "ok": False, "error": str(e)}
+    
+    results = await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+    succeeded = sum(1 for r in results if r["ok"])
+    return {
+        "results": list(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "skipped": sum(1 for r in results if r.get("skipped")),
+    }
+
+
+async def create_memos(memos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    여러 메모를 한 번에 생성합니다.
+    
+    Args:
+        memos: 생성할 메모 목록 (각 항목: {"title": str, "content": str | None})
+    
+    Returns:
+        항목별 생성 결과
+    """
+    return await _run_batch(
+        memos,
+        lambda memo: create_memo(title=memo["title"], content=memo.get("content"))
+    )
+
+
+async def get_memos(memo_ids: List[int]) -> Dict[str, Any]:
+    """
+    여러 메모를 한 번에 조회합니다.
+    
+    Args:
+        memo_ids: 조회할 메모 ID 목록
+    
+    Returns:
+        항목별 조회 결과
+    """
+    return await _run_batch(memo_ids, lambda memo_id: get_memo(memo_id=memo_id))
+
+
+async def update_memos(updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    여러 메모를 한 번에 수정합니다.
+    
+    Args:
+        updates: 수정 목록 (각 항목: {"memo_id": int, "title": str | None, "content": str | None})
+    
+    Returns:
+        항목별 수정 결과
+    """
+    return await _run_batch(
+        updates,
+        lambda update: update_memo(
+            memo_id=update["memo_id"],
+            title=update.get("title"),
+            content=update.get("content")
+        )
+    )
+
+
+async def delete_memos(memo_ids: List[int]) -> Dict[str, Any]:
+    """
+    여러 메모를 한 번에 삭제합니다.
+    
+    Args:
+        memo_ids: 삭제할 메모 ID 목록
+    
+    Returns:
+        항목별 삭제 결과
+    """
+    return await _run_batch(memo_ids, lambda memo_id: delete_memo(memo_id=memo_id))
+
+
+def search_stats() -> Dict[str, Any]:
+    """
+    검색 색인 크기와 구축/검색 통계를 반환합니다.
+    
+    Returns:
+        문서 수, 용어 수, 구축 횟수와 소요 시간 등
+    """
+    return search_index.stats()
+
+
+def singleflight_stats() -> Dict[str, Any]:
+    """
+    동일 읽기 요청 합치기 통계를 반환합니다.
+    
+    Returns:
+        get_memo / list_memos별 진행 중 요청 수, 백엔드 요청 수(leaders), 합쳐진 호출 수(coalesced)
+    """
+    return {"get_memo": memo_flight.stats(), "list_memos": page_flight.stats()}
+
+
+def _replica_pages(page_size: int, params: Optional[Dict[str, Any]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    return iter_memo_pages(page_size=page_size, params=params)
+
+
+def start_replica():
+    """로컬 복제본 백그라운드 동기화 시작 (MEMO_REPLICA_ENABLED일 때만)"""
+    replica.start(_replica_pages)
+
+
+async def stop_replica():
+    await replica.stop()
+
+
+async def refresh_replica() -> Dict[str, Any]:
+    """
+    로컬 복제본을 지금 백엔드와 동기화합니다.
+    
+    Returns:
+        동기화 후 복제본 통계
+    """
+    await replica.refresh(_replica_pages)
+    return replica.stats()
+
+
+def replica_stats() -> Dict[str, Any]:
+    """
+    로컬 복제본 통계를 반환합니다.
+    
+    Returns:
+        메모 수, 신선도(age_s), 로컬 읽기/미스, 전체/증분 동기화 횟수
+    """
+    return replica.stats()
+
+
+def backend_stats() -> Dict[str, Any]:
+    """
+    백엔드 호출 복원력 통계를 반환합니다.
+    
+    Returns:
+        서킷 브레이커 상태, 재시도/헤지/마감 시간 초과 횟수, 현재 헤지 지연 시간
+    """
+    return resilience.stats()
+
+
+def cache_stats() -> Dict[str, Any]:
+    """
+    메모 캐시 적중/미스/제거 통계를 반환합니다.
+    
+    Returns:
+        ID별 캐시와 목록 페이지 캐시의 통계
+    """
+    return cache.stats()
@@ -5,8 +5,9 @@
 클라이언트는 별도로 실행할 수 있습니다.
 
 사용법:
-    python run_mcp_server.py          # stdio 모드 (기본)
-    python run_mcp_server.py --sse    # SSE HTTP 서버 모드
+    python run_mcp_server.py                             # stdio 모드 (기본)
+    python run_mcp_server.py --mode sse                  # SSE HTTP 서버 모드
+    python run_mcp_server.py --mode http --workers 4     # streamable-HTTP, 워커 4개
 """
 import sys
 import argparse
@@ -21,40 +22,35 @@ def main():
     parser = argparse.ArgumentParser(description="MCP 서버 실행")
     parser.add_argument(
         "--mode",
-        choices=["stdio", "sse"],
+        choices=["stdio", "sse", "http"],
         default="stdio",
-        help="서버 실행 모드 (기본: stdio)"
+        help="서버 실행 모드 (기본: stdio, http는 streamable-HTTP)"
     )
     parser.add_argument(
         "--port",
         type=int,
         default=8001,
-        help="SSE 모드 포트 (기본: 8001)"
+        help="SSE/HTTP 모드 포트 (기본: 8001)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="HTTP 모드 워커 프로세스 수 (기본: 1)"
     )
     
     args = parser.parse_args()
     
-    if args.mode == "sse":
-        print("SSE 모드로 MCP 서버 시작...")
-        import uvicorn
-        from mcp_server_sse import app
-        
-        print("=" * 60)
-        print("🚀 MCP 서버 (SSE 모드) 시작")
-        print("=" * 60)
-        print(f"서버 주소: http://localhost:{args.port}")
-        print(f"SSE 엔드포인트: http://localhost:{args.port}/sse")
-        print("\nCtrl+C를 눌러 서버를 종료할 수 있습니다.\n")
-        
-        uvicorn.run(
-            app,
-            host="0.0.0.0",
-            port=args.port,
-            log_level="info"
-        )
+    if args.mode in ("sse", "http"):
+        from mcp_server_sse import main as run_http_server
+        run_http_server([
+            "--transport", args.mode,
+            "--port", str(args.port),
+            "--workers", str(args.workers),
+        ])
     else:
-        print("stdio 모드로 MCP 서버 시작...")
-        print("(클라이언트가 이 서버에 연결하기를 기다립니다)")
+        print("stdio 모드로 MCP 서버 시작...", file=sys.stderr)
+        print("(클라이언트가 이 서버에 연결하기를 기다립니다)", file=sys.stderr)
         from server import mcp
         mcp.run()
 
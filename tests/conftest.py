@@ -0,0 +1,11 @@
+"""chatbot / mcp-server 모듈을 패키지 없이 이름으로 import 하도록 경로 추가"""
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "chatbot"))
+sys.path.insert(0, str(ROOT / "mcp-server"))
+
+# ChatOpenAI 생성에 필요한 키 (실제 호출은 하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
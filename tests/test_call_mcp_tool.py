@@ -0,0 +1,39 @@
+"""nodes.call_mcp_tool의 CallToolResult 처리"""
+import asyncio
+
+import pytest
+from mcp.types import CallToolResult, TextContent
+
+import nodes
+
+
+class FakeSession:
+    """call_tool이 정해진 결과를 돌려주는 MCP 세션 대역"""
+
+    def __init__(self, result: CallToolResult):
+        self.result = result
+        self.calls = []
+
+    async def call_tool(self, name, arguments=None, meta=None):
+        self.calls.append((name, arguments))
+        return self.result
+
+
+def _call(monkeypatch, text: str, is_error: bool):
+    session = FakeSession(CallToolResult(content=[TextContent(type="text", text=text)], isError=is_error))
+    monkeypatch.setattr(nodes, "mcp_session", session)
+    return asyncio.run(nodes.call_mcp_tool("get_memo", {"memo_id": 1}))
+
+
+def test_returns_decoded_result(monkeypatch):
+    assert _call(monkeypatch, '{"id": 1, "title": "장보기"}', False) == {"id": 1, "title": "장보기"}
+
+
+def test_output_validation_error_is_decoded_as_result(monkeypatch):
+    text = 'Output validation error: [{"id": 1, "title": "장보기"}]'
+    assert _call(monkeypatch, text, True) == [{"id": 1, "title": "장보기"}]
+
+
+def test_other_error_raises(monkeypatch):
+    with pytest.raises(nodes.ToolCallError, match="메모를 찾을 수 없습니다"):
+        _call(monkeypatch, "메모를 찾을 수 없습니다", True)